@@ -0,0 +1,154 @@
+/*  Recherche dans les pages statiques des actes (Export_HTML/Site)
+
+    L'index inversé est précalculé par static_site.py et découpé en
+    fragments index/xx.json (xx : deux premières lettres du mot) : seuls
+    les fragments des mots saisis sont téléchargés. Chaque mot est associé
+    à la liste aplatie [num_id, champs, num_id, champs, ...] où champs est
+    un masque (1 titre, 2 mots clés, 4 auteurs, 8 affiliations). Le titre,
+    les auteurs et l'adresse des papiers sont dans docs/n.json.
+
+    Sous node (sans document), le module exporte words : les mots doivent
+    être découpés comme par static_site.words (tests/test_search_words.py).
+*/
+(function () {
+  'use strict';
+  var WEIGHTS = {1: 8, 2: 4, 4: 6, 8: 1};
+  var MAX_RESULTS = 50;
+  var cache = {};
+  var meta = null;
+  // lettres que NFKD ne décompose pas (même table dans static_site.py)
+  var LIGATURES = {'œ': 'oe', 'Œ': 'OE', 'æ': 'ae', 'Æ': 'AE', 'ß': 'ss',
+    'ẞ': 'SS'};
+
+  function load(url) {
+    if (!(url in cache)) {
+      cache[url] = fetch(url).then(function (response) {
+        return response.ok ? response.json() : {};
+      }).catch(function () { return {}; });
+    }
+    return cache[url];
+  }
+
+  function words(text, stopwords) {
+    var list = text.replace(/[œŒæÆßẞ]/g, function (letter) {
+      return LIGATURES[letter];
+    }).normalize('NFKD').replace(/[\u0300-\u036f]/g, '')
+      .toLowerCase().match(/[a-z0-9]+/g) || [];
+    return list.filter(function (word) {
+      return word.length >= 2 && !/^[0-9]+$/.test(word) &&
+        stopwords.indexOf(word) < 0;
+    });
+  }
+
+  // {num_id : champs} des papiers contenant le mot (ou un mot qui commence
+  // par word si prefix est vrai)
+  function postings(word, prefix) {
+    var name = word.slice(0, 2);
+    if (meta.shards.indexOf(name) < 0) {
+      return Promise.resolve({});
+    }
+    return load('index/' + name + '.json').then(function (shard) {
+      var found = {};
+      Object.keys(shard).forEach(function (token) {
+        if (token !== word && !(prefix && token.indexOf(word) === 0)) {
+          return;
+        }
+        var list = shard[token];
+        for (var i = 0; i < list.length; i += 2) {
+          found[list[i]] = (found[list[i]] || 0) | list[i + 1];
+        }
+      });
+      return found;
+    });
+  }
+
+  function score(fields) {
+    var total = 0;
+    Object.keys(WEIGHTS).forEach(function (bit) {
+      if (fields & bit) {
+        total += WEIGHTS[bit];
+      }
+    });
+    return total;
+  }
+
+  function search(query) {
+    var list = words(query, meta.stopwords);
+    if (!list.length) {
+      return Promise.resolve([]);
+    }
+    // le dernier mot est en cours de saisie : recherche par préfixe
+    var prefix = !/\s$/.test(query);
+    return Promise.all(list.map(function (word, i) {
+      return postings(word, prefix && i === list.length - 1);
+    })).then(function (all) {
+      var scores = {};
+      Object.keys(all[0]).forEach(function (num_id) {
+        var total = 0;
+        for (var i = 0; i < all.length; i++) {
+          if (!(num_id in all[i])) {
+            return;
+          }
+          total += score(all[i][num_id]);
+        }
+        scores[num_id] = total;
+      });
+      return Object.keys(scores).sort(function (a, b) {
+        return scores[b] - scores[a] || a - b;
+      }).slice(0, MAX_RESULTS);
+    });
+  }
+
+  function escape(text) {
+    var div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML.replace(/"/g, '&quot;');
+  }
+
+  function show(results, List_num_id) {
+    var shards = {};
+    List_num_id.forEach(function (num_id) {
+      shards[Math.floor(num_id / meta.docs)] = true;
+    });
+    return Promise.all(Object.keys(shards).map(function (n) {
+      return load('docs/' + n + '.json');
+    })).then(function (all) {
+      var docs = Object.assign.apply(null, [{}].concat(all));
+      results.innerHTML = List_num_id.length ? List_num_id.map(
+        function (num_id) {
+          var doc = docs[num_id];
+          return '<p><a href="' + escape(doc[2]) + '">' + escape(doc[0]) +
+            '</a><br>' + escape(doc[1]) + '</p>';
+        }).join('') : '<p>Aucun résultat</p>';
+    });
+  }
+
+  if (typeof document === 'undefined') {
+    module.exports = {words: words};
+    return;
+  }
+
+  var input = document.getElementById('search');
+  var results = document.getElementById('results');
+  var timer = null;
+  var current = 0;
+  input.addEventListener('input', function () {
+    clearTimeout(timer);
+    timer = setTimeout(function () {
+      var query = input.value;
+      var request = ++current;
+      if (!query.trim()) {
+        results.innerHTML = '';
+        return;
+      }
+      load('index/meta.json').then(function (data) {
+        meta = data;
+        return search(query);
+      }).then(function (List_num_id) {
+        if (request === current) {
+          return show(results, List_num_id);
+        }
+      });
+    }, 150);
+  });
+}());
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:31:09 2026
+
+@author: phil
+"""
+import re
+from functools import lru_cache
+
+from openconf import clean_string
+
+re_key = re.compile(r'[^a-z]')
+
+
+@lru_cache(maxsize=None)
+def sort_key(name, surname):
+    """
+    Clé normalisée d'un auteur (sans accents, espaces, tirets ni majuscules)
+    servant au tri et au regroupement des variantes d'écriture
+    """
+    return re_key.sub('', clean_string(name+surname).lower())
+
+
+class AuthorIndex:
+    """
+    Index des auteurs et des affiliations construit une seule fois par
+    construction. Chaque auteur est identifié par sa clé normalisée
+    (sort_key) avec une écriture canonique (la première rencontrée dans
+    l'export), la liste de ses papiers et de ses affiliations. Les entrées
+    \\index du TeX, la table des matières HTML, les creators DataCite et la
+    liste des auteurs du recueil sont générés à partir de cet index.
+
+    Example
+    -------
+    >>> author_index = AuthorIndex()
+    >>> for sub in iter_submissions(filename_export_OpenConf):
+            author_index.add_submission(sub)
+    >>> author_index.index_entry('Baucour', 'Philippe')
+    '\\\\index{baucourphilippe@Baucour, Philippe}'
+    >>> author_index.creators(1)
+    [['Baucour', 'Philippe', 'FEMTO-ST'], ...]
+    """
+
+    def __init__(self):
+        # clé : [nom, prénom, [num_id, ...], [affiliation, ...]]
+        self.authors = {}
+        # num_id : [[clé, affiliation], ...] dans l'ordre du papier
+        self.papers = {}
+
+    def __len__(self):
+        return len(self.authors)
+
+    def add(self, num_id, name, surname, affiliation):
+        key = sort_key(name, surname)
+        author = self.authors.setdefault(key, [name, surname, [], []])
+        if num_id not in author[2]:
+            author[2].append(num_id)
+        if affiliation and affiliation not in author[3]:
+            author[3].append(affiliation)
+        self.papers.setdefault(num_id, []).append([key, affiliation])
+        return key
+
+    def add_submission(self, sub):
+        """
+        Ajoute les auteurs d'une soumission (Submission), les auteurs déjà
+        indexés pour ce papier sont remplacés
+        """
+        self.remove(sub.num_id)
+        for a in sub.authors:
+            self.add(sub.num_id, a.name, a.surname, a.affiliation)
+
+    def remove(self, num_id):
+        for key, affiliation in self.papers.pop(num_id, []):
+            author = self.authors.get(key)
+            if author is not None and num_id in author[2]:
+                author[2].remove(num_id)
+                if not author[2]:
+                    del self.authors[key]
+
+    @classmethod
+    def from_registry(cls, registry):
+        """
+        Index construit à partir des soumissions du registre
+        """
+        author_index = cls()
+        for num_id, authors in registry.authors():
+            for name, surname, affiliation in authors:
+                author_index.add(num_id, name, surname, affiliation)
+        return author_index
+
+    # -- Lecture ------------------------------------------------------------
+    def canonical(self, name, surname):
+        """
+        (nom, prénom) canonique d'un auteur
+        """
+        author = self.authors.get(sort_key(name, surname))
+        if author is None:
+            return name, surname
+        return author[0], author[1]
+
+    def index_entry(self, name, surname):
+        """
+        Entrée \\index LaTeX d'un auteur
+        """
+        key = sort_key(name, surname)
+        name, surname = self.canonical(name, surname)
+        return "\\index{"+key+"@"+name+", "+surname+"}"
+
+    def creators(self, num_id):
+        """
+        Liste des [nom, prénom, affiliation] d'un papier avec les écritures
+        canoniques, None si le papier n'est pas dans l'index
+        """
+        if num_id not in self.papers:
+            return None
+        return [self.authors[key][:2]+[affiliation]
+                for key, affiliation in self.papers[num_id]]
+
+    def sorted_authors(self):
+        """
+        Générateur des auteurs classés par clé :
+        (clé, nom, prénom, [num_id, ...], [affiliation, ...])
+        """
+        for key in sorted(self.authors):
+            name, surname, List_num_id, List_aff = self.authors[key]
+            yield key, name, surname, List_num_id, List_aff
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:12:40 2026
+
+@author: phil
+"""
+import csv
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from itertools import cycle
+
+import fitz
+
+import make_recueils
+import make_XML
+from edition import Edition
+from pdf_index import PdfIndex
+
+ROOT = os.path.dirname(os.path.abspath(__file__))+'/'
+SEED_OPENCONF = ROOT+'Imports_OpenConf/openconf-SFT2021-submissions-all.csv'
+
+
+def synthetic_csv(filename_out, nb_papers, filename_seed=SEED_OPENCONF):
+    """
+    Fonction permettant de générer un export OpenConf synthétique à partir
+    des lignes d'un export réel
+
+    Parameters
+    ----------
+    filename_out : String
+        Nom du fichier CSV généré.
+    nb_papers : Int
+        Nombre de soumissions à générer.
+    filename_seed : String, optional
+        Export OpenConf servant de modèle. The default is the SFT2021 export.
+
+    Returns
+    -------
+    None.
+        Création d'un fichier CSV
+
+    """
+    with open(filename_seed, 'r') as file_seed:
+        csv_reader = csv.DictReader(file_seed, delimiter=',', dialect='unix')
+        fieldnames = csv_reader.fieldnames
+        seeds = list(csv_reader)
+
+    with open(filename_out, 'w') as file_out:
+        csv_writer = csv.DictWriter(file_out, fieldnames, dialect='unix')
+        csv_writer.writeheader()
+        for num_id, row in zip(range(1, nb_papers+1), cycle(seeds)):
+            row = dict(row)
+            row['SUBMISSION ID'] = str(num_id)
+            csv_writer.writerow(row)
+
+
+def clean_dict_sequential(d):
+    """
+    Ancienne version de clean_dict : un str.replace par règle de CHARS_TEX.
+    Elle ne sert que de référence pour le benchmark.
+    """
+    d = dict([(k.strip(), v.strip()) for k, v in d.items() if len(v) > 0])
+    for k in d.keys():
+        for ch in make_recueils.CHARS_TEX:
+            d[k] = d[k].replace(ch[0], ch[1])
+    return d
+
+
+def timeit(func, rows):
+    tic = time.perf_counter()
+    for row in rows:
+        func(row)
+    return time.perf_counter() - tic
+
+
+def bench_clean_dict(nb_papers=10000):
+    """
+    Benchmark de clean_dict contre la boucle de str.replace sur un export
+    synthétique de nb_papers soumissions
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename_csv = os.path.join(tmpdir, 'synthetic.csv')
+        synthetic_csv(filename_csv, nb_papers)
+        with open(filename_csv, 'r') as file_csv:
+            rows = list(csv.DictReader(file_csv, delimiter=',',
+                                       dialect='unix'))
+
+    t_seq = timeit(clean_dict_sequential, rows)
+    t_one = timeit(make_recueils.clean_dict, rows)
+    print("clean_dict sur", nb_papers, "soumissions")
+    print("  boucle str.replace : {:8.3f} s".format(t_seq))
+    print("  regex compilée     : {:8.3f} s".format(t_one))
+    print("  gain               : {:8.2f} x".format(t_seq/t_one))
+
+
+def synthetic_pdf(filename_out, num_id, nb_pages):
+    """
+    Fonction permettant de générer un PDF d'article de nb_pages pages
+    """
+    doc = fitz.open()
+    for k in range(1, nb_pages+1):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text(fitz.Point(72, 72), "Papier synthétique " +
+                         str(num_id)+" - page "+str(k), fontsize=14)
+        page.insert_text(fitz.Point(72, 110), 60*"Lorem ipsum ", fontsize=9)
+    doc.save(filename_out)
+    doc.close()
+
+
+def synthetic_conference(root, nb_papers, nb_pages=(4, 12)):
+    """
+    Fonction permettant de générer un congrès synthétique complet dans root :
+    arborescence et gabarits du dépôt, export OpenConf, choix_theme.csv,
+    Tableau_Reviewer.csv et un PDF de plusieurs pages par papier
+
+    Parameters
+    ----------
+    root : String
+        Répertoire du congrès synthétique (il ne doit pas exister).
+    nb_papers : Int
+        Nombre de soumissions.
+    nb_pages : Tuple, optional
+        Nombre de pages minimal et maximal des PDF. The default is (4, 12).
+
+    Returns
+    -------
+    None.
+
+    """
+    # gabarits seulement, les répertoires de fichiers générés sont vides
+    generated = ('Abstracts', 'Abstracts_JSON', 'Abstracts_OK',
+                 'Abstracts_Tex_HTML', 'Actes', 'Fragments', 'Formats')
+    shutil.copytree(ROOT+'Export_Tex', root+'Export_Tex',
+                    ignore=shutil.ignore_patterns(*generated))
+    shutil.copytree(ROOT+'Export_HTML', root+'Export_HTML',
+                    ignore=shutil.ignore_patterns('Abstracts', '*.html'))
+    for dirname in generated[:-2]:
+        os.makedirs(root+'Export_Tex/'+dirname)
+    os.makedirs(root+'Export_HTML/Abstracts')
+    os.makedirs(root+'Export_XML')
+    os.makedirs(root+'Imports_OpenConf/PDF_articles')
+    shutil.copytree(ROOT+'Schemas', root+'Schemas')
+
+    path_imoc = root+'Imports_OpenConf/'
+    synthetic_csv(path_imoc+'openconf-SFT2021-submissions-all.csv',
+                  nb_papers)
+
+    with open(ROOT+'Imports_OpenConf/choix_theme.csv', 'r') as file_seed:
+        themes = list(dict.fromkeys(
+            line['name_theme']
+            for line in csv.DictReader(file_seed, delimiter=';')))
+    with open(path_imoc+'choix_theme.csv', 'w') as file_theme:
+        file_theme.write('num_id;name_theme\n')
+        for num_id, theme in zip(range(1, nb_papers+1), cycle(themes)):
+            file_theme.write(str(num_id)+';'+theme+'\n')
+
+    with open(ROOT+'Imports_OpenConf/Tableau_Reviewer.csv', 'r',
+              encoding='utf-8') as file_seed:
+        reviewers = list(csv.reader(file_seed, delimiter=','))
+    with open(path_imoc+'Tableau_Reviewer.csv', 'w', encoding='utf-8',
+              newline='') as file_reviewer:
+        csv_writer = csv.writer(file_reviewer, delimiter=',',
+                                quoting=csv.QUOTE_ALL)
+        csv_writer.writerow(reviewers[0])
+        for k, row in zip(range(max(10, nb_papers//3)),
+                          cycle(reviewers[1:])):
+            csv_writer.writerow([str(k+1)]+row[1:])
+
+    page_min, page_max = nb_pages
+    for num_id in range(1, nb_papers+1):
+        synthetic_pdf(path_imoc+'PDF_articles/'+str(num_id)+'.pdf', num_id,
+                      page_min + num_id % (page_max-page_min+1))
+
+
+def stage(timings, name, func, *args, errors=False, **kwargs):
+    """
+    Exécute une étape en mesurant son temps d'exécution dans timings[name].
+    Si errors, l'étape renvoie le dictionnaire des fichiers en échec : une
+    étape en échec n'est pas une mesure, RuntimeError.
+    """
+    tic = time.perf_counter()
+    result = func(*args, **kwargs)
+    timings[name] = time.perf_counter() - tic
+    print("  {:20s} {:9.3f} s".format(name, timings[name]))
+    if errors and result:
+        raise RuntimeError("étape "+name+" : "+str(len(result)) +
+                           " fichiers en échec, ex. "+min(result))
+    return result
+
+
+def bench_pipeline(nb_papers, nb_workers=None, path_tmp=None):
+    """
+    Fonction permettant de mesurer le temps de chaque étape de make_recueils
+    et de make_XML sur un congrès synthétique de nb_papers papiers (sans
+    manifeste : tout est reconstruit)
+
+    Parameters
+    ----------
+    nb_papers : Int
+        Nombre de soumissions.
+    nb_workers : Int, optional
+        Nombre de processus des étapes parallèles. The default is None.
+    path_tmp : String, optional
+        Répertoire temporaire. The default is None.
+
+    Returns
+    -------
+    timings : Dict
+        Dictionnaire {étape : durée en secondes}.
+
+    """
+    timings = {}
+    print("Congrès synthétique de", nb_papers, "papiers")
+    with tempfile.TemporaryDirectory(dir=path_tmp) as tmpdir:
+        root = tmpdir+'/conf/'
+        stage(timings, 'generation', synthetic_conference, root, nb_papers)
+        edition = Edition(root)
+        filename_csv = edition.filename_export
+
+        with open(root+'Imports_OpenConf/'+filename_csv, 'r') as file_csv:
+            rows = list(csv.DictReader(file_csv, delimiter=',',
+                                       dialect='unix'))
+        stage(timings, 'clean_dict', timeit, make_recueils.clean_dict, rows)
+        del rows
+
+        stage(timings, 'tableau_reviewer', make_recueils.tableau_reviewer,
+              edition, 'Tableau_Reviewer.csv', 3)
+        pdf_index = PdfIndex(edition.path_pdf, tmpdir+'/pdf_index.json')
+        stage(timings, 'pdf_index', pdf_index.refresh, nb_workers)
+        List_files, D_abs = stage(timings, 'All_Abstracts',
+                                  make_recueils.All_Abstracts, edition,
+                                  overwrite=True, pdf_index=pdf_index)
+        Dtheme = stage(timings, 'write_recueil_resume',
+                       make_recueils.write_recueil_resume, edition,
+                       'choix_theme.csv')
+        Ddoi = {num_id: sub.doi for num_id, sub in D_abs.items()}
+        del D_abs
+        doi_ok = stage(timings, 'tag_doi', make_recueils.tag_doi_all,
+                       edition, Dtheme, Ddoi, nb_workers, None, pdf_index)
+        pdf_index.refresh(nb_workers)
+        stage(timings, 'write_recueil_actes',
+              make_recueils.write_recueil_actes, edition, Dtheme, doi_ok,
+              None, pdf_index)
+
+        doi_ids = {num_id for num_id in doi_ok if doi_ok[num_id]}
+        stage(timings, 'textohtml', make_XML.all_textohtml, edition,
+              os.listdir(edition.path_abs), nb_workers, doi_ids=doi_ids,
+              errors=True)
+        stage(timings, 'writexml', make_XML.all_writexml, edition,
+              ['p'+str(num_id)+'.tex' for num_id in sorted(doi_ids)],
+              nb_workers, errors=True)
+    return timings
+
+
+def git_commit():
+    try:
+        proc = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              cwd=ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return proc.stdout.strip() or None
+
+
+def bench_suite(sizes=(100, 1000, 10000), nb_workers=None,
+                path_results=ROOT+'benchmarks/'):
+    """
+    Fonction permettant de lancer bench_pipeline pour plusieurs tailles de
+    congrès et d'enregistrer les résultats en JSON
+
+    Parameters
+    ----------
+    sizes : Tuple, optional
+        Nombres de papiers. The default is (100, 1000, 10000).
+    nb_workers : Int, optional
+        Nombre de processus. The default is None (nombre de coeurs).
+    path_results : String, optional
+        Répertoire des résultats. The default is ROOT+'benchmarks/'.
+
+    Returns
+    -------
+    filename_json : String
+        Fichier JSON des résultats
+        {'date', 'commit', 'python', 'cpu_count', 'nb_workers',
+         'results': {nb_papers : {étape : durée}}}.
+
+    """
+    cwd = os.getcwd()
+    results = {}
+    try:
+        for nb_papers in sizes:
+            results[str(nb_papers)] = bench_pipeline(nb_papers, nb_workers)
+    finally:
+        os.chdir(cwd)
+    date = datetime.now()
+    commit = git_commit()
+    os.makedirs(path_results, exist_ok=True)
+    filename_json = path_results+'bench-'+date.strftime('%Y%m%d-%H%M%S') + \
+        ('-'+commit if commit else '')+'.json'
+    with open(filename_json, 'w', encoding='utf-8') as file_json:
+        json.dump({'date': date.isoformat(timespec='seconds'),
+                   'commit': commit, 'python': platform.python_version(),
+                   'cpu_count': os.cpu_count(), 'nb_workers': nb_workers,
+                   'results': results}, file_json, indent=1)
+    print("Résultats :", filename_json)
+    return filename_json
+
+
+def compare(filename_before, filename_after):
+    """
+    Fonction permettant de comparer deux fichiers de résultats de
+    bench_suite, étape par étape (rapport > 1 : plus rapide après)
+    """
+    with open(filename_before, 'r', encoding='utf-8') as file_before:
+        before = json.load(file_before)
+    with open(filename_after, 'r', encoding='utf-8') as file_after:
+        after = json.load(file_after)
+    print("{:20s} {:>8s} {:>10s} {:>10s} {:>8s}".format(
+        'étape', 'papiers', 'avant (s)', 'après (s)', 'gain'))
+    for nb_papers in before['results']:
+        if nb_papers not in after['results']:
+            continue
+        for name, t_before in before['results'][nb_papers].items():
+            t_after = after['results'][nb_papers].get(name)
+            if t_after is None:
+                continue
+            print("{:20s} {:>8s} {:10.3f} {:10.3f} {:7.2f}x".format(
+                name, nb_papers, t_before, t_after,
+                t_before/t_after if t_after else float('inf')))
+
+
+if __name__ == '__main__':
+    bench_clean_dict(10000)
+    bench_suite((100, 1000, 10000))
+    # compare('./benchmarks/bench-AAAA.json', './benchmarks/bench-BBBB.json')
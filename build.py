@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:05:44 2026
+
+@author: phil
+
+Point d'entrée unique de la construction : les étapes de make_recueils et
+de make_XML sont déclarées avec leurs dépendances, seules celles
+nécessaires aux cibles demandées sont lancées et les branches
+indépendantes tournent en même temps. Les compilations LaTeX (latexmk) et
+pandoc sont lancées directement.
+
+    python build.py all
+    python build.py resumes html -j 4
+    python build.py --list
+    python build.py html xml --watch
+    python build.py all --root SFT2021 --root SFT2022
+"""
+import argparse
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import make_recueils
+import make_XML
+import runner
+from author_index import AuthorIndex
+from dedup import CanonicalMap
+from edition import Caches, Edition
+from latex_format import LatexFormat
+from manifest import Manifest
+from pdf_index import PdfIndex
+from publish import publish
+from recueil_actes import RecueilActes
+from recueil_resume import RecueilResume
+from registry import Registry
+from static_site import write_site
+from tracing import Profiler, tracer
+from watch import watch
+
+TARGETS = {'resumes': ['resumes'],
+           'actes': ['actes'],
+           'html': ['html', 'toc'],
+           'xml': ['xml'],
+           'site': ['site'],
+           'publish': ['publish'],
+           'all': ['resumes', 'actes', 'html', 'toc', 'site', 'xml',
+                   'publish']}
+
+
+def run_command(cmd, cwd, timeout=runner.TIMEOUT_LATEXMK):
+    """
+    Fonction permettant de lancer une commande externe (latexmk)
+
+    Parameters
+    ----------
+    cmd : List
+        Commande et arguments.
+    cwd : String
+        Répertoire d'exécution.
+    timeout : Float, optional
+        Délai maximal en secondes. The default is runner.TIMEOUT_LATEXMK.
+
+    Raises
+    ------
+    RuntimeError
+        Si la commande échoue, avec la fin de sa sortie.
+
+    Returns
+    -------
+    None.
+
+    """
+    print(' '.join(cmd))
+    job = runner.run_command(cmd, cwd, timeout)
+    if not job.ok:
+        raise RuntimeError(' '.join(cmd)+" : code "+str(job.returncode) +
+                           "\n"+job.log())
+
+
+def latexmk(filename_tex, jobname, cwd, fmt=None):
+    cmd = ['latexmk', '-CF', '--silent', '-pdf', '-jobname='+jobname]
+    if fmt is not None:
+        cmd.append('-pdflatex=pdflatex -fmt='+fmt+' %O %S')
+    run_command(['latexmk', '-CA'], cwd, runner.TIMEOUT_PDFLATEX)
+    run_command(cmd+[filename_tex], cwd)
+
+
+class Build:
+    """
+    Construction d'une édition du congrès (edition.json de root). Chaque
+    méthode stage_xxx est une étape, les dépendances sont déclarées dans
+    STAGES. Les résultats partagés entre étapes (Dtheme, doi_ok) sont des
+    attributs. Les caches (formats LaTeX, pandoc, métadonnées des PDF)
+    peuvent être partagés entre plusieurs éditions, comme le budget de
+    processus de travail (runner.WorkerBudget) : les étapes des éditions
+    construites en même temps ne dépassent pas ensemble nb_workers.
+
+    Example
+    -------
+    >>> build = Build('./', nb_workers=8)
+    >>> build.run(['html', 'xml'])
+    >>> caches = Caches('./Cache/')
+    >>> budget = WorkerBudget(8)
+    >>> builds = [Build(root, 8, caches=caches, budget=budget)
+                  for root in ['A/', 'B/']]
+    """
+    STAGES = {'pdf_index': [],
+              'reviewers': [],
+              'abstracts': ['pdf_index'],
+              'themes': ['abstracts'],
+              'toc': ['themes'],
+              'site': ['themes'],
+              'tag_doi': ['themes'],
+              'actes_tex': ['tag_doi'],
+              'resumes': ['reviewers', 'themes'],
+              'actes': ['reviewers', 'actes_tex'],
+              'html': ['abstracts', 'tag_doi'],
+              'xml': ['abstracts', 'tag_doi'],
+              'publish': ['html', 'toc', 'site']}
+
+    def __init__(self, root='./', nb_workers=None, nb_parallel=4,
+                 fragments=False, streaming=False, assemble=False,
+                 caches=None, budget=None):
+        self.root = root
+        self.edition = Edition.load(root)
+        self.caches = caches
+        self.nb_workers = nb_workers
+        # processus de travail partagés par les étapes lancées en même temps
+        self.budget = budget or runner.WorkerBudget(nb_workers)
+        self.nb_parallel = nb_parallel
+        self.fragments = fragments
+        self.assemble = assemble
+        self.streaming = streaming
+        self.manifest = Manifest(root+'build_manifest.json')
+        if caches is None:
+            self.pdf_index = PdfIndex(self.edition.path_pdf,
+                                      root+'pdf_index.json')
+            self.latex_format = LatexFormat(self.edition.path_extex)
+        else:
+            self.pdf_index = PdfIndex(self.edition.path_pdf,
+                                      root+'pdf_index.json', caches.pdf_info)
+            self.latex_format = caches.latex_format
+        self.lock = threading.Lock()
+        self.author_index = AuthorIndex()
+        self.canonical = CanonicalMap.load(
+            root+'Imports_OpenConf/canonical_map.csv')
+        self.Dtheme = None
+        self.doi_ok = None
+        # n° des papiers à reconstruire par html et xml (None : tous)
+        self.only = None
+
+    def registry(self):
+        """
+        Connexion au registre propre à l'étape (une connexion SQLite ne se
+        partage pas entre threads)
+        """
+        return Registry(self.root+'registry.sqlite', self.edition.base_url)
+
+    # -- Étapes -------------------------------------------------------------
+    def stage_pdf_index(self):
+        with self.budget.take(self.nb_workers) as nb_workers:
+            self.pdf_index.refresh(nb_workers)
+
+    def stage_reviewers(self):
+        make_recueils.tableau_reviewer(self.edition, "Tableau_Reviewer.csv",
+                                      3)
+
+    def stage_abstracts(self):
+        registry = self.registry()
+        if self.streaming:
+            make_recueils.stream_abstracts(
+                self.edition, registry, overwrite=False,
+                manifest=self.manifest, pdf_index=self.pdf_index,
+                author_index=self.author_index, canonical=self.canonical)
+        else:
+            make_recueils.All_Abstracts(
+                self.edition, overwrite=False, manifest=self.manifest,
+                pdf_index=self.pdf_index, registry=registry,
+                author_index=self.author_index, canonical=self.canonical)
+        registry.close()
+
+    def stage_themes(self):
+        self.Dtheme = make_recueils.write_recueil_resume(self.edition,
+                                                         'choix_theme.csv')
+        registry = self.registry()
+        registry.set_themes(self.Dtheme)
+        registry.close()
+
+    def stage_toc(self):
+        registry = self.registry()
+        ok = make_recueils.write_index_html(self.edition, registry,
+                                            self.author_index)
+        registry.close()
+        if not ok:
+            raise RuntimeError("pandoc Table_of_contents.md")
+
+    def stage_site(self):
+        registry = self.registry()
+        write_site(self.edition, registry, self.author_index)
+        registry.close()
+
+    def stage_tag_doi(self):
+        registry = self.registry()
+        with self.budget.take(self.nb_workers) as nb_workers:
+            self.doi_ok = make_recueils.tag_doi_all(
+                self.edition, self.Dtheme, registry.dois(), nb_workers,
+                self.manifest, self.pdf_index)
+        with self.budget.take(self.nb_workers) as nb_workers, self.lock:
+            self.pdf_index.refresh(nb_workers)
+        make_recueils.register_doi(registry, self.doi_ok, self.pdf_index)
+        registry.close()
+
+    def stage_actes_tex(self):
+        make_recueils.write_recueil_actes(self.edition, self.Dtheme,
+                                          self.doi_ok, self.manifest,
+                                          self.pdf_index)
+
+    def stage_resumes(self):
+        path_extex = self.edition.path_extex
+        jobname = self.edition.jobname('Resumes')
+        if self.fragments:
+            with self.budget.take(self.nb_workers) as nb_workers:
+                errors = RecueilResume(path_extex, self.Dtheme, nb_workers,
+                                       self.manifest, self.latex_format,
+                                       self.author_index).build(jobname)
+            if errors:
+                raise RuntimeError("LaTeX : "+', '.join(sorted(errors)))
+            return
+        fmt = self.latex_format.get(
+            path_extex+'Recueil_Resume/Recueil_Resume.tex')
+        latexmk('Recueil_Resume.tex', jobname, path_extex+'Recueil_Resume',
+                fmt)
+
+    def stage_actes(self):
+        path_extex = self.edition.path_extex
+        jobname = self.edition.jobname('Actes')
+        if self.assemble:
+            with self.budget.take(self.nb_workers) as nb_workers:
+                errors = RecueilActes(path_extex, self.edition.path_pdf,
+                                      self.Dtheme, self.doi_ok, nb_workers,
+                                      self.manifest, self.latex_format,
+                                      self.author_index,
+                                      self.pdf_index).build(jobname)
+            if errors:
+                raise RuntimeError("Actes : "+', '.join(sorted(errors)))
+            return
+        fmt = self.latex_format.get(path_extex+'Recueil_Actes/actes.tex')
+        latexmk('actes.tex', jobname, path_extex+'Recueil_Actes', fmt)
+
+    def stage_html(self):
+        registry = self.registry()
+        List_filetex = os.listdir(self.edition.path_abs)
+        if self.only is not None:
+            List_filetex = ['p'+str(num_id)+'.tex' for num_id in self.only
+                            if 'p'+str(num_id)+'.tex' in List_filetex]
+        path_cache = None
+        if self.caches is not None:
+            path_cache = self.caches.path_pandoc
+        with self.budget.take(self.nb_workers) as nb_workers:
+            errors = make_XML.all_textohtml(self.edition, List_filetex,
+                                            nb_workers, self.manifest,
+                                            registry, registry.doi_ids(),
+                                            path_cache)
+        registry.close()
+        if errors:
+            raise RuntimeError("HTML : "+', '.join(sorted(errors)))
+
+    def stage_xml(self):
+        registry = self.registry()
+        with self.budget.take(self.nb_workers) as nb_workers:
+            errors = make_XML.export_xml(self.edition, registry, nb_workers,
+                                         self.manifest, self.author_index,
+                                         self.only)
+        registry.close()
+        if errors:
+            raise RuntimeError("DataCite : "+', '.join(sorted(errors)))
+
+    def stage_publish(self):
+        with self.budget.take(self.nb_workers) as nb_workers:
+            publish(self.edition, nb_workers)
+
+    # -- Exécution ----------------------------------------------------------
+    def needed(self, targets):
+        """
+        Ensemble des étapes nécessaires aux cibles (avec leurs dépendances)
+        """
+        todo = [stage for target in targets for stage in TARGETS[target]]
+        needed = set()
+        while todo:
+            stage = todo.pop()
+            if stage not in needed:
+                needed.add(stage)
+                todo.extend(self.STAGES[stage])
+        return needed
+
+    def run_stage(self, name):
+        with tracer.span(name):
+            getattr(self, 'stage_'+name)()
+
+    def run(self, targets, stages=None):
+        """
+        Fonction permettant de construire les cibles : une étape est lancée
+        dès que toutes ses dépendances sont terminées, au plus nb_parallel
+        étapes en même temps
+
+        Parameters
+        ----------
+        targets : List
+            Cibles parmi TARGETS.
+        stages : Set, optional
+            Seules ces étapes (parmi celles nécessaires aux cibles) sont
+            lancées, les autres sont considérées comme faites lors d'un
+            passage précédent (mode watch). The default is None (toutes).
+
+        Returns
+        -------
+        failed : Dict
+            Étapes en échec avec le message d'erreur, les étapes qui en
+            dépendent ne sont pas lancées.
+
+        """
+        todo = self.needed(targets)
+        done = set()
+        if stages is not None:
+            done = todo - set(stages)
+            todo &= set(stages)
+        failed = {}
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.nb_parallel) as executor:
+            while todo or running:
+                for name in sorted(todo):
+                    deps = self.STAGES[name]
+                    if any(dep in failed for dep in deps):
+                        todo.remove(name)
+                        failed[name] = "non lancée (dépendance en échec)"
+                    elif all(dep in done for dep in deps):
+                        todo.remove(name)
+                        print("----- étape", name)
+                        running[executor.submit(self.run_stage, name)] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for job in finished:
+                    name = running.pop(job)
+                    try:
+                        job.result()
+                    except Exception as err:
+                        failed[name] = repr(err) if not \
+                            isinstance(err, RuntimeError) else str(err)
+                    else:
+                        done.add(name)
+
+        self.manifest.save()
+        self.manifest.summary()
+        for name in sorted(failed):
+            print("ÉCHEC", name, ":", failed[name])
+        return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Construction des recueils, du site HTML et des XML "
+        "DataCite du congrès")
+    parser.add_argument('targets', nargs='*', metavar='cible',
+                        help="cibles parmi "+', '.join(sorted(TARGETS)) +
+                        " (défaut : all)")
+    parser.add_argument('-j', '--jobs', type=int, default=4,
+                        help="nombre d'étapes lancées en même temps")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(),
+                        help="nombre total de processus des étapes "
+                        "parallèles (toutes éditions confondues)")
+    parser.add_argument('--root', action='append', default=None,
+                        help="répertoire d'une édition du congrès, répété "
+                        "pour construire plusieurs éditions en même temps "
+                        "avec des caches et des processus partagés "
+                        "(défaut : ./)")
+    parser.add_argument('--cache', default=None,
+                        help="répertoire des caches partagés entre les "
+                        "éditions (défaut : Cache/ de la première)")
+    parser.add_argument('--fragments', action='store_true',
+                        help="recueil des résumés compilé par fragments")
+    parser.add_argument('--assemble', action='store_true',
+                        help="recueil des actes assemblé directement "
+                        "(sans \\includepdf)")
+    parser.add_argument('--streaming', action='store_true',
+                        help="lecture de l'export OpenConf en flux")
+    parser.add_argument('--profile', action='store_true',
+                        help="profil cProfile dans build.prof")
+    parser.add_argument('--watch', action='store_true',
+                        help="reconstruit les cibles à chaque modification "
+                        "des fichiers d'entrée")
+    parser.add_argument('--poll', type=float, default=None, metavar='s',
+                        help="surveillance par scrutation toutes les s "
+                        "secondes (défaut : inotify si disponible)")
+    parser.add_argument('--list', action='store_true',
+                        help="affiche les étapes et leurs dépendances")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, deps in Build.STAGES.items():
+            print("{:12s} <- {}".format(name, ', '.join(deps) or '-'))
+        raise SystemExit(0)
+
+    targets = args.targets or ['all']
+    for target in targets:
+        if target not in TARGETS:
+            parser.error("cible inconnue : "+target)
+    roots = [os.path.join(root, '') for root in args.root or ['./']]
+    if args.watch and len(roots) > 1:
+        parser.error("--watch ne surveille qu'une seule édition")
+    root = roots[0]
+    profiler = Profiler(root+'build.prof', args.profile)
+    profiler.start()
+    caches = None
+    if len(roots) > 1 or args.cache is not None:
+        caches = Caches(args.cache or root+'Cache/')
+    # un seul budget de processus pour toutes les éditions : --workers est
+    # le total, pas le nombre par édition
+    budget = runner.WorkerBudget(args.workers)
+    builds = [Build(root, args.workers, args.jobs, args.fragments,
+                    args.streaming, args.assemble, caches, budget)
+              for root in roots]
+    if args.watch:
+        failed = watch(builds[0], targets, args.poll)
+    elif len(builds) == 1:
+        failed = builds[0].run(targets)
+    else:
+        # une construction par édition, chacune dans son thread : chaque
+        # étape a son propre pool, mais le nombre total de processus est
+        # limité par le budget commun et les caches sont partagés
+        with ThreadPoolExecutor(max_workers=len(builds)) as executor:
+            results = list(executor.map(lambda build: build.run(targets),
+                                        builds))
+        failed = {}
+        for build, result in zip(builds, results):
+            failed.update({build.edition.name+':'+name: error
+                           for name, error in result.items()})
+    tracer.export_chrome(root+'trace_build.json')
+    tracer.summary()
+    profiler.stop()
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:07:52 2026
+
+@author: phil
+
+Dédoublonnage approché des affiliations et des noms d'auteurs de tout le
+congrès ("FEMTO-ST, UBFC" et "Institut FEMTO-ST - Univ. Bourgogne
+Franche-Comté"). Les candidats sont trouvés par blocage sur un index inversé
+des mots et des sigles (pas de comparaison de toutes les paires), notés
+(trigrammes et recouvrement des mots), regroupés, puis proposés dans un
+fichier de correspondances à relire :
+
+    kind;variant;canonical;score;status
+
+Seules les lignes dont le status est 'ok' sont appliquées à la lecture de
+l'export OpenConf (voir CanonicalMap et openconf.ColumnSchema). Une
+nouvelle analyse conserve les décisions déjà prises ('ok' ou 'rejet').
+"""
+import csv
+import os
+import re
+from collections import Counter, defaultdict
+
+from openconf import clean_string
+
+FIELDS = ['kind', 'variant', 'canonical', 'score', 'status']
+STOPWORDS = {'de', 'des', 'du', 'la', 'le', 'les', 'et', 'l', 'd', 'of',
+             'the', 'and', 'en', 'a', 'au', 'aux'}
+ABBREVIATIONS = {'univ': 'universite', 'université': 'universite',
+                 'university': 'universite', 'inst': 'institut',
+                 'institute': 'institut', 'lab': 'laboratoire',
+                 'labo': 'laboratoire', 'dept': 'departement',
+                 'ec': 'ecole', 'natl': 'national'}
+re_sep = re.compile(r'[^a-z0-9]+')
+
+
+def tokens(ch):
+    """
+    Mots normalisés d'une chaîne (sans accents, minuscules, abréviations
+    développées, mots vides retirés)
+    """
+    words = re_sep.split(clean_string(ch, spaces=False).lower())
+    return [ABBREVIATIONS.get(w, w) for w in words
+            if w and w not in STOPWORDS]
+
+
+def trigrams(List_tokens):
+    ch = ' '+' '.join(List_tokens)+' '
+    return {ch[i:i+3] for i in range(len(ch)-2)}
+
+
+def acronyms(List_tokens):
+    """
+    Sigles formés par les initiales de 2 à 6 mots consécutifs
+    (université bourgogne franche comte -> ubfc)
+    """
+    initials = ''.join(w[0] for w in List_tokens)
+    return {initials[i:j] for i in range(len(initials))
+            for j in range(i+2, min(i+6, len(initials))+1)}
+
+
+class Entry:
+    __slots__ = ('text', 'count', 'tokens', 'trigrams', 'acronyms')
+
+    def __init__(self, text, count):
+        self.text = text
+        self.count = count
+        self.tokens = tokens(text)
+        self.trigrams = trigrams(self.tokens)
+        self.acronyms = acronyms(self.tokens)
+
+
+def score(a, b):
+    """
+    Similarité de deux chaînes (Entry) entre 0 et 1 : le maximum de la
+    similarité de Jaccard des trigrammes et de la couverture moyenne des
+    mots des deux chaînes (un mot est retrouvé s'il est présent dans l'autre
+    chaîne, un sigle couvre les mots consécutifs dont il est formé)
+    """
+    if not a.trigrams or not b.trigrams:
+        return 0.
+    jaccard = len(a.trigrams & b.trigrams)/len(a.trigrams | b.trigrams)
+    if len(a.tokens) > len(b.tokens):
+        a, b = b, a
+    words_a, words_b = set(a.tokens), set(b.tokens)
+    covered = words_a & words_b
+    initials = ''.join(w[0] for w in b.tokens)
+    for w in words_a-words_b:
+        if len(w) > 1 and w in b.acronyms:
+            covered.add(w)
+            start = initials.find(w)
+            words_b.difference_update(b.tokens[start:start+len(w)])
+    # un seul mot commun ne suffit pas (Université de Lorraine / Université
+    # de Nantes)
+    if len(covered) < 2:
+        return jaccard
+    nb_b = len(set(b.tokens))
+    coverage = (len(covered)/len(set(a.tokens)) +
+                (nb_b-len(words_b-covered))/nb_b)/2
+    return max(jaccard, coverage)
+
+
+class Deduplicator:
+    """
+    Moteur de dédoublonnage d'un ensemble de chaînes.
+
+    Parameters
+    ----------
+    threshold : Float, optional
+        Score minimal pour regrouper deux chaînes. The default is 0.8.
+    nb_keys : Int, optional
+        Nombre de mots de blocage (les plus rares) par chaîne.
+        The default is 8.
+    min_shared : Int, optional
+        Nombre minimal de mots de blocage partagés pour qu'une paire soit
+        comparée. The default is 2.
+    max_df : Float, optional
+        Les mots présents dans plus de max_df chaînes (proportion) ne
+        servent pas au blocage. The default is 0.05.
+
+    Example
+    -------
+    >>> dedup = Deduplicator(threshold=0.8)
+    >>> clusters = dedup.clusters(Counter(List_affiliations))
+    >>> [['Institut FEMTO-ST - Univ. Bourgogne Franche-Comté',
+          'FEMTO-ST, UBFC'], ...]
+    """
+
+    def __init__(self, threshold=0.8, nb_keys=8, min_shared=2, max_df=0.05):
+        self.threshold = threshold
+        self.nb_keys = nb_keys
+        self.min_shared = min_shared
+        self.max_df = max_df
+
+    def candidates(self, entries):
+        """
+        Générateur des paires (i, j) candidates par blocage sur l'index
+        inversé des mots et des sigles (leurs 4 premières lettres pour
+        tolérer les fautes de frappe) : chaque chaîne n'est comparée qu'aux
+        chaînes qui partagent au moins min_shared de ses nb_keys clés les
+        plus rares (un sigle rapproche la chaîne des mots dont il est formé)
+        """
+        index = defaultdict(list)
+        for i, entry in enumerate(entries):
+            for key in {w[:4] for w in entry.tokens}.union(
+                    a[:4] for a in entry.acronyms if len(a) > 2):
+                index[key].append(i)
+        # les mots trop fréquents ("universite", "cnrs") ne discriminent pas
+        max_postings = max(50, int(self.max_df*len(entries)))
+        for i, entry in enumerate(entries):
+            rare = sorted((len(index[key]), key)
+                          for key in {w[:4] for w in entry.tokens}
+                          if len(index[key]) <= max_postings)[:self.nb_keys]
+            shared = Counter()
+            for nb, w in rare:
+                shared.update(index[w])
+            min_shared = min(self.min_shared, len(rare))
+            for j, nb in shared.items():
+                if j > i and nb >= min_shared:
+                    yield i, j
+
+    def clusters(self, counts):
+        """
+        Fonction permettant de regrouper les variantes d'écriture
+
+        Parameters
+        ----------
+        counts : Dict
+            Dictionnaire {chaîne : nombre d'occurrences}.
+
+        Returns
+        -------
+        List
+            Liste des groupes [(canonique, [(variante, score), ...]), ...],
+            la forme canonique est la plus fréquente (la plus longue en cas
+            d'égalité), seuls les groupes d'au moins deux chaînes sont
+            renvoyés.
+
+        """
+        entries = [Entry(text, nb) for text, nb in counts.items()]
+        parent = list(range(len(entries)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in self.candidates(entries):
+            if find(i) != find(j) and \
+                    score(entries[i], entries[j]) >= self.threshold:
+                parent[find(i)] = find(j)
+
+        groups = defaultdict(list)
+        for i in range(len(entries)):
+            groups[find(i)].append(entries[i])
+        result = []
+        for group in groups.values():
+            if len(group) < 2:
+                continue
+            group.sort(key=lambda e: (-e.count, -len(e.text), e.text))
+            canonical = group[0]
+            result.append((canonical.text,
+                           [(e.text, round(score(e, canonical), 3))
+                            for e in group[1:]]))
+        result.sort()
+        return result
+
+
+class CanonicalMap:
+    """
+    Correspondances variante -> forme canonique relues (status 'ok') pour
+    les affiliations et les auteurs ('Nom, Prénom').
+
+    Example
+    -------
+    >>> canonical = CanonicalMap.load('./Imports_OpenConf/canonical_map.csv')
+    >>> canonical.affiliation('FEMTO-ST, UBFC')
+    'Institut FEMTO-ST - Univ. Bourgogne Franche-Comté'
+    >>> canonical.author('Dupond', 'J.-Luc')
+    ('Dupond', 'Jean-Luc')
+    """
+
+    def __init__(self, rows=(), filename='canonical_map.csv'):
+        self.rows = list(rows)
+        self.maps = {'affiliation': {}, 'author': {}}
+        # ligne 1 : en-tête du fichier
+        for line, row in enumerate(self.rows, 2):
+            where = filename+", ligne "+str(line)+" : "
+            if row.get('kind') not in self.maps:
+                raise ValueError(where+"type "+repr(row.get('kind')) +
+                                 " inconnu (affiliation ou author)")
+            if row.get('status') != 'ok':
+                continue
+            if row['kind'] == 'author' and \
+                    ', ' not in (row.get('canonical') or ''):
+                raise ValueError(where+"auteur "+repr(row.get('canonical')) +
+                                 " au lieu de 'Nom, Prénom'")
+            self.maps[row['kind']][row['variant']] = row['canonical']
+
+    def __len__(self):
+        return sum(len(m) for m in self.maps.values())
+
+    @classmethod
+    def load(cls, filename):
+        if not os.path.isfile(filename):
+            return cls()
+        with open(filename, 'r', encoding='utf-8', newline='') as file_map:
+            return cls(csv.DictReader(file_map, delimiter=';'), filename)
+
+    def save(self, filename):
+        with open(filename, 'w', encoding='utf-8', newline='') as file_map:
+            writer = csv.DictWriter(file_map, FIELDS, delimiter=';')
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+    def affiliation(self, aff):
+        return self.maps['affiliation'].get(aff, aff)
+
+    def author(self, name, surname):
+        canonical = self.maps['author'].get(name+', '+surname)
+        if canonical is None:
+            return name, surname
+        name, surname = canonical.split(', ', 1)
+        return name, surname
+
+    def propose(self, kind, clusters):
+        """
+        Ajoute les correspondances proposées d'un type (status 'à relire'),
+        les décisions déjà prises pour une variante sont conservées
+        """
+        decided = {(row['kind'], row['variant']) for row in self.rows
+                   if row['status'] != 'à relire'}
+        self.rows = [row for row in self.rows
+                     if row['kind'] != kind or
+                     (kind, row['variant']) in decided]
+        nb = 0
+        for canonical, variants in clusters:
+            for variant, sc in variants:
+                if (kind, variant) not in decided:
+                    self.rows.append({'kind': kind, 'variant': variant,
+                                      'canonical': canonical,
+                                      'score': str(sc),
+                                      'status': 'à relire'})
+                    nb += 1
+        self.rows.sort(key=lambda row: (row['kind'], row['canonical'],
+                                        row['variant']))
+        return nb
+
+
+def analyse(List_sub, filename_map, threshold_aff=0.8, threshold_author=0.8):
+    """
+    Fonction permettant de proposer les correspondances de toutes les
+    affiliations et de tous les auteurs d'un export
+
+    Parameters
+    ----------
+    List_sub : Iterable
+        Soumissions (Submission) lues sans correspondances.
+    filename_map : String
+        Fichier des correspondances (complété, les décisions prises sont
+        conservées).
+    threshold_aff : Float, optional
+        Score minimal pour les affiliations. The default is 0.8.
+    threshold_author : Float, optional
+        Score minimal pour les auteurs. The default is 0.8.
+
+    Returns
+    -------
+    canonical : CanonicalMap
+        Correspondances enregistrées dans filename_map.
+
+    """
+    affiliations = Counter()
+    authors = Counter()
+    for sub in List_sub:
+        for a in sub.authors:
+            if a.affiliation:
+                affiliations[a.affiliation] += 1
+            authors[a.name+', '+a.surname] += 1
+    canonical = CanonicalMap.load(filename_map)
+    nb_aff = canonical.propose(
+        'affiliation', Deduplicator(threshold_aff).clusters(affiliations))
+    nb_author = canonical.propose(
+        'author', Deduplicator(threshold_author).clusters(authors))
+    canonical.save(filename_map)
+    print(len(affiliations), "affiliations,", len(authors), "auteurs")
+    print(nb_aff, "affiliations et", nb_author,
+          "auteurs à relire dans", filename_map)
+    return canonical
+
+
+if __name__ == '__main__':
+    import make_recueils
+    from edition import Edition
+
+    edition = Edition.load('./')
+    analyse(make_recueils.iter_submissions(edition),
+            edition.path_imoc+'canonical_map.csv')
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:12:40 2026
+
+@author: phil
+
+Paramètres d'une édition du congrès (nom, DOI, URL, année, répertoires) et
+caches partagés entre les éditions construites dans un même processus.
+Une édition est décrite par le fichier edition.json de son répertoire,
+les clés absentes prennent les valeurs du congrès 2021 :
+
+    {"name": "SFT2022", "site": "CFT2022", "year": "2022"}
+"""
+import json
+import os
+
+from latex_format import LatexFormat
+
+
+class Edition:
+    """
+    Édition d'un congrès : toutes les fonctions de make_recueils et de
+    make_XML la reçoivent en paramètre au lieu de lire des variables
+    globales, plusieurs éditions peuvent donc être construites en même temps.
+
+    Parameters
+    ----------
+    root : String, optional
+        Répertoire de l'édition. The default is './'.
+    name : String, optional
+        Nom de l'édition dans les DOI, les recueils et les listings.
+        The default is 'SFT2021'.
+    site : String, optional
+        Répertoire de l'édition sur le site des DOI. The default is 'CFT2021'.
+    year : String, optional
+        Année de publication. The default is '2021'.
+    doi_prefix : String, optional
+        Préfixe DOI de la SFT. The default is '10.25855'.
+    url : String, optional
+        Adresse du site des DOI.
+        The default is 'https://www.sft.asso.fr/DOIeditions/'.
+    publisher : String, optional
+        Éditeur des enregistrements DataCite.
+        The default is 'Société Française de Thermique'.
+    export : String, optional
+        Nom de l'export OpenConf dans Imports_OpenConf.
+        The default is 'openconf-'+name+'-submissions-all.csv'.
+
+    Example
+    -------
+    >>> edition = Edition.load('./')
+    >>> edition.doi(12)
+    '10.25855/SFT2021-012'
+    >>> edition.jobname('Actes')
+    'Actes_SFT2021'
+    """
+
+    def __init__(self, root='./', name='SFT2021', site='CFT2021',
+                 year='2021', doi_prefix='10.25855',
+                 url='https://www.sft.asso.fr/DOIeditions/',
+                 publisher='Société Française de Thermique', export=None):
+        root = os.path.join(root, '')
+        self.root = root
+        self.name = name
+        self.site = site
+        self.year = year
+        self.doi_prefix = doi_prefix
+        self.url = url
+        self.publisher = publisher
+        self.filename_export = export or \
+            'openconf-'+name+'-submissions-all.csv'
+        self.path_exf = root+'Export_Files/'
+        self.path_extex = root+'Export_Tex/'
+        self.path_imoc = root+'Imports_OpenConf/'
+        self.path_export_html = root+'Export_HTML/'
+        self.path_abs = root+'Export_Tex/Abstracts/'
+        self.path_tex_html = root+'Export_Tex/Abstracts_Tex_HTML/'
+        self.path_json = root+'Export_Tex/Abstracts_JSON/'
+        self.path_html = root+'Export_HTML/Abstracts/'
+        self.path_pdf = root+'Imports_OpenConf/PDF_articles/'
+        self.path_xml = root+'Export_XML/'
+        self.path_xml_rejects = root+'Export_XML/Rejects/'
+        self.path_publish = root+'Export_Publish/'
+        self.path_schema = root+'Schemas/datacite-4.3/'
+
+    @classmethod
+    def load(cls, root='./'):
+        """
+        Édition décrite par root/edition.json (valeurs par défaut si le
+        fichier n'existe pas)
+        """
+        root = os.path.join(root, '')
+        params = {}
+        if os.path.isfile(root+'edition.json'):
+            with open(root+'edition.json', 'r',
+                      encoding='utf-8') as file_edition:
+                params = json.load(file_edition)
+        return cls(root, **params)
+
+    def __repr__(self):
+        return "Edition("+self.name+", "+self.root+")"
+
+    def doi(self, num_id):
+        return self.doi_prefix+'/'+self.name+'-'+str(num_id).zfill(3)
+
+    @property
+    def base_url(self):
+        """
+        Adresse des pages HTML des abstracts
+        """
+        return self.url+self.site+'/Abstracts/'
+
+    @property
+    def pdf_url(self):
+        """
+        Adresse des PDF des articles avec DOI
+        """
+        return self.url+self.site+'/PDF/'
+
+    def jobname(self, kind):
+        """
+        Nom du PDF d'un recueil ('Resumes' ou 'Actes')
+        """
+        return kind+'_'+self.name
+
+    @property
+    def filename_batch(self):
+        return self.path_xml+self.name+'_datacite_all.xml'
+
+    @property
+    def filename_listing(self):
+        return self.path_xml+'listing_'+self.name+'_xml.txt'
+
+
+class Caches:
+    """
+    Caches partagés par toutes les éditions construites dans un même
+    processus : formats LaTeX précompilés (les polices chargées par le
+    préambule sont dans le format), conversions pandoc et métadonnées des
+    PDF. Une réédition ou une nouvelle année qui reprend les mêmes gabarits
+    ou les mêmes fichiers ne repart pas de zéro.
+
+    Parameters
+    ----------
+    path : String
+        Répertoire des caches sur disque (formats, pandoc).
+
+    Example
+    -------
+    >>> caches = Caches('./Cache/')
+    >>> fmt = caches.latex_format.get(filename_tex)
+    >>> pdf_index = PdfIndex(edition.path_pdf, edition.root+'pdf_index.json',
+                             caches.pdf_info)
+    """
+
+    def __init__(self, path):
+        self.path = os.path.join(path, '')
+        self.path_pandoc = self.path+'pandoc/'
+        # formats communs à toutes les éditions (un format par préambule)
+        self.latex_format = LatexFormat(path_formats=self.path+'Formats/')
+        # {chemin réel du PDF : métadonnées (voir pdf_index.pdf_info)}
+        self.pdf_info = {}
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:40:12 2026
+
+@author: phil
+
+Format LaTeX précompilé pour le préambule commun des recueils (classe book
+et config.tex). Le préambule est « dumpé » une seule fois avec
+mylatexformat puis les documents sont compilés avec pdflatex -fmt.
+
+Dans les gabarits, le préambule dumpé s'arrête à la ligne
+
+    \\providecommand{\\endofdump}{}\\endofdump
+
+ce qui suit (hypersetup, \\newcommand...) est lu normalement à chaque
+compilation. Sans format, cette ligne ne fait rien.
+"""
+import hashlib
+import os
+import re
+import subprocess
+import threading
+
+from manifest import hash_file
+from runner import TIMEOUT_PDFLATEX, run_command
+
+ENDOFDUMP = '\\providecommand{\\endofdump}{}\\endofdump'
+
+
+def read_preamble(filename_tex):
+    """
+    Fonction permettant de lire le préambule dumpable d'un document, jusqu'à
+    \\endofdump (ou \\begin{document} à défaut)
+
+    Parameters
+    ----------
+    filename_tex : String
+        Nom du fichier TeX.
+
+    Returns
+    -------
+    List_lines : List
+        Lignes du préambule sans les commentaires ni les lignes vides.
+
+    """
+    List_lines = []
+    with open(filename_tex, 'r', encoding='utf-8') as file_tex:
+        for line in file_tex:
+            line = re.sub(r'(?<!\\)%.*', '', line).strip()
+            if '\\endofdump' in line or '\\begin{document}' in line:
+                break
+            if line:
+                List_lines.append(line)
+    return List_lines
+
+
+def pdflatex_version():
+    try:
+        proc = subprocess.run(['pdflatex', '--version'], capture_output=True,
+                              text=True)
+    except OSError:
+        return None
+    return proc.stdout.split('\n')[0]
+
+
+class LatexFormat:
+    """
+    Formats précompilés stockés dans Export_Tex/Formats/ (ou dans le
+    répertoire path_formats partagé par plusieurs éditions, voir
+    edition.Caches). Un format est identifié par l'empreinte de son
+    préambule : la ligne \\documentclass, le contenu des fichiers \\input
+    (config.tex...) et la version de pdflatex. Il est reconstruit
+    automatiquement si l'un d'eux change, seuls les keep formats les plus
+    récents sont conservés.
+
+    Example
+    -------
+    >>> latex_format = LatexFormat('./Export_Tex/')
+    >>> fmt = latex_format.get('./Export_Tex/Recueil_Resume/Recueil_Resume.tex')
+    >>> latex_format.command('Recueil_Resume.tex', fmt)
+    ['pdflatex', '-fmt=/.../Formats/preamble-0123456789ab', ...]
+    """
+
+    keep = 8
+
+    def __init__(self, path_extex=None, path_formats=None):
+        if path_formats is None:
+            path_formats = path_extex+'Formats'
+        self.path_formats = os.path.abspath(path_formats)+'/'
+        self.version = pdflatex_version()
+        self.formats = {}
+        # plusieurs étapes (ou éditions) peuvent demander le même format
+        self.lock = threading.Lock()
+
+    def key(self, filename_tex):
+        """
+        Empreinte du préambule, indépendante des chemins relatifs utilisés
+        pour le \\input de config.tex
+        """
+        h = hashlib.sha256(str(self.version).encode('utf-8'))
+        path = os.path.dirname(os.path.abspath(filename_tex))
+        for line in read_preamble(filename_tex):
+            match = re.fullmatch(r'\\input\{(.+?)\}', line)
+            if match:
+                filename_in = os.path.join(path, match.group(1))
+                if not filename_in.endswith('.tex'):
+                    filename_in += '.tex'
+                line = hash_file(filename_in)
+            h.update(line.replace(' ', '').encode('utf-8'))
+        return h.hexdigest()[:12]
+
+    def get(self, filename_tex):
+        """
+        Fonction permettant de récupérer (et de construire si besoin) le
+        format correspondant au préambule d'un document
+
+        Parameters
+        ----------
+        filename_tex : String
+            Nom du document TeX (ou d'un document qui a le même préambule).
+
+        Returns
+        -------
+        String
+            Chemin absolu du format sans l'extension .fmt, None si pdflatex
+            ou mylatexformat ne sont pas disponibles (compilation classique).
+
+        """
+        if self.version is None:
+            return None
+        name = 'preamble-'+self.key(filename_tex)
+        with self.lock:
+            if name in self.formats:
+                return self.formats[name]
+            if not os.path.isfile(self.path_formats+name+'.fmt'):
+                if not self.dump(filename_tex, name):
+                    self.formats[name] = None
+                    return None
+            self.formats[name] = self.path_formats+name
+            return self.formats[name]
+
+    def dump(self, filename_tex, name):
+        """
+        Compile le format name à partir du préambule de filename_tex
+        """
+        os.makedirs(self.path_formats, exist_ok=True)
+        print("Construction du format LaTeX", name)
+        path, basename = os.path.split(os.path.abspath(filename_tex))
+        cmd = ['pdflatex', '-ini', '-interaction=nonstopmode',
+               '-output-directory='+self.path_formats, '-jobname='+name,
+               '&pdflatex', 'mylatexformat.ltx', basename]
+        job = run_command(cmd, path, TIMEOUT_PDFLATEX)
+        if not job.ok or not os.path.isfile(self.path_formats+name+'.fmt'):
+            print("ERREUR format LaTeX, compilation sans format")
+            print(job.log())
+            return False
+        self.prune()
+        return True
+
+    def prune(self):
+        """
+        Supprime les formats les plus anciens au-delà de keep
+        """
+        List_fmt = sorted((filename for filename in os.listdir(
+            self.path_formats) if filename.startswith('preamble-') and
+            filename.endswith('.fmt')), key=lambda filename: os.path.getmtime(
+                self.path_formats+filename), reverse=True)
+        for filename in List_fmt[self.keep:]:
+            for other in os.listdir(self.path_formats):
+                if other.startswith(filename[:-4]+'.'):
+                    os.remove(self.path_formats+other)
+
+    @staticmethod
+    def command(filename_tex, fmt=None):
+        """
+        Ligne de commande pdflatex pour un document, avec le format s'il
+        existe
+        """
+        cmd = ['pdflatex', '-interaction=nonstopmode', '-halt-on-error']
+        if fmt is not None:
+            cmd.append('-fmt='+fmt)
+        return cmd+[filename_tex]
+
+    @staticmethod
+    def latexmk_option(fmt=None):
+        """
+        Option de latexmk pour compiler avec le format
+        """
+        if fmt is None:
+            return ''
+        return '-pdflatex="pdflatex -fmt='+fmt+' %O %S" '
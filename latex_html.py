@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:41:18 2026
+
+@author: phil
+
+Rendu HTML5 des abstracts sans passer par pandoc. Seul le sous-ensemble de
+LaTeX produit par make_recueils.Abstract (et clean_dict) est reconnu :
+\\textbf, \\url, \\href, \\si, \\chemform, les maths en ligne, \\\\, l'environnement
+flushleft... Toute autre commande lève UnsupportedLatex et l'appelant se
+rabat sur pandoc.
+"""
+import html
+import re
+
+
+class UnsupportedLatex(Exception):
+    """
+    Commande ou environnement LaTeX que le moteur ne sait pas rendre
+    """
+
+
+HTML_HEADER = """<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" lang="fr" xml:lang="fr">
+<head>
+  <meta charset="utf-8" />
+  <meta name="generator" content="pandoc" />
+  <meta name="viewport" content="width=device-width, initial-scale=1.0, user-scalable=yes" />
+  <title>{title}</title>
+  <style>
+    code{{white-space: pre-wrap;}}
+    span.smallcaps{{font-variant: small-caps;}}
+    span.underline{{text-decoration: underline;}}
+    div.column{{display: inline-block; vertical-align: top; width: 50%;}}
+    div.hanging-indent{{margin-left: 1.5em; text-indent: -1.5em;}}
+    ul.task-list{{list-style: none;}}
+  </style>
+  <link rel="stylesheet" href="{css}" />
+</head>
+<body>
+"""
+
+HTML_FOOTER = """</body>
+</html>
+"""
+
+# Commandes sans effet en HTML (taille de police, mise en page...)
+IGNORED = {'noindent', 'vfill', 'normalsize', 'footnotesize', 'small',
+           'large', 'Large', 'LARGE', 'huge', 'newpage', 'clearpage',
+           'cleardoublepage', 'BgThispage', 'phantomsection', 'centering',
+           'sloppy', 'par'}
+# Commandes ignorées avec leur nombre d'arguments
+IGNORED_ARGS = {'label': 1, 'index': 1, 'backgroundsetup': 1,
+                'SetBgContents': 1, 'addtocounter': 2, 'addcontentsline': 3}
+# Caractères échappés et symboles en mode texte
+TEXT_SYMBOLS = {'_': '_', '&': '&amp;', '%': '%', '$': '$', '#': '#',
+                '{': '{', '}': '}', ',': '\u202f', ' ': ' ', 'Letter': '✉',
+                'dC': '\u202f°C', 'ldots': '…', 'dots': '…'}
+INLINE_TAGS = {'textbf': 'strong', 'textit': 'em', 'emph': 'em'}
+
+MATH_SYMBOLS = {'alpha': 'α', 'beta': 'β', 'gamma': 'γ', 'delta': 'δ',
+                'epsilon': 'ϵ', 'varepsilon': 'ε', 'zeta': 'ζ', 'eta': 'η',
+                'theta': 'θ', 'kappa': 'κ', 'lambda': 'λ', 'mu': 'μ',
+                'nu': 'ν', 'xi': 'ξ', 'pi': 'π', 'rho': 'ρ', 'sigma': 'σ',
+                'tau': 'τ', 'phi': 'ϕ', 'varphi': 'φ', 'chi': 'χ',
+                'psi': 'ψ', 'omega': 'ω', 'Gamma': 'Γ', 'Delta': 'Δ',
+                'Theta': 'Θ', 'Lambda': 'Λ', 'Pi': 'Π', 'Sigma': 'Σ',
+                'Phi': 'Φ', 'Psi': 'Ψ', 'Omega': 'Ω', 'circ': '∘',
+                'cdot': '⋅', 'times': '×', 'pm': '±', 'star': '⋆',
+                'leqslant': '⩽', 'geqslant': '⩾', 'leq': '≤', 'geq': '≥',
+                'le': '≤', 'ge': '≥', 'approx': '≈', 'sim': '∼',
+                'infty': '∞', 'partial': '∂', 'nabla': '∇', 'dC': '°C',
+                ',': '\u2006', ';': '\u2005', ' ': ' ', '%': '%'}
+MATH_UPRIGHT = {'mathrm', 'mathsf', 'text', 'textrm', 'unit'}
+
+SI_PREFIXES = {'nano': 'n', 'micro': 'μ', 'milli': 'm', 'centi': 'c',
+               'kilo': 'k', 'mega': 'M', 'giga': 'G'}
+SI_UNITS = {'metre': 'm', 'meter': 'm', 'watt': 'W', 'kelvin': 'K',
+            'volt': 'V', 'second': 's', 'joule': 'J', 'gram': 'g',
+            'pascal': 'Pa', 'ampere': 'A', 'hertz': 'Hz', 'litre': 'L',
+            'liter': 'L', 'newton': 'N', 'degreeCelsius': '°C',
+            'percent': '%', 'hour': 'h', 'minute': 'min'}
+SI_POWERS = {'square': 2, 'cubic': 3}
+SI_POSTPOWERS = {'squared': 2, 'cubed': 3}
+
+RE_COMMENT = re.compile(r'(?<!\\)%[^\n]*\n?[ \t]*')
+RE_COMMAND = re.compile(r'\\([a-zA-Z]+\*?|.)')
+RE_WORD = re.compile(r'[a-zA-Z]+')
+
+
+def strip_comments(tex):
+    """
+    Fonction permettant de supprimer les commentaires LaTeX. Comme en TeX le
+    % consomme aussi la fin de ligne et les blancs de la ligne suivante.
+    """
+    return RE_COMMENT.sub('', tex)
+
+
+class _Parser:
+    """
+    Analyseur récursif du sous-ensemble LaTeX des abstracts. Le résultat est
+    une liste de morceaux HTML en ligne et de marqueurs de blocs.
+    """
+    PAR = ('par',)
+
+    def __init__(self, tex):
+        self.s = tex
+        self.i = 0
+
+    # -- Lecture ------------------------------------------------------------
+    def peek(self):
+        return self.s[self.i] if self.i < len(self.s) else ''
+
+    def skip_spaces(self, newline=True):
+        while self.i < len(self.s) and self.s[self.i] in ' \t' + \
+                ('\n' if newline else ''):
+            self.i += 1
+
+    def command(self):
+        match = RE_COMMAND.match(self.s, self.i)
+        if match is None:
+            raise UnsupportedLatex('\\ en fin de texte')
+        self.i = match.end()
+        name = match.group(1)
+        if name.isalpha():
+            self.skip_spaces(newline=False)
+        return name
+
+    def group(self):
+        """
+        Renvoie le texte brut d'un argument {...} (accolades équilibrées)
+        """
+        self.skip_spaces()
+        if self.peek() != '{':
+            if self.i >= len(self.s):
+                raise UnsupportedLatex('argument manquant')
+            # argument d'un seul caractère
+            self.i += 1
+            return self.s[self.i-1]
+        depth = 0
+        start = self.i
+        while self.i < len(self.s):
+            c = self.s[self.i]
+            if c == '\\':
+                self.i += 2
+                continue
+            if c == '{':
+                depth += 1
+            elif c == '}':
+                depth -= 1
+                if depth == 0:
+                    self.i += 1
+                    return self.s[start+1:self.i-1]
+            self.i += 1
+        raise UnsupportedLatex('accolade non fermée')
+
+    def optional(self):
+        """
+        Consomme un argument optionnel [...] s'il est présent
+        """
+        save = self.i
+        self.skip_spaces()
+        if self.peek() == '[':
+            end = self.s.find(']', self.i)
+            if end < 0:
+                raise UnsupportedLatex('crochet non fermé')
+            self.i = end + 1
+        else:
+            self.i = save
+
+    # -- Mode texte ---------------------------------------------------------
+    def parse(self):
+        items = []
+        text = []
+
+        def flush():
+            if text:
+                items.append(smart(''.join(text)))
+                text.clear()
+
+        while self.i < len(self.s):
+            c = self.s[self.i]
+            if c in ' \t\n':
+                start = self.i
+                self.skip_spaces()
+                if self.s.count('\n', start, self.i) >= 2:
+                    flush()
+                    items.append(self.PAR)
+                else:
+                    text.append(' ')
+            elif c in '{}':
+                # groupes sans commande : seules des déclarations de taille
+                # y figurent, ils sont transparents en HTML
+                self.i += 1
+            elif c == '~':
+                text.append('\xa0')
+                self.i += 1
+            elif c == '$':
+                flush()
+                items.append(self.math_inline())
+            elif c == '\\':
+                flush()
+                items.extend(self.text_command())
+            else:
+                text.append(html.escape(c, quote=False))
+                self.i += 1
+        flush()
+        return items
+
+    def inline(self, tex):
+        """
+        Rendu d'un argument : pas de paragraphe ni d'environnement
+        """
+        items = _Parser(tex).parse()
+        if any(isinstance(item, tuple) for item in items):
+            raise UnsupportedLatex('bloc dans un argument')
+        return ''.join(items)
+
+    def text_command(self):
+        name = self.command()
+        if name == '\\':
+            self.optional()
+            return ['<br />']
+        if name in IGNORED:
+            return []
+        if name in IGNORED_ARGS:
+            for _ in range(IGNORED_ARGS[name]):
+                self.group()
+            return []
+        if name in TEXT_SYMBOLS:
+            return [TEXT_SYMBOLS[name]]
+        if name in INLINE_TAGS:
+            tag = INLINE_TAGS[name]
+            return ['<'+tag+'>'+self.inline(self.group())+'</'+tag+'>']
+        if name == 'url':
+            url = unescape(self.group())
+            return ['<a href="'+html.escape(url)+'" class="uri">' +
+                    html.escape(url, quote=False)+'</a>']
+        if name == 'href':
+            url = unescape(self.group())
+            return ['<a href="'+html.escape(url)+'">' +
+                    self.inline(self.group())+'</a>']
+        if name == 'si':
+            return [si(self.group())]
+        if name == 'chemform':
+            return [chemform(self.group())]
+        if name in ('begin', 'end'):
+            env = self.group()
+            if env != 'flushleft':
+                raise UnsupportedLatex('environnement '+env)
+            return [(name, env)]
+        raise UnsupportedLatex('\\'+name)
+
+    # -- Mode mathématique --------------------------------------------------
+    def math_inline(self):
+        end = self.s.find('$', self.i+1)
+        while end > 0 and self.s[end-1] == '\\':
+            end = self.s.find('$', end+1)
+        if end < 0:
+            raise UnsupportedLatex('$ non fermé')
+        tex = self.s[self.i+1:end]
+        self.i = end + 1
+        return '<span class="math inline">'+math(tex)+'</span>'
+
+
+def smart(text):
+    """
+    Ligatures typographiques de LaTeX (-- et ---)
+    """
+    return text.replace('---', '—').replace('--', '–')
+
+
+def unescape(tex):
+    """
+    Supprime les échappements LaTeX d'une URL
+    """
+    return re.sub(r'\\([_&%#$])', r'\1', tex)
+
+
+def math(tex, upright=False):
+    """
+    Fonction permettant de rendre une formule mathématique en ligne en HTML
+    (équivalent du mode par défaut de pandoc sans MathJax)
+
+    Parameters
+    ----------
+    tex : String
+        Contenu de la formule sans les $.
+    upright : Boolean, optional
+        Si vrai les lettres ne sont pas en italique. The default is False.
+
+    Returns
+    -------
+    String
+        Formule HTML.
+
+    """
+    p = _Parser(tex)
+    out = []
+    while p.i < len(p.s):
+        c = p.s[p.i]
+        if c.isalpha():
+            match = RE_WORD.match(p.s, p.i)
+            p.i = match.end()
+            word = match.group(0)
+            out.append(word if upright else '<em>'+word+'</em>')
+        elif c in '^_':
+            p.i += 1
+            tag = 'sup' if c == '^' else 'sub'
+            arg = p.group()
+            if arg.startswith('\\') and arg[1:] in MATH_SYMBOLS:
+                inner = MATH_SYMBOLS[arg[1:]]
+            else:
+                inner = math(arg, upright)
+            out.append('<'+tag+'>'+inner+'</'+tag+'>')
+        elif c == '{':
+            out.append(math(p.group(), upright))
+        elif c == '\\':
+            name = p.command()
+            if name in MATH_SYMBOLS:
+                out.append(MATH_SYMBOLS[name])
+            elif name in MATH_UPRIGHT:
+                prefix = '\u2006' if name == 'unit' else ''
+                out.append(prefix+math(p.group(), upright=True))
+            elif name == 'si':
+                out.append(si(p.group()))
+            else:
+                raise UnsupportedLatex('\\'+name+' en mode math')
+        elif c == '-':
+            out.append('−')
+            p.i += 1
+        elif c in ' \t\n':
+            p.i += 1
+        else:
+            out.append(html.escape(c, quote=False))
+            p.i += 1
+    return ''.join(out)
+
+
+def si(tex):
+    """
+    Fonction permettant de rendre une unité siunitx (\\si{...}) en HTML
+
+    Example
+    -------
+    >>> si('\\\\watt\\\\per\\\\square\\\\meter')
+    'W\\u202fm<sup>−2</sup>'
+    """
+    units = []
+    power = 1
+    sign = 1
+    prefix = ''
+    for match in re.finditer(r'\\([a-zA-Z]+)|([^\s\\]+)', tex):
+        name, text = match.groups()
+        if text is not None:
+            units.append([prefix+html.escape(text, quote=False), sign*power])
+        elif name == 'per':
+            sign = -1
+            continue
+        elif name in SI_POWERS:
+            power = SI_POWERS[name]
+            continue
+        elif name in SI_POSTPOWERS:
+            if not units:
+                raise UnsupportedLatex('\\'+name+' sans unité')
+            units[-1][1] *= SI_POSTPOWERS[name]
+            continue
+        elif name in SI_PREFIXES:
+            prefix = SI_PREFIXES[name]
+            continue
+        elif name in SI_UNITS:
+            units.append([prefix+SI_UNITS[name], sign*power])
+        else:
+            raise UnsupportedLatex('\\si{\\'+name+'}')
+        power, sign, prefix = 1, 1, ''
+    return '\u202f'.join(u if p == 1 else
+                         u+'<sup>'+str(p).replace('-', '−')+'</sup>'
+                         for u, p in units)
+
+
+def chemform(tex):
+    """
+    Fonction permettant de rendre une formule chimique (\\chemform{CO_2})
+    """
+    out = re.sub(r'_\{([^}]*)\}|_(\w)',
+                 lambda m: '<sub>'+(m.group(1) or m.group(2))+'</sub>',
+                 html.escape(tex, quote=False))
+    if '\\' in out or '^' in out:
+        raise UnsupportedLatex('\\chemform{'+tex+'}')
+    return out
+
+
+def render_text(tex):
+    """
+    Fonction permettant de convertir un titre ou des mots clés LaTeX en texte
+    brut (site statique, index de recherche) : \\chemform{NH_3} donne NH3
+    et CO$_2$ donne CO2. Les commandes inconnues sont supprimées.
+
+    Parameters
+    ----------
+    tex : String
+        Texte LaTeX sans paragraphe.
+
+    Returns
+    -------
+    String
+        Texte brut.
+
+    """
+    try:
+        out = ''.join(item for item in _Parser(strip_comments(tex)).parse()
+                      if isinstance(item, str))
+    except UnsupportedLatex:
+        out = html.escape(re.sub(r'\\[a-zA-Z]+\s*|[{}$^_~\\]', '', tex),
+                          quote=False)
+    return ' '.join(html.unescape(re.sub(r'<[^>]*>', '', out)).split())
+
+
+def render_body(tex):
+    """
+    Fonction permettant de rendre le corps d'un abstract (entre
+    \\begin{document} et \\end{document}) en HTML
+
+    Parameters
+    ----------
+    tex : String
+        Corps du document LaTeX.
+
+    Returns
+    -------
+    String
+        Fragment HTML (paragraphes et div.flushleft).
+
+    """
+    items = _Parser(strip_comments(tex)).parse()
+    out = []
+    para = []
+
+    def flush():
+        text = ''.join(para).strip()
+        if text:
+            out.append('<p>'+text+'</p>')
+        para.clear()
+
+    for item in items:
+        if item == _Parser.PAR:
+            flush()
+        elif isinstance(item, tuple):
+            flush()
+            out.append('<div class="'+item[1]+'">' if item[0] == 'begin'
+                       else '</div>')
+        else:
+            para.append(item)
+    flush()
+    return '\n'.join(out)+'\n'
+
+
+def render_document(tex, title, css='markdown-pandoc.css'):
+    """
+    Fonction permettant de générer une page HTML5 complète, avec la même
+    structure que la sortie de pandoc -s -t html5 -c css
+
+    Parameters
+    ----------
+    tex : String
+        Corps du document LaTeX.
+    title : String
+        Titre de la page (pandoc prend le nom du fichier).
+    css : String, optional
+        Feuille de style. The default is 'markdown-pandoc.css'.
+
+    Returns
+    -------
+    String
+        Page HTML.
+
+    """
+    return HTML_HEADER.format(title=html.escape(title), css=css) + \
+        render_body(tex) + HTML_FOOTER
@@ -6,8 +6,12 @@ Created on Thu Apr 30 11:05:06 2021
 @author: phil
 """
 # from io import StringIO
+import json
 import os
 import re
+import urllib.request
+from shutil import copyfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from lxml import etree
 from xml.dom import minidom
 import unicodedata
@@ -15,6 +19,15 @@ import csv
 
 import fitz
 
+import latex_html
+from author_index import AuthorIndex
+from edition import Edition
+from manifest import Manifest
+from manifest import hash_file
+from registry import Registry
+from runner import TIMEOUT_PANDOC, Job, run_jobs
+from tracing import Profiler, timed, tracer
+
 
 def commentline(L, nums_row):
     """
@@ -67,80 +80,304 @@ def uncommentline(L, nums_row):
     return L
 
 
-def textohtml(filename_abstex):
+def pandoc_job(edition, filename_abstex):
     """
-    Fonction permettant de générer un fichier LaTex et HTML d'un abstract donné.
-    Le fichier TeX est différent de celui du recueil des résumés. On charge le 
-    fichier initial que l'on modifie pour en faire un document complet qui peut
-    ensuite compilé en HTML à l'aide de pandoc
+    Conversion pandoc d'un abstract (fichier de edition.path_tex_html) en
+    HTML
+    """
+    cmd = ['/usr/bin/pandoc', '--quiet', '-s', '-f', 'latex', '-t', 'html5',
+           '-c', 'markdown-pandoc.css', '--metadata', 'charset=utf-8',
+           filename_abstex, '-o',
+           os.path.abspath(edition.path_html+filename_abstex[:-3]+'html')]
+    return Job(filename_abstex, cmd, edition.path_tex_html, TIMEOUT_PANDOC)
+
+
+def pandoc_key(edition, filename_abstex):
+    """
+    Empreinte d'une conversion pandoc (document TeX complet), commune à
+    toutes les éditions pour le cache partagé
+    """
+    return hash_file(edition.path_tex_html+filename_abstex)
+
+
+def html_lines(edition, filename_abstex, with_pdf=False):
+    """
+    Fonction permettant de transformer le fichier TeX d'un abstract du
+    recueil des résumés en document complet pour le HTML
 
     Parameters
     ----------
+    edition : Edition
+        Édition du congrès (répertoires, adresse des PDF).
     filename_abstex : Str
         Nom du fichier TeX d'un abstract qui se trouve dans le recueil des
         résumés.
+    with_pdf : Bool, optional
+        Vrai si le papier a un PDF avec DOI (lien de téléchargement).
+        The default is False.
 
     Returns
     -------
-    None.
-        Création de fichiers .tex et. html
+    L_text : List
+        Lignes du document complet.
+    L_body : List
+        Lignes du corps du document.
 
     """
-    testtex = open(path+filename_abstex, "r", encoding='utf-8')
+    testtex = open(edition.path_abs+filename_abstex, "r", encoding='utf-8')
     L_text = testtex.readlines()
     testtex.close()
+    # Les métadonnées (titre, auteurs...) sont lues dans le fichier JSON
+    # écrit par make_recueils, il suffit ici de repérer la ligne du titre
     ind_title = L_text.index('\\phantomsection\\addtocounter{section}{1}\n')+1
-    title = L_text[ind_title][31:-2]
-    ind_affiliation = L_text.index("[4mm]\n")
-    ind_auteurs = L_text.index('% Auteurs\n')+1
-    L_affiliation = L_text[ind_auteurs+2:ind_affiliation]
-    L_affiliation = [(el[18], el[22:-4]) for el in L_affiliation]
-    auteurs = L_text[ind_auteurs].split('}$, ')
-    L = []
-    for s in auteurs:
-        pos = s.index("$^{")
-        aff_num = s[pos+3]
-        if s.count("\\star") > 0:
-            L.append((aff_num, s[:pos], "ref"))
-        else:
-            L.append((aff_num, s[:pos]))
-    auteurs = L
-    # print(auteurs)
-    del(L)
     num_id = filename_abstex[1:-4]
     L_text = commentline(L_text, list(range(ind_title+1)))
     L_text = uncommentline(L_text, ind_title-2)
     L_text[ind_title+1] = L_text[ind_title +
                                  1][:L_text[ind_title+1].find("label{")-1]+'\n'
+    if with_pdf:
+        L_text = L_text + ["\\vfill PDF : \\href{"+edition.pdf_url +
+                           num_id+"_doi.pdf}{download}"]
+    L_body = L_text
     L_text = ["\\begin{document}\n"] + L_text
     L_text = ["\input{../config_html.tex}\n"] + L_text
     L_text = ["\documentclass[a4paper]{article}\n"] + L_text
-    if os.path.isfile(path_pdf+num_id+'_doi.pdf'):
-        L_text = L_text + ["\\vfill PDF : \\href{https://www.sft.asso.fr/DOIeditions/CFT2021/PDF/" +
-                           num_id+"_doi.pdf}{download}"]
     L_text = L_text + ["\end{document}\n"]
+    return L_text, L_body
+
 
-    with open(path_tex_html + filename_abstex, 'w') as file_export_latex:
+def textohtml(edition, filename_abstex, with_pdf=False, run_pandoc=True):
+    """
+    Fonction permettant de générer un fichier LaTex et HTML d'un abstract donné.
+    Le fichier TeX est différent de celui du recueil des résumés. On charge le 
+    fichier initial que l'on modifie pour en faire un document complet qui peut
+    ensuite compilé en HTML à l'aide de latex_html ou de pandoc si le fichier
+    contient des commandes que latex_html ne connaît pas
+
+    Parameters
+    ----------
+    edition : Edition
+        Édition du congrès (répertoires, adresse des PDF).
+    filename_abstex : Str
+        Nom du fichier TeX d'un abstract qui se trouve dans le recueil des
+        résumés.
+    with_pdf : Bool, optional
+        Vrai si le papier a un PDF avec DOI (lien de téléchargement).
+        The default is False.
+    run_pandoc : Bool, optional
+        Si faux pandoc n'est pas lancé, la conversion est laissée à
+        l'appelant (voir pandoc_job). The default is True.
+
+    Returns
+    -------
+    Tuple
+        (filename_abstex, code de retour de pandoc, stderr de pandoc),
+        (filename_abstex, 0, '') en cas de rendu interne,
+        (filename_abstex, None, '') si pandoc est nécessaire et n'a pas été
+        lancé
+        Création de fichiers .tex et. html
+
+    """
+    L_text, L_body = html_lines(edition, filename_abstex, with_pdf)
+    with open(edition.path_tex_html + filename_abstex,
+              'w') as file_export_latex:
         file_export_latex.writelines(L_text)
-    os.chdir(path_tex_html)
     # print(title)
 
-    os.system('/usr/bin/pandoc --quiet -s -f latex -t html5 ' +
-              ' -c markdown-pandoc.css ' +
-              ' --metadata charset="utf-8" ' +
-              filename_abstex+' -o '+path_html+filename_abstex[:-3]+'html')
+    # Rendu interne, pandoc seulement pour ce que le moteur ne connaît pas
+    try:
+        page = latex_html.render_document(''.join(L_body),
+                                          filename_abstex[:-4])
+    except latex_html.UnsupportedLatex as err:
+        print("pandoc pour", filename_abstex, ":", err)
+    else:
+        with open(edition.path_html+filename_abstex[:-3]+'html', 'w',
+                  encoding='utf-8') as file_html:
+            file_html.write(page)
+        return filename_abstex, 0, ''
+
+    if not run_pandoc:
+        return filename_abstex, None, ''
+    job = pandoc_job(edition, filename_abstex)
+    run_jobs([job], 1, report=False)
+    return filename_abstex, job.returncode, job.log()
+
+
+def register(registry, filetex, kind, filename, missing=False):
+    """
+    Enregistre le fichier produit pour un abstract dans le registre avec son
+    empreinte. Si missing est vrai le fichier n'est enregistré que s'il n'y
+    est pas déjà (fichier à jour dans le manifeste).
+    """
+    num_id = int(filetex[1:-4])
+    if missing and registry.artifact(num_id, kind) is not None:
+        return
+    registry.set_artifact(num_id, kind, filename, hash_file(filename))
 
 
-def extractdata_abs(filename_abstex_for_html):
+def register_all(registry, List_register):
+    """
+    Enregistre en une seule transaction courte les fichiers produits par un
+    pool, une fois le pool terminé : la base n'est pas verrouillée en
+    écriture pendant les conversions (les étapes html et xml tournent en
+    même temps avec chacune sa connexion)
+
+    Parameters
+    ----------
+    registry : Registry
+        Registre des fichiers produits.
+    List_register : List
+        Liste des (filetex, kind, fichier), fichier None pour retirer le
+        fichier kind du registre.
+
+    Returns
+    -------
+    None.
+
+    """
+    for filetex, kind, filename in List_register:
+        if filename is None:
+            registry.remove_artifact(int(filetex[1:-4]), kind)
+        else:
+            register(registry, filetex, kind, filename)
+    registry.commit()
+
+
+def all_textohtml(edition, List_filetex, nb_workers=None, manifest=None,
+                  registry=None, doi_ids=None, path_cache=None):
+    """
+    Fonction permettant de générer en parallèle les fichiers HTML de tous
+    les abstracts à l'aide d'un pool de processus
+
+    Parameters
+    ----------
+    edition : Edition
+        Édition du congrès (répertoires, adresse des PDF).
+    List_filetex : List
+        Liste des noms de fichiers TeX des abstracts.
+    nb_workers : Int, optional
+        Nombre de processus. The default is None (nombre de coeurs).
+    manifest : Manifest, optional
+        Manifeste de construction, seuls les abstracts dont le TeX,
+        config_html.tex ou le PDF DOI ont changé sont convertis.
+        The default is None.
+    registry : Registry, optional
+        Registre où les fichiers HTML produits sont enregistrés.
+        The default is None.
+    doi_ids : Set, optional
+        N° des papiers avec un PDF tagué. The default is None (lus dans le
+        registre).
+    path_cache : String, optional
+        Cache des conversions pandoc partagé entre les éditions
+        (voir edition.Caches) : un document déjà converti est recopié.
+        The default is None.
+
+    Returns
+    -------
+    errors : Dict
+        Dictionnaire des fichiers en échec avec en valeur le tuple
+        (code de retour, stderr de pandoc)
+
+    """
+    if doi_ids is None:
+        doi_ids = registry.doi_ids() if registry is not None else set()
+    path_html = edition.path_html
+    errors = {}
+    keys = {}
+    List_todo = List_filetex
+    if manifest is not None:
+        List_todo = []
+        config_html = manifest.file(edition.path_extex+'config_html.tex')
+        for filetex in List_filetex:
+            key = manifest.digest(manifest.file(edition.path_abs+filetex),
+                                  config_html,
+                                  int(filetex[1:-4]) in doi_ids)
+            if not manifest.uptodate('textohtml',
+                                     path_html+filetex[:-3]+'html', key):
+                keys[filetex] = key
+                List_todo.append(filetex)
+            elif registry is not None:
+                register(registry, filetex, 'html', path_html+filetex[:-3] +
+                         'html', missing=True)
+        if registry is not None:
+            registry.commit()
+
+    List_register = []
+
+    def done(filetex, returncode, stderr):
+        if returncode != 0:
+            errors[filetex] = (returncode, stderr)
+            return
+        if path_cache is not None and filetex in pandoc_keys:
+            os.makedirs(path_cache, exist_ok=True)
+            copyfile(path_html+filetex[:-3]+'html',
+                     path_cache+pandoc_keys[filetex]+'.html')
+        if manifest is not None:
+            manifest.update('textohtml', path_html+filetex[:-3]+'html',
+                            keys[filetex])
+        List_register.append((filetex, 'html', path_html+filetex[:-3]+'html'))
+
+    # les abstracts que le moteur interne ne sait pas rendre sont convertis
+    # par pandoc ensuite, avec au plus nb_workers processus pandoc en même
+    # temps et un délai maximal par conversion
+    List_pandoc = []
+    pandoc_keys = {}
+    with ProcessPoolExecutor(max_workers=nb_workers) as executor:
+        jobs = {executor.submit(timed, textohtml, edition, filetex,
+                                int(filetex[1:-4]) in doi_ids, False): filetex
+                for filetex in List_todo}
+        for job in as_completed(jobs):
+            try:
+                filetex, returncode, stderr = tracer.collect(
+                    job.result(), 'textohtml', num_id=int(jobs[job][1:-4]))
+            except Exception as err:
+                filetex, returncode, stderr = jobs[job], -1, repr(err)
+            if returncode is None and path_cache is not None:
+                key = pandoc_key(edition, filetex)
+                if os.path.isfile(path_cache+key+'.html'):
+                    copyfile(path_cache+key+'.html',
+                             path_html+filetex[:-3]+'html')
+                    returncode = 0
+                else:
+                    pandoc_keys[filetex] = key
+            if returncode is None:
+                List_pandoc.append(pandoc_job(edition, filetex))
+            else:
+                done(filetex, returncode, stderr)
+
+    with tracer.span('pandoc', nb=len(List_pandoc)):
+        run_jobs(List_pandoc, nb_workers, report=False)
+    for job in List_pandoc:
+        tracer.add('pandoc', job.start, job.start+job.duration,
+                   num_id=int(job.name[1:-4]))
+        done(job.name, job.returncode, job.log())
+    if registry is not None:
+        register_all(registry, List_register)
+
+    for filetex in sorted(errors):
+        returncode, stderr = errors[filetex]
+        print("ERREUR pandoc", filetex, "code", returncode)
+        print(stderr.strip())
+    print(len(List_todo)-len(errors), "/", len(List_todo),
+          "fichiers HTML générés")
+    return errors
+
+
+def extractdata_abs(edition, filename_abstex_for_html, L_text=None):
     """
     Fonction permettant d'extraire les données d'un fichier TeX d'un abstract 
     pour HTML.  
 
     Parameters
     ----------
+    edition : Edition
+        Édition du congrès (répertoires).
     filename_abstex_for_html : Str
         Nom du fichier TeX d'un abstract qui se trouve dans le répertoire 
         des fichiers TeX pour le HTML.
+    L_text : List, optional
+        Lignes du fichier TeX pour le HTML (voir html_lines).
+        The default is None (lues dans edition.path_tex_html).
 
     Returns
     -------
@@ -149,10 +386,11 @@ def extractdata_abs(filename_abstex_for_html):
         [filename_abstex_for_html, title, auteurs, resume, keywords].
 
     """
-    testtex = open(path_tex_html+filename_abstex_for_html,
-                   "r", encoding='utf-8')
-    L_text = testtex.readlines()
-    testtex.close()
+    if L_text is None:
+        testtex = open(edition.path_tex_html+filename_abstex_for_html,
+                       "r", encoding='utf-8')
+        L_text = testtex.readlines()
+        testtex.close()
     ind_auteurs = list(
         range(L_text.index('%% Indexations\n')+1, L_text.index('%% Titre\n')-1))
     auteurs = []
@@ -174,35 +412,180 @@ def extractdata_abs(filename_abstex_for_html):
 
     keywords = re.split(";|,", L_text[L_text.index("% Résumé\n")-2][32:-8])
 
-    for auteur in auteurs:
+    # n° de la première affiliation de chaque auteur, dans l'ordre de
+    # l'index (les noms de l'index n'ont pas toujours les accents du texte),
+    # sans numéro pour un auteur sans affiliation
+    List_ch_auteur = line_auteurs.split('\\\\')[0].split(', ')
+    for auteur, ch_auteur in zip(auteurs, List_ch_auteur):
         # print(auteur)
-        aff_num = int(line_auteurs[line_auteurs.index(
-            auteur[0]+"$")+len(auteur[0])+3])
-        aff = L_text[ind_affiliation[aff_num-1]].split('}$ ')[1][:-4]
+        aff_num = re.search(r'\$\^\{([0-9]+)', ch_auteur)
+        aff = ''
+        if aff_num is not None:
+            aff = L_text[ind_affiliation[int(aff_num.group(1))-1]]
+            aff = aff.split('}$ ')[1][:-4]
         auteur.append(aff)
     return [filename_abstex_for_html, title, auteurs, resume, keywords]
 
 
-def writexml(filename_abstex_for_html):
+def extractdata_tex(edition, filename_abstex):
+    """
+    Données d'un abstract relues dans son fichier TeX du recueil (TeX
+    corrigé à la main), même format que extractdata_abs
+    """
+    return extractdata_abs(edition, filename_abstex,
+                           html_lines(edition, filename_abstex, True)[0])
+
+
+def sidecar_uptodate(edition, filename_abstex):
     """
-    Fonction qui crée un fichier XML à partir d'un fichier TeX
+    Vrai si le fichier JSON d'un abstract a été écrit avec le fichier TeX
+    actuel (TeX non corrigé à la main depuis, voir make_recueils.Abstract).
+    Les fichiers JSON sans empreinte du TeX sont comparés par date.
+    """
+    filename_json = edition.path_json+filename_abstex[:-4]+'.json'
+    filename_abstex = edition.path_abs+filename_abstex
+    if not os.path.isfile(filename_json):
+        return False
+    with open(filename_json, 'r', encoding='utf-8') as file_json:
+        data = json.load(file_json)
+    if 'tex_sha256' not in data:
+        return os.path.getmtime(filename_json) >= \
+            os.path.getmtime(filename_abstex)
+    return data['tex_sha256'] == hash_file(filename_abstex)
+
+
+def extractdata_json(edition, filename_abstex_for_html):
+    """
+    Fonction permettant de lire les données d'un abstract dans le fichier
+    JSON écrit par make_recueils.Abstract, sans relire le fichier TeX
 
     Parameters
     ----------
+    edition : Edition
+        Édition du congrès (répertoires).
     filename_abstex_for_html : Str
-        Nom du fichier TeX d'un abstract qui se trouve dans le répertoire 
-        des fichiers TeX pour le HTML.
+        Nom du fichier TeX d'un abstract (p1.tex pour p1.json).
+
+    Returns
+    -------
+    list
+        Même format que extractdata_abs :
+        [filename_abstex_for_html, title, auteurs, resume, keywords].
+
+    """
+    with open(edition.path_json+filename_abstex_for_html[:-4]+'.json', 'r',
+              encoding='utf-8') as file_json:
+        data = json.load(file_json)
+    auteurs = [author[:3] for author in data['authors']]
+    keywords = [k.strip() for k in re.split(";|,", data['keywords'])]
+    return [filename_abstex_for_html, data['title'], auteurs,
+            data['abstract'], keywords]
+
+
+DATACITE_URL = "https://schema.datacite.org/meta/kernel-4.3/"
+DATACITE_NS = "http://datacite.org/schema/kernel-4"
+
+
+def fetch_schema(path_schema, url=DATACITE_URL, filename_xsd='metadata.xsd'):
+    """
+    Fonction permettant de recopier localement le schéma DataCite et tous les
+    fichiers qu'il inclut. Les fichiers déjà présents ne sont pas
+    téléchargés à nouveau.
+
+    Parameters
+    ----------
+    path_schema : String
+        Répertoire local du schéma.
+    url : String, optional
+        Adresse du schéma. The default is DATACITE_URL.
+    filename_xsd : String, optional
+        Fichier XSD à recopier. The default is 'metadata.xsd'.
 
     Returns
     -------
     None.
-        Création d'un fichier XML.
 
     """
-    rawdata = extractdata_abs(filename_abstex_for_html)
-    num_id = rawdata[0][1:-4].zfill(3)
+    filename_local = path_schema+filename_xsd
+    if not os.path.isfile(filename_local):
+        os.makedirs(os.path.dirname(filename_local), exist_ok=True)
+        with urllib.request.urlopen(url+filename_xsd) as response:
+            data = response.read()
+        with open(filename_local, 'wb') as file_xsd:
+            file_xsd.write(data)
+    xsd = etree.parse(filename_local)
+    path_xsd = os.path.dirname(filename_xsd)
+    for node in xsd.iterfind('{http://www.w3.org/2001/XMLSchema}*'):
+        location = node.get('schemaLocation')
+        if node.tag.split('}')[1] in ('include', 'import') and location \
+                and '://' not in location:
+            fetch_schema(path_schema, url,
+                         os.path.normpath(os.path.join(path_xsd, location)))
+
+
+def load_schema(path_schema):
+    """
+    Fonction permettant de compiler le schéma DataCite local
+
+    Parameters
+    ----------
+    path_schema : String
+        Répertoire local du schéma.
+
+    Returns
+    -------
+    etree.XMLSchema
+        Schéma compilé. RuntimeError si le schéma n'est pas dans
+        path_schema : aucun XML n'est écrit sans être validé.
+
+    """
+    if not os.path.isfile(path_schema+'metadata.xsd'):
+        raise RuntimeError("schéma DataCite absent de "+path_schema +
+                           " (voir fetch_schema)")
+    return etree.XMLSchema(etree.parse(path_schema+'metadata.xsd'))
+
+
+def init_xml(path_schema):
+    """
+    Initialisation d'un processus de travail pour les XML : schéma DataCite
+    compilé une seule fois par processus
+    """
+    globals()['schema'] = load_schema(path_schema)
+
+
+def record_xml(edition, filename_abstex_for_html, creators=None):
+    """
+    Fonction qui construit l'enregistrement DataCite d'un abstract à partir
+    de son fichier JSON (ou de son fichier TeX si le JSON n'existe pas)
+
+    Parameters
+    ----------
+    edition : Edition
+        Édition du congrès (DOI, éditeur, année).
+    filename_abstex_for_html : Str
+        Nom du fichier TeX d'un abstract qui se trouve dans le répertoire
+        des fichiers TeX pour le HTML.
+    creators : List, optional
+        Auteurs [nom, prénom, affiliation] avec leur écriture canonique
+        (AuthorIndex.creators). The default is None (auteurs de l'abstract).
+
+    Returns
+    -------
+    metadata : etree.Element
+        Élément resource de l'enregistrement.
+
+    """
+    # TeX corrigé à la main (ou abstract sans fichier JSON) : on relit le
+    # TeX du recueil, mis en forme comme pour le HTML
+    if sidecar_uptodate(edition, filename_abstex_for_html):
+        rawdata = extractdata_json(edition, filename_abstex_for_html)
+    else:
+        rawdata = extractdata_tex(edition, filename_abstex_for_html)
+    num_id = rawdata[0][1:-4]
+    # auteurs avec leur écriture canonique (index des auteurs) s'il est donné
+    auteurs = creators or rawdata[2]
     schemaLocation = "http://datacite.org/schema/kernel-4 http://schema.datacite.org/meta/kernel-4.3/metadata.xsd"
-    xmlns = "http://datacite.org/schema/kernel-4"
+    xmlns = DATACITE_NS
     xsi = "http://www.w3.org/2001/XMLSchema-instance"
     metadata = etree.Element("{" + xmlns + "}resource",
                              attrib={
@@ -213,10 +596,10 @@ def writexml(filename_abstex_for_html):
 
     identifier = etree.SubElement(metadata, "identifier", attrib={
                                   'identifierType': 'DOI'})
-    identifier.text = '10.25855/SFT2021-'+num_id
-    auteurs = etree.SubElement(metadata, "creators")
-    for auteur in rawdata[2]:
-        creator = etree.SubElement(auteurs, "creator")
+    identifier.text = edition.doi(num_id)
+    creators = etree.SubElement(metadata, "creators")
+    for auteur in auteurs:
+        creator = etree.SubElement(creators, "creator")
         creatorName = etree.SubElement(creator, "creatorName", attrib={
                                        'nameType': 'Personal'})
         creatorName.text = auteur[0]+', '+auteur[1]
@@ -224,16 +607,17 @@ def writexml(filename_abstex_for_html):
         givenName.text = auteur[1]
         familyName = etree.SubElement(creator, 'familyName')
         familyName.text = auteur[0]
-        affiliation = etree.SubElement(creator, "affiliation")
-        affiliation.text = auteur[2]
+        if auteur[2]:
+            affiliation = etree.SubElement(creator, "affiliation")
+            affiliation.text = auteur[2]
 
     titles = etree.SubElement(metadata, "titles")
     title = etree.SubElement(titles, "title")
     title.text = rawdata[1]
     publisher = etree.SubElement(metadata, "publisher")
-    publisher.text = "Société Française de Thermique"
+    publisher.text = edition.publisher
     publicationYear = etree.SubElement(metadata, "publicationYear")
-    publicationYear.text = '2021'
+    publicationYear.text = edition.year
     subjects = etree.SubElement(metadata, "subjects")
     for sub in rawdata[-1]:
         subject = etree.SubElement(subjects, "subject")
@@ -252,46 +636,285 @@ def writexml(filename_abstex_for_html):
 
     # print(etree.tostring(metadata, pretty_print=True, encoding='utf-8',
     #                     xml_declaration=True).decode("utf-8"))
+    return metadata
 
-    xmlfile = open(path_xml+filename_abstex_for_html[:-4]+".xml", "w")
-    xmlfile.write(etree.tostring(metadata).decode('utf-8'))
-    xmlfile.close()
+
+def writexml(edition, filename_abstex_for_html, manifest=None,
+             creators=None):
+    """
+    Fonction qui crée le fichier XML d'un abstract et le valide avec le
+    schéma DataCite (variable globale schema, voir init_xml). Un
+    enregistrement non valide est écrit dans Export_XML/Rejects et non avec
+    les XML à déposer.
+
+    Parameters
+    ----------
+    edition : Edition
+        Édition du congrès.
+    filename_abstex_for_html : Str
+        Nom du fichier TeX d'un abstract qui se trouve dans le répertoire
+        des fichiers TeX pour le HTML.
+    manifest : Manifest, optional
+        Manifeste de construction, le XML n'est réécrit que si le fichier JSON
+        (ou TeX) a changé. The default is None.
+    creators : List, optional
+        Auteurs avec leur écriture canonique (voir record_xml).
+        The default is None.
+
+    Returns
+    -------
+    Tuple
+        (filename_abstex_for_html, erreurs de validation), chaîne vide si
+        l'enregistrement est valide.
+        Création d'un fichier XML (dans Export_XML/Rejects s'il n'est pas
+        valide).
+
+    """
+    filename_xml = edition.path_xml+filename_abstex_for_html[:-4]+".xml"
+    if manifest is not None:
+        key = xml_key(edition, filename_abstex_for_html, manifest, creators)
+        if manifest.uptodate('writexml', filename_xml, key):
+            return filename_abstex_for_html, ''
+    data = etree.tostring(record_xml(edition, filename_abstex_for_html,
+                                     creators))
+    errors = ''
+    if globals().get('schema') is None:
+        init_xml(edition.path_schema)
+    xsd = globals()['schema']
+    # on valide le XML tel qu'il est écrit : les éléments créés sans espace de
+    # noms n'y sont rattachés qu'à la sérialisation
+    if not xsd.validate(etree.fromstring(data)):
+        errors = '\n'.join(str(error) for error in xsd.error_log)
+
+    filename_reject = edition.path_xml_rejects+os.path.basename(filename_xml)
+    if errors:
+        # l'ancien XML valide ne doit plus être déposé
+        filename_xml, filename_reject = filename_reject, filename_xml
+        os.makedirs(edition.path_xml_rejects, exist_ok=True)
+    if os.path.isfile(filename_reject):
+        os.remove(filename_reject)
+    with open(filename_xml, "w") as xmlfile:
+        xmlfile.write(data.decode('utf-8'))
+    if manifest is not None and not errors:
+        manifest.update('writexml', filename_xml, key)
+    return filename_abstex_for_html, errors
+
+
+def xml_key(edition, filename_abstex_for_html, manifest, creators=None):
+    """
+    Empreinte des entrées du XML d'un abstract : fichier JSON (ou TeX s'il
+    a été corrigé), auteurs canoniques, édition et schéma DataCite
+    """
+    if sidecar_uptodate(edition, filename_abstex_for_html):
+        filename_in = edition.path_json+filename_abstex_for_html[:-4]+'.json'
+    else:
+        filename_in = edition.path_abs+filename_abstex_for_html
+    return manifest.digest(manifest.file(filename_in),
+                           manifest.file(edition.path_schema+'metadata.xsd'),
+                           creators, edition.doi(filename_abstex_for_html[1:-4]),
+                           edition.publisher, edition.year)
+
+
+def all_writexml(edition, List_filetex, nb_workers=None, manifest=None,
+                 registry=None, author_index=None):
+    """
+    Fonction permettant de générer et de valider en parallèle les XML
+    DataCite des abstracts. Le schéma est compilé une seule fois par
+    processus de travail.
+
+    Parameters
+    ----------
+    edition : Edition
+        Édition du congrès.
+    List_filetex : List
+        Liste des noms de fichiers TeX des abstracts avec DOI.
+    nb_workers : Int, optional
+        Nombre de processus. The default is None (nombre de coeurs).
+    manifest : Manifest, optional
+        Manifeste de construction, seuls les XML dont les entrées ont changé
+        sont réécrits. The default is None.
+    registry : Registry, optional
+        Registre où les XML valides sont enregistrés. The default is None.
+    author_index : AuthorIndex, optional
+        Index des auteurs, les creators sont écrits avec les écritures
+        canoniques. The default is None.
+
+    Returns
+    -------
+    errors : Dict
+        Dictionnaire des fichiers non valides avec les erreurs du schéma.
+
+    """
+    creators = {}
+    if author_index is not None:
+        creators = {filetex: author_index.creators(int(filetex[1:-4]))
+                    for filetex in List_filetex}
+    path_xml = edition.path_xml
+    errors = {}
+    keys = {}
+    List_todo = List_filetex
+    if manifest is not None:
+        List_todo = []
+        for filetex in List_filetex:
+            key = xml_key(edition, filetex, manifest, creators.get(filetex))
+            if not manifest.uptodate('writexml',
+                                     path_xml+filetex[:-4]+'.xml', key):
+                keys[filetex] = key
+                List_todo.append(filetex)
+            elif registry is not None:
+                register(registry, filetex, 'xml',
+                         path_xml+filetex[:-4]+'.xml', missing=True)
+        if registry is not None:
+            registry.commit()
+
+    List_register = []
+    List_failed = []
+
+    # schéma absent : une seule erreur ici plutôt qu'un pool cassé par fichier
+    load_schema(edition.path_schema)
+    with ProcessPoolExecutor(max_workers=nb_workers, initializer=init_xml,
+                             initargs=(edition.path_schema,)) as executor:
+        jobs = {executor.submit(timed, writexml, edition, filetex, None,
+                                creators.get(filetex)): filetex
+                for filetex in List_todo}
+        for job in as_completed(jobs):
+            try:
+                filetex, error = tracer.collect(
+                    job.result(), 'writexml', num_id=int(jobs[job][1:-4]))
+            except Exception as err:
+                filetex, error = jobs[job], repr(err)
+                List_failed.append(filetex)
+            filename_xml = path_xml+filetex[:-4]+'.xml'
+            if error:
+                errors[filetex] = error
+                List_register.append((filetex, 'xml', None))
+                continue
+            if manifest is not None:
+                manifest.update('writexml', filename_xml, keys[filetex])
+            List_register.append((filetex, 'xml', filename_xml))
+    if registry is not None:
+        register_all(registry, List_register)
+
+    for filetex in sorted(errors):
+        print("ERREUR DataCite", filetex)
+        print(errors[filetex])
+    print(len(List_todo)-len(errors), "/", len(List_todo),
+          "fichiers XML générés et validés")
+    if len(errors) > len(List_failed):
+        print("XML non valides dans", edition.path_xml_rejects)
+    return errors
+
+
+def write_xml_batch(path_xml, List_xml, filename_batch):
+    """
+    Fonction permettant d'écrire un fichier unique avec tous les
+    enregistrements DataCite pour un enregistrement des DOI en masse. Le
+    fichier est écrit au fil de l'eau, un seul enregistrement est en mémoire
+    à la fois.
+
+    Parameters
+    ----------
+    path_xml : String
+        Répertoire des fichiers XML.
+    List_xml : List
+        Liste des fichiers XML des abstracts (dans path_xml).
+    filename_batch : String
+        Nom du fichier de sortie.
+
+    Returns
+    -------
+    None.
+
+    """
+    with etree.xmlfile(filename_batch, encoding='utf-8') as xf:
+        xf.write_declaration()
+        with xf.element('resources'):
+            for filexml in List_xml:
+                xf.write(etree.parse(path_xml+filexml).getroot())
+                xf.write('\n')
+
+
+def export_xml(edition, registry, nb_workers=None, manifest=None,
+               author_index=None, num_ids=None):
+    """
+    Fonction permettant de générer tous les XML DataCite des papiers avec
+    DOI, le fichier combiné pour l'enregistrement en masse et le listing
+    DOI / URL
+
+    Parameters
+    ----------
+    edition : Edition
+        Édition du congrès.
+    registry : Registry
+        Registre des soumissions (papiers avec un PDF tagué).
+    nb_workers : Int, optional
+        Nombre de processus. The default is None (nombre de coeurs).
+    manifest : Manifest, optional
+        Manifeste de construction. The default is None.
+    author_index : AuthorIndex, optional
+        Index des auteurs. The default is None (construit à partir du
+        registre).
+    num_ids : Set, optional
+        Seuls ces papiers sont reconstruits, le fichier combiné et le
+        listing sont toujours écrits pour tous. The default is None (tous).
+
+    Returns
+    -------
+    errors : Dict
+        Dictionnaire des fichiers non valides (voir all_writexml).
+
+    """
+    try:
+        fetch_schema(edition.path_schema)
+    except OSError as err:
+        raise RuntimeError("schéma DataCite absent de "+edition.path_schema +
+                           " et non téléchargé : "+str(err)) from err
+    List_filetex = ['p'+str(num_id)+'.tex'
+                    for num_id in sorted(registry.doi_ids())
+                    if num_ids is None or num_id in num_ids]
+    with tracer.span('all_writexml'):
+        if author_index is None:
+            author_index = AuthorIndex.from_registry(registry)
+        errors = all_writexml(edition, List_filetex, nb_workers, manifest,
+                              registry, author_index)
+    registry.commit()
+
+    with tracer.span('write_xml_batch'):
+        write_xml_batch(edition.path_xml,
+                        [os.path.basename(filename_xml)
+                         for num_id, filename_xml
+                         in registry.artifacts('xml')],
+                        edition.filename_batch)
+    with open(edition.filename_listing, 'w', newline="") as myfile:
+        wr = csv.writer(myfile, dialect='excel', delimiter='\t')
+        wr.writerows(registry.listing('xml'))
+    return errors
 
 
 if __name__ == '__main__':
 
     rootpath = os.getcwd()
-    path = rootpath+'/Export_Tex/Abstracts/'
-    path_tex_html = rootpath+'/Export_Tex/Abstracts_Tex_HTML/'
-    path_html = rootpath+'/Export_HTML/Abstracts/'
-    path_pdf = rootpath+'/Imports_OpenConf/PDF_articles/'
-    path_xml = rootpath+'/Export_XML/'
-    path_actes = rootpath+'/Export_Tex/Actes/'
+    # profile = True : profil cProfile du processus principal
+    profile = False
+    profiler = Profiler(rootpath+'/make_XML.prof', profile)
+    profiler.start()
+    edition = Edition.load(rootpath)
+    nb_workers = os.cpu_count()
+    manifest = Manifest(rootpath+'/build_manifest.json')
+    # registre rempli par make_recueils (soumissions, DOI, PDF tagués)
+    registry = Registry(rootpath+'/registry.sqlite')
 
     print('========= TeX for HTML ===========')
-    for filetex in os.listdir(path):
-        # print(filetex)
-        textohtml(filetex)
+    with tracer.span('all_textohtml'):
+        all_textohtml(edition, os.listdir(edition.path_abs), nb_workers,
+                      manifest, registry)
 
     print('========= XML ===========')
-    for filetex in os.listdir(path_tex_html):
-        if os.path.isfile(path_actes+filetex):  # check si doi
-            writexml(filetex)
-
-    list_xml = os.listdir(path_xml)
-    try:
-        list_xml.remove('listing_SFT2021_xml.txt')
-    except ValueError:
-        pass
-    list_url = list(map(lambda xml_file: "https://www.sft.asso.fr/DOIeditions/CFT2021/Abstracts/p" +
-                        xml_file[1:-4]+".html", list_xml))
-    list_doi = list(map(lambda xml: '10.25855/SFT2021-' +
-                    xml[1:-4].zfill(3), list_xml))
-    # textohtml('p97.tex')
-    Tab = list(zip(list_doi, list_url))
-    Tab = list(map(list, Tab))
-
-    os.chdir(rootpath)
-    with open(path_xml+'listing_SFT2021_xml.txt', 'w', newline="") as myfile:
-        wr = csv.writer(myfile, dialect='excel', delimiter='\t')
-        wr.writerows(Tab)
+    export_xml(edition, registry, nb_workers, manifest)
+
+    registry.close()
+    manifest.save()
+    manifest.summary()
+    tracer.export_chrome(rootpath+'/trace_make_XML.json')
+    tracer.summary()
+    profiler.stop()
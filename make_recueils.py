@@ -6,14 +6,34 @@ Created on Thu Mar 12 15:17:15 2021
 @author: phil
 """
 import csv
+import hashlib
+import io
 import itertools
+import json
+import re
 from functools import reduce
-import unicodedata
-from shutil import copyfile
+from shutil import copyfile, copyfileobj
 from random import randint
 import os
 import fitz
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from manifest import Manifest
+from manifest import hash_file
+from openconf import ColumnSchema, clean_string, unique
+from latex_format import LatexFormat
+from pdf_index import PdfIndex
+import make_XML
+from recueil_resume import RecueilResume, write_if_changed
+from recueil_actes import RecueilActes
+from author_index import AuthorIndex
+from dedup import CanonicalMap
+from edition import Edition
+from registry import Registry
+from static_site import write_site
+from runner import TIMEOUT_PANDOC, run_command
+from tracing import Profiler, timed, tracer
 
 
 def grouper(n, iterable, fillvalue=None):
@@ -52,22 +72,24 @@ def write_warning(file):
     file.write(warning)
 
 
-def tableau_reviewer(filename_in, nbcol):
+def tableau_reviewer(edition, filename_in, nbcol):
     """
     Fonction permettant de générer le tableau des reviewers à partir d'un
     fichier issue d'OpenConf
 
     Parameters
     ----------
+    edition : Edition
+        Édition du congrès (répertoires).
     filename_in : String
         Fichier CSV issu de l'exportation d'OpenConf il est de la forme
-        "Path_IMOC+ nom_de_fichier.csv"
+        "edition.path_imoc+ nom_de_fichier.csv"
     nbcol : Int
         Nombre de colonnes du tableau
 
     Returns
     -------
-        Fichier TEX il est de la forme "Path_EXTEX+ filename_in.tex"
+        Fichier TEX il est de la forme "edition.path_extex+ filename_in.tex"
 
 
     Example
@@ -85,17 +107,16 @@ def tableau_reviewer(filename_in, nbcol):
 
     Utilisation de tableau_reviewer
 
-    >>> Test = tableau_reviewer("file_in.csv",3,towrite = False)
+    >>> Test = tableau_reviewer(edition, "file_in.csv",3,towrite = False)
     >>> for row in Test :
             print(row)
     \\begin{supertabular}{lll}
     Obiwan Kenobi & Clark Kent & Bruce Wayne \\
     \\end{supertabular}
     """
-    # Path_IMOC = os.path.dirname(file_in)
-    # file_in = os.path.basename(file_in)
     tab = []
-    with open(Path_IMOC+filename_in, mode='r', encoding='utf-8') as csv_file:
+    with open(edition.path_imoc+filename_in, mode='r',
+              encoding='utf-8') as csv_file:
         csv_reader = csv.reader(csv_file, delimiter=',')
         line_count = 0
         for row in csv_reader:
@@ -113,340 +134,441 @@ def tableau_reviewer(filename_in, nbcol):
         text_output.append(reduce(lambda x, y: x+" & "+y, row)+" \\\\")
 
     text_output.append("\\end{supertabular}")
-    copyfile(Path_EXTEX+"Tableau_Reviewer_start.tex",
-             Path_EXTEX+"Tableau_Reviewer.tex")
-    file_out = Path_EXTEX+"Tableau_Reviewer.tex"
+    copyfile(edition.path_extex+"Tableau_Reviewer_start.tex",
+             edition.path_extex+"Tableau_Reviewer.tex")
+    file_out = edition.path_extex+"Tableau_Reviewer.tex"
     with open(file_out, mode='a+') as file_tex:
         write_warning(file_tex)
         file_tex.writelines('\n'.join(text_output))
         file_tex.write('\end{center}')
 
 
-def clean_dict(d):
-    """
-    Fonction permettant de nettoyer un dictionnaire avec du texte
-    ainsi certains caractères sont remplacés par du LateX et
-
-    Parameters
-    ----------
-    d : Dict
-        Dictionnaire d'entrée
-
-    Returns
-    -------
-    d : Dict
-        Dictionnaire de sortie
-
-    """
-    chars_tex = [("’", "'"), (" &", " \&"), (" %", " \%"), ("μ", "$\mu$"),
-                 ("≤", "$\leqslant$"), ("φ", "$\\varphi$"), ("mm2",
-                                                             "\si{\square \milli\metre}"),
-                 ("m2", "\si{\square m}"), ("m3",
-                                            "\si{\cubic m}"), ("κ", "$\kappa$"),
-                 ("Δ", "$\Delta$"), ("ν", "$\\nu$"),
-                 ("W.m-2", "\si{\watt\per\square\meter}"),
-                 ("W m-2 K-1", "\si{\watt\per\square\meter\per\kelvin}"),
-                 ("W.m-1.K-1", "\si{\watt\per\meter\per\kelvin}"),
-                 ("W.m^(-1).K^(-1)", "\si{\watt\per\meter\per\kelvin}"),
-                 ("µV.W-1.m-2", "\si{\micro\\volt\per\watt\per\square\metre}"),
-                 ("cm-1", "\si{\per\centi\metre}"),
-                 ("µm", "\si{\micro\metre}"), ("τ", "$\\tau$"),
-                 ("α", "$\\alpha$"), ("ρ", "$\\rho$"),
-                 ("_", "\_"), ("CO2",
-                               "\chemform{CO_2}"), ("CH4", "\chemform{CH_4}"),
-                 ("Li4Br(OH)3", "\chemform{Li_4Br(OH)_3}"),
-                 ("LiOH", "\chemform{LiOH}"), ("LiBR", "\chemform{LiBr}"),
-                 ("Al2O3", "\chemform{Al_2O_3}"), ("Fe2O3",
-                                                   "\chemform{Fe_2O_3}"),
-                 ("Fe2Ti", "\chemform{Fe_2Ti}"), ("FeTi", "\chemform{F eTi}"),
-                 ("NH3", "\chemform{NH_3}"), ("H2O", "\chemform{H_2O}"),
-                 ("Cr7Fe17Ti5", "\chemform{Cr_7Fe_17Ti_5}"),
-                 ("\n", "\n\n"), ("Tm", "$T_m$"), ("T0", "$T_0$"),
-                 ("TC", "$T_C$"), ("ε", "$\\varepsilon$"),
-                 ("TWh.an-1", "\si{TWH \per an}"),
-                 ("µ", "$\mu$"), ("−", "-"), ("°", "$^{\circ}$")
-                 # ("\n[","\\\\\n["),("\n-","\\\\\n-"),
-                 ]
-    d = dict([(k.strip(), v.strip()) for k, v in d.items() if len(v) > 0])
-    for k in d.keys():
-        for ch in chars_tex:
-            d[k] = d[k].replace(ch[0], ch[1])
-    return d
-
-
-def clean_string(ch, accents=True, spaces=True):
+# Table des substitutions texte -> LaTeX. Elle est compilée une seule fois
+# en une alternance de regex triée par longueur décroissante : à chaque
+# position c'est le motif le plus long qui est remplacé et un remplacement
+# n'est jamais ré-analysé par une autre règle.
+CHARS_TEX = [("’", "'"), (" &", " \&"), (" %", " \%"), ("μ", "$\mu$"),
+             ("≤", "$\leqslant$"), ("φ", "$\\varphi$"), ("mm2",
+                                                         "\si{\square \milli\metre}"),
+             ("m2", "\si{\square m}"), ("m3",
+                                        "\si{\cubic m}"), ("κ", "$\kappa$"),
+             ("Δ", "$\Delta$"), ("ν", "$\\nu$"),
+             ("W.m-2", "\si{\watt\per\square\meter}"),
+             ("W m-2 K-1", "\si{\watt\per\square\meter\per\kelvin}"),
+             ("W.m-1.K-1", "\si{\watt\per\meter\per\kelvin}"),
+             ("W.m^(-1).K^(-1)", "\si{\watt\per\meter\per\kelvin}"),
+             ("µV.W-1.m-2", "\si{\micro\\volt\per\watt\per\square\metre}"),
+             ("cm-1", "\si{\per\centi\metre}"),
+             ("µm", "\si{\micro\metre}"), ("τ", "$\\tau$"),
+             ("α", "$\\alpha$"), ("ρ", "$\\rho$"),
+             ("_", "\_"), ("CO2",
+                           "\chemform{CO_2}"), ("CH4", "\chemform{CH_4}"),
+             ("Li4Br(OH)3", "\chemform{Li_4Br(OH)_3}"),
+             ("LiOH", "\chemform{LiOH}"), ("LiBR", "\chemform{LiBr}"),
+             ("Al2O3", "\chemform{Al_2O_3}"), ("Fe2O3",
+                                               "\chemform{Fe_2O_3}"),
+             ("Fe2Ti", "\chemform{Fe_2Ti}"), ("FeTi", "\chemform{F eTi}"),
+             ("NH3", "\chemform{NH_3}"), ("H2O", "\chemform{H_2O}"),
+             ("Cr7Fe17Ti5", "\chemform{Cr_7Fe_17Ti_5}"),
+             ("\n", "\n\n"), ("Tm", "$T_m$"), ("T0", "$T_0$"),
+             ("TC", "$T_C$"), ("ε", "$\\varepsilon$"),
+             ("TWh.an-1", "\si{TWH \per an}"),
+             ("µ", "$\mu$"), ("−", "-"), ("°", "$^{\circ}$")
+             # ("\n[","\\\\\n["),("\n-","\\\\\n-"),
+             ]
+DICT_CHARS_TEX = dict(CHARS_TEX)
+RE_CHARS_TEX = re.compile('|'.join(map(re.escape, sorted(DICT_CHARS_TEX,
+                                                         key=len,
+                                                         reverse=True))))
+
+
+def clean_tex(ch):
     """
-    Fonction permettant de nettoyer une chaîne de caractères avec l'option
-    de supprimer les blancs et/ou les espaces
+    Fonction permettant de convertir une chaîne de caractères en LaTeX en un
+    seul passage à l'aide de la table CHARS_TEX compilée
 
     Parameters
     ----------
     ch : String
-        chaine de caractères d'entrée
-    accents : Boolean, optional
-        Si vrai alors on supprime les accents. The default is True.
-    spaces : Boolean, optional
-        Si vrai alors on supprime les espaces. The default is True.
+        Chaîne de caractères d'entrée
 
     Returns
     -------
-    ch : String
-        Chaîne de carctères en sortie.
+    String
+        Chaîne de caractères convertie
 
     """
-    if accents:
-        ch = unicodedata.normalize('NFKD', ch)
-    if spaces:
-        ch = ch.replace(' ', '')
-    return ch.encode('ASCII', 'ignore').decode("utf-8")
+    return RE_CHARS_TEX.sub(lambda m: DICT_CHARS_TEX[m.group(0)], ch)
 
 
-def extract_authors(d):
+def clean_dict(d):
     """
-    Fonction permettant d'extraire la liste des auteurs d'un dictionnaire
-    correspondant à un seul article
+    Fonction permettant de nettoyer un dictionnaire avec du texte
+    ainsi certains caractères sont remplacés par du LateX et
 
     Parameters
     ----------
     d : Dict
-        Dictionnaire avec toutes les infos
+        Dictionnaire d'entrée
 
     Returns
     -------
-    List_author : List
-        List avec tous les auteurs. Le format est le suivant
-        [(name1,surname1),(name2,surname2),(name3,surname3)]
-
-    """
-    List_author = []
-    for k in d.keys():
-        chaine = str(k)
-        if chaine.endswith('NOM') and not(chaine.endswith('PRÉNOM')) and chaine.startswith('AUTHOR'):
-            name = d[k].title().strip()
-        if chaine.endswith('PRÉNOM') and chaine.startswith('AUTHOR'):
-            surname = d[k].title().strip()
-        try:
-            List_author.append((name, surname))
-            del(name)
-            del(surname)
-        except UnboundLocalError:
-            pass
-    return List_author
-
-
-def extract_affiliation(d):
-    """
-    Fonction permettant d'extraire la liste des affiliations d'un dictionnaire
-    correspondant à un seul article
-
-    Parameters
-    ----------
     d : Dict
-        Dictionnaire avec toutes les infos
-
-    Returns
-    -------
-    List_aff : List
-        Liste des affiliations le résultat est du type
-        ['affiliation1,'affiliation2','affiliation3']
+        Dictionnaire de sortie
 
     """
-    List_aff = []
+    d = dict([(k.strip(), v.strip()) for k, v in d.items() if len(v) > 0])
     for k in d.keys():
-        chaine = str(k)
-        if chaine.endswith('AFFILIATION'):
-            aff = d[k]
-        try:
-            List_aff.append(aff)
-            del(aff)
-        except UnboundLocalError:
-            pass
-    return List_aff
-
-
-def unique(L):
-    """
-    Fonction permettant de ne retenir que les éléments uniques d'une liste
-
-    Parameters
-    ----------
-    L : List
-        liste d'entrée
-    Returns
-    -------
-    list : List
-        Liste de sortoe
-
-    """
-    return [x for i, x in enumerate(L) if L.index(x) == i]
+        d[k] = clean_tex(d[k])
+    return d
 
 
-def Abstract(filename_abs_tex, dict_abs, overwrite=False):
+def Abstract(edition, filename_abs_tex, sub, overwrite=False, manifest=None,
+             author_index=None):
     """
     Fonction permettant d'écrire un abstract au format LateX
 
     Parameters
     ----------
+    edition : Edition
+        Édition du congrès (répertoires).
     filename_abs_tex : String
         Nom du fichier TeX que l'on désire.
-    dict_abs : Dict
-        Dictionnaire correspondant à un papier
+    sub : Submission
+        Soumission correspondant à un papier
     overwrite : Boolean
         Permet de lancer la fonction sans écraser les fichiers abstracts .tex
+    manifest : Manifest, optional
+        Manifeste de construction, le fichier n'est réécrit que si la ligne
+        CSV ou le gabarit (ce module) a changé. The default is None.
+    author_index : AuthorIndex, optional
+        Index des auteurs donnant les entrées \\index (clé normalisée et
+        écriture canonique). The default is None.
 
     Returns
     -------
-    Des fichiers LaTeX (.tex) stockés dans Path_EXTEX/Abstrats
+    Des fichiers LaTeX (.tex) stockés dans edition.path_abs et les
+    métadonnées au format JSON stockées dans edition.path_json
 
     """
-    dict_abs = clean_dict(dict_abs)
-    if overwrite:
-        with open(Path_EXTEX + 'Abstracts/' + filename_abs_tex, 'w') as file_export_latex:
-            num_id = dict_abs['SUBMISSION ID']
-            title = dict_abs['TITRE']
-            keywords = dict_abs['MOTS CLÉS']
-            abstract = dict_abs['RÉSUMÉ']
-            contact_auth_email = dict_abs['CONTACT AUTHOR EMAIL']
-            if 'DOI' in dict_abs.keys():
-                doi = dict_abs['DOI']
-
-            List_author = extract_authors(dict_abs)
-            List_aff = unique(extract_affiliation(dict_abs))
-
-            write_warning(file_export_latex)
-            file_export_latex.write("\\newpage\n\n")
-
-            if 'DOI' not in dict_abs.keys():
-                print("WIP : ", num_id)
-                file_export_latex.write(
-                    "\\backgroundsetup{contents={Work In Progress},scale=7}\n")
-                file_export_latex.write("\\BgThispage\n")
-
-            file_export_latex.write(
-                "%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n")
-            file_export_latex.write("%% Papier "+num_id+"\n")
+    filename_out = edition.path_abs + filename_abs_tex
+    filename_json = edition.path_json + filename_abs_tex[:-4] + '.json'
+    data = sub.as_dict()
+    if author_index is not None:
+        List_index = [author_index.index_entry(author.name, author.surname)
+                      for author in sub.authors]
+    else:
+        List_index = ["\\index{" + clean_string(author.name) +
+                      clean_string(author.surname) + "@" + author.name +
+                      ", " + author.surname + "}"
+                      for author in sub.authors]
+    key = None
+    if manifest is not None:
+        # le gabarit du TeX (en-tête, mise en page) est écrit par ce module
+        key = manifest.digest(data, List_index,
+                              manifest.file(os.path.abspath(__file__)))
+    if overwrite and manifest is not None:
+        overwrite = not manifest.uptodate('Abstract', filename_out, key)
+    # le TeX est toujours généré en mémoire : il n'est écrit qu'avec
+    # overwrite, mais son empreinte est mise dans le fichier JSON
+    with io.StringIO() as file_export_latex:
+        num_id = str(sub.num_id)
+        title = sub.title
+        keywords = sub.keywords
+        abstract = sub.abstract
+        contact_auth_email = sub.contact_email
+        doi = sub.doi
+
+        write_warning(file_export_latex)
+        file_export_latex.write("\\newpage\n\n")
+
+        if doi is None:
+            print("WIP : ", num_id)
             file_export_latex.write(
-                "%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n\n")
-            file_export_latex.write("% Indexations\n")
-
-            for z in List_author:
-                name, surname = z
-                name_clean = clean_string(name)
-                surname_clean = clean_string(surname)
-
-                file_export_latex.write("\\index{" + name_clean + surname_clean
-                                        + "@"+name+", " + surname+"}\n")
-            file_export_latex.write("%\n% Titre\n")
-            file_export_latex.write("\\begin{flushleft}\n")
+                "\\backgroundsetup{contents={Work In Progress},scale=7}\n")
+            file_export_latex.write("\\BgThispage\n")
+
+        file_export_latex.write(
+            "%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n")
+        file_export_latex.write("%% Papier "+num_id+"\n")
+        file_export_latex.write(
+            "%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%\n\n")
+        file_export_latex.write("% Indexations\n")
+
+        for entry in List_index:
+            file_export_latex.write(entry+"\n")
+        file_export_latex.write("%\n% Titre\n")
+        file_export_latex.write("\\begin{flushleft}\n")
+        file_export_latex.write(
+            "\\phantomsection\\addtocounter{section}{1}\n")
+        file_export_latex.write(
+            "\\addcontentsline{toc}{section}{"+title+"}\n")
+        # if doi is not None:
+        #     pass
+        # else :
+        #     file_export_latex.write("\\backgroundsetup{contents=Work In Progress}")
+
+        file_export_latex.write("{\\Large \\textbf{"+title+"}}\\label{ref:" +
+                                num_id+"}\n")
+        # enclosed to be removed
+        # file_export_latex.write("{\\Large \\textbf{ NUM :"+num_id+"}}\n")
+        # enclosed to be removed
+        file_export_latex.write("\\end{flushleft}\n")
+        file_export_latex.write("%\n% Auteurs\n")
+
+        ch_authors = ''
+        for author in sub.authors:
+            # pas de numéro pour un auteur sans affiliation
+            marks = [str(author.aff_num)] if author.aff_num else []
+            if author.name == sub.contact_name:
+                marks.append('\\star')
+
+            ch_authors += author.surname + ' ' + author.name
+            if marks:
+                ch_authors += '$^{' + ','.join(marks) + '}$'
+            ch_authors += ', '
+
+        ch_authors = ch_authors[:-2]
+        ch_authors += "\\\\[2mm]\n"
+        file_export_latex.write(ch_authors)
+        file_export_latex.write("$^{\\star}$ \\Letter : \\url{" +
+                                contact_auth_email + "}\\\\[2mm]\n")
+        for i, aff in enumerate(sub.affiliations, start=1):
             file_export_latex.write(
-                "\\phantomsection\\addtocounter{section}{1}\n")
+                "{\\footnotesize $^{"+str(i)+"}$ "+aff+"}\\\\\n")
+
+        file_export_latex.write("[4mm]\n%\n% Mots clés\n")
+        file_export_latex.write("\\noindent \\textbf{Mots clés : } "+keywords +
+                                "\\\\[4mm]\n")
+        file_export_latex.write("%\n% Résumé\n")
+        file_export_latex.write("\\noindent \\textbf{Résumé : } \n\n")
+        file_export_latex.write("{\\normalsize\n")
+        # Tcoloorbox pour les abstracts trops longs
+        # file_export_latex.write("\\begin{tcolorbox}[oversize,height fill=true,"+\
+        #                            "notitle,halign=justify,boxrule=0pt,colback=white,"+\
+        #                            "frame empty,before upper={\parindent10mm}]\n")
+        file_export_latex.write(abstract)
+
+        if doi is not None:
             file_export_latex.write(
-                "\\addcontentsline{toc}{section}{"+title+"}\n")
-            # if 'DOI' in dict_abs.keys():
-            #     pass
-            # else :
-            #     file_export_latex.write("\\backgroundsetup{contents=Work In Progress}")
-
-            file_export_latex.write("{\\Large \\textbf{"+title+"}}\\label{ref:" +
-                                    num_id+"}\n")
-            # enclosed to be removed
-            # file_export_latex.write("{\\Large \\textbf{ NUM :"+num_id+"}}\n")
-            # enclosed to be removed
-            file_export_latex.write("\\end{flushleft}\n")
-            file_export_latex.write("%\n% Auteurs\n")
-
-            ch_authors = ''
-            for i, z in enumerate(List_author, start=1):
-                name, surname = z
-                if name == dict_abs['CONTACT AUTHOR NOM']:
-                    mark = ',\star'
-                else:
-                    mark = ''
-                ind_aff = List_aff.index(dict_abs['AUTHOR '+str(i) +
-                                                  ' AFFILIATION']) + 1
-
-                ch_authors += surname + ' ' + name + '$^{' + str(ind_aff) + \
-                    mark + '}$, '
-
-            ch_authors = ch_authors[:-2]
-            ch_authors += "\\\\[2mm]\n"
-            file_export_latex.write(ch_authors)
-            file_export_latex.write("$^{\\star}$ \\Letter : \\url{" +
-                                    contact_auth_email + "}\\\\[2mm]\n")
-            for i, aff in enumerate(List_aff, start=1):
-                file_export_latex.write(
-                    "{\\footnotesize $^{"+str(i)+"}$ "+aff+"}\\\\\n")
-
-            file_export_latex.write("[4mm]\n%\n% Mots clés\n")
-            file_export_latex.write("\\noindent \\textbf{Mots clés : } "+keywords +
-                                    "\\\\[4mm]\n")
-            file_export_latex.write("%\n% Résumé\n")
-            file_export_latex.write("\\noindent \\textbf{Résumé : } \n\n")
-            file_export_latex.write("{\\normalsize\n")
-            # Tcoloorbox pour les abstracts trops longs
-            # file_export_latex.write("\\begin{tcolorbox}[oversize,height fill=true,"+\
-            #                            "notitle,halign=justify,boxrule=0pt,colback=white,"+\
-            #                            "frame empty,before upper={\parindent10mm}]\n")
-            file_export_latex.write(abstract)
-
-            if 'DOI' in dict_abs.keys():
-                file_export_latex.write(
-                    "\n\n \\vfill doi : \\url{https://doi.org/"+doi+"}\n")
-            else:
-                file_export_latex.write("\n\n \\vfill Work In Progress\n")
+                "\n\n \\vfill doi : \\url{https://doi.org/"+doi+"}\n")
+        else:
+            file_export_latex.write("\n\n \\vfill Work In Progress\n")
+
+        # Tcoloorbox pour les abstracts trops longs
+        # file_export_latex.write("\n\\end{tcolorbox}")
+        file_export_latex.write("\n}\n \n")
+        text = file_export_latex.getvalue()
+    if overwrite:
+        with open(filename_out, 'w') as file_tex:
+            file_tex.write(text)
+        if manifest is not None:
+            manifest.update('Abstract', filename_out, key)
+    # Métadonnées lues par make_XML et les recueils, écrites à chaque passage
+    # même si le TeX est conservé, avec l'empreinte du TeX : un TeX corrigé
+    # à la main ensuite est repéré par make_XML.sidecar_uptodate
+    tex_sha256 = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    if not overwrite and os.path.isfile(filename_out) and \
+            hash_file(filename_out) != tex_sha256:
+        # TeX conservé et corrigé à la main : il fait foi
+        data = tex_data(edition, filename_abs_tex, data)
+        tex_sha256 = hash_file(filename_out)
+    write_if_changed(filename_json, json.dumps(
+        dict(data, tex_sha256=tex_sha256), ensure_ascii=False, indent=1))
+
+
+def tex_data(edition, filename_abs_tex, data):
+    """
+    Métadonnées d'un abstract (Submission.as_dict) avec le titre, les
+    auteurs, les mots clés et le résumé relus dans son fichier TeX
+    """
+    try:
+        filename, title, auteurs, abstract, keywords = \
+            make_XML.extractdata_tex(edition, filename_abs_tex)
+    except (ValueError, IndexError) as err:
+        print("ATTENTION : TeX de", filename_abs_tex, "illisible, métadonnées "
+              "de l'export OpenConf :", repr(err))
+        return data
+    List_aff = unique([auteur[2] for auteur in auteurs if auteur[2]])
+    return dict(data, title=title, abstract=abstract,
+                keywords=', '.join(k.strip() for k in keywords),
+                authors=[auteur[:3]+[List_aff.index(auteur[2])+1
+                                     if auteur[2] else 0]
+                         for auteur in auteurs],
+                affiliations=List_aff)
+
+
+def iter_submissions(edition, pdf_index=None, canonical=None):
+    """
+    Générateur permettant de lire l'export d'OpenConf ligne par ligne. Chaque
+    ligne est nettoyée puis convertie en Submission, rien n'est conservé en
+    mémoire entre deux lignes.
+
+    Parameters
+    ----------
+    edition : Edition
+        Édition du congrès (export OpenConf, DOI).
+    pdf_index : PdfIndex, optional
+        Index des PDF des articles, évite de tester l'existence de chaque
+        fichier. The default is None.
+    canonical : CanonicalMap, optional
+        Correspondances relues des affiliations et des auteurs (voir
+        dedup.py). The default is None.
+
+    Yields
+    ------
+    sub : Submission
+        Soumission nettoyée avec son DOI si le PDF existe.
 
-            # Tcoloorbox pour les abstracts trops longs
-            # file_export_latex.write("\n\\end{tcolorbox}")
-            file_export_latex.write("\n}\n \n")
+    """
+    with open(edition.path_imoc+edition.filename_export,
+              'r') as file_export_OpenConf:
+        csv_reader = csv.DictReader(
+            file_export_OpenConf, delimiter=',', dialect='unix')
+        schema = ColumnSchema(csv_reader.fieldnames, canonical)
+        for dict_abs in csv_reader:
+            dict_abs = clean_dict(dict_abs)
+            # TODO Add WIP, Status, DOI keys to dict_abs
+            # dummy DOI added to abstract
+            if pdf_index is not None:
+                has_pdf = pdf_index.has_pdf(dict_abs['SUBMISSION ID'])
+            else:
+                has_pdf = os.path.isfile(edition.path_pdf +
+                                         dict_abs['SUBMISSION ID']+'.pdf')
+            if has_pdf:
+                dict_abs['DOI'] = edition.doi(dict_abs['SUBMISSION ID'])
+            yield schema.submission(dict_abs)
 
 
-def All_Abstracts(filename_export_OpenConf, overwrite=False):
+def All_Abstracts(edition, overwrite=False, manifest=None, pdf_index=None,
+                  registry=None, author_index=None, canonical=None):
     """
     Fonction permettant de boucler sur tous les papiers d'OpenConf. On va donc
     traiter tous les abstracts
 
     Parameters
     ----------
-    filename_export_OpenConf : String
-        Fichier exportés d'OpenConf.
+    edition : Edition
+        Édition du congrès (export OpenConf, répertoires).
     overwrite : Boolean
         Permet de lancer la fonction sans écraser les fichiers abstracts .tex
+    manifest : Manifest, optional
+        Manifeste de construction transmis à Abstract. The default is None.
+    pdf_index : PdfIndex, optional
+        Index des PDF des articles, évite de tester l'existence de chaque
+        fichier. The default is None.
+    registry : Registry, optional
+        Registre où chaque soumission est enregistrée. The default is None.
+    author_index : AuthorIndex, optional
+        Index des auteurs complété au fil de la lecture et utilisé pour les
+        entrées \\index. The default is None.
+    canonical : CanonicalMap, optional
+        Correspondances relues des affiliations et des auteurs.
+        The default is None.
     Returns
     -------
     List_files_abs_tex : List
         Liste des fichiers TeX en sortie.
     D : Dict
-        Dictionnaire avec tous les abstracts avec en clé le numéro id
+        Dictionnaire avec toutes les soumissions (Submission) avec en clé le
+        numéro id
 
     """
     List_files_abs_tex = []
     D = {}
 
-    with open(Path_IMOC+filename_export_OpenConf, 'r') as file_export_OpenConf:
-        csv_reader = csv.DictReader(
-            file_export_OpenConf, delimiter=',', dialect='unix')
-        for dict_abs in csv_reader:
-            filename_abs_tex = 'p'+dict_abs['SUBMISSION ID']+'.tex'
-            List_files_abs_tex.append(int(dict_abs['SUBMISSION ID']))
-            dict_abs = clean_dict(dict_abs)
-            # TODO Add WIP, Status, DOI keys to dict_abs
-            # dummy DOI added to abstract
-            if os.path.isfile(Path_IMOC+'PDF_articles/'+dict_abs['SUBMISSION ID']+'.pdf'):
-                dict_abs['DOI'] = "10.25855/SFT2021-" + \
-                    dict_abs['SUBMISSION ID'].zfill(3)
-            D[int(dict_abs['SUBMISSION ID'])] = dict_abs
-            Abstract(filename_abs_tex, dict_abs, overwrite)
-
+    for sub in iter_submissions(edition, pdf_index, canonical):
+        List_files_abs_tex.append(sub.num_id)
+        D[sub.num_id] = sub
+        if author_index is not None:
+            author_index.add_submission(sub)
+        with tracer.span('Abstract', num_id=sub.num_id):
+            Abstract(edition, 'p'+str(sub.num_id)+'.tex', sub, overwrite,
+                     manifest, author_index)
+        if registry is not None:
+            registry.add_submission(sub)
+
+    prune(D, registry, author_index)
     return List_files_abs_tex, D
 
 
-def distrib_theme(filename_list_theme):
+def prune(num_ids, registry=None, author_index=None):
+    """
+    Oublie les soumissions retirées de l'export OpenConf depuis le passage
+    précédent : lignes du registre (table des matières, site, DOI) et
+    papiers de l'index des auteurs. Rien n'est supprimé si l'export est vide.
+    """
+    if not num_ids:
+        return
+    if author_index is not None:
+        for num_id in set(author_index.papers)-set(num_ids):
+            author_index.remove(num_id)
+    if registry is not None:
+        nb_removed = registry.prune(num_ids)
+        registry.commit()
+        if nb_removed:
+            print(nb_removed, "soumissions retirées de l'export supprimées "
+                  "du registre")
+
+
+def stream_abstracts(edition, registry, overwrite=False, manifest=None,
+                     pdf_index=None, author_index=None, canonical=None):
+    """
+    Fonction permettant de traiter tous les papiers d'OpenConf en flux, pour
+    les exports de plusieurs dizaines de milliers de soumissions. Chaque
+    soumission est écrite (abstract TeX et registre) puis oubliée, seul son
+    numéro est conservé en mémoire (voir prune).
+
+    Parameters
+    ----------
+    edition : Edition
+        Édition du congrès (export OpenConf, répertoires).
+    registry : Registry
+        Registre où chaque soumission est enregistrée.
+    overwrite : Boolean
+        Permet de lancer la fonction sans écraser les fichiers abstracts .tex
+    manifest : Manifest, optional
+        Manifeste de construction transmis à Abstract. The default is None.
+    pdf_index : PdfIndex, optional
+        Index des PDF des articles. The default is None.
+    author_index : AuthorIndex, optional
+        Index des auteurs (voir All_Abstracts). The default is None.
+    canonical : CanonicalMap, optional
+        Correspondances relues (voir All_Abstracts). The default is None.
+
+    Returns
+    -------
+    nb_sub : Int
+        Nombre de soumissions traitées.
+
+    """
+    nb_sub = 0
+    seen = set()
+    for sub in iter_submissions(edition, pdf_index, canonical):
+        if author_index is not None:
+            author_index.add_submission(sub)
+        with tracer.span('Abstract', num_id=sub.num_id):
+            Abstract(edition, 'p'+str(sub.num_id)+'.tex', sub, overwrite,
+                     manifest, author_index)
+        registry.add_submission(sub)
+        seen.add(sub.num_id)
+        nb_sub += 1
+        if nb_sub % 1000 == 0:
+            registry.commit()
+    registry.commit()
+    prune(seen, registry, author_index)
+    return nb_sub
+
+
+def distrib_theme(edition, filename_list_theme):
     """
     Fonction permettant de distribuer les thèmes à partir d'un fichier CSV
     donné
 
     Parameters
     ----------
+    edition : Edition
+        Édition du congrès (répertoires).
     filename_list_theme : String
         Nom du fichier d'entrée au format CSV il doît se présenter ainsi :
 
@@ -470,7 +592,7 @@ def distrib_theme(filename_list_theme):
 
     """
 
-    with open(Path_IMOC+filename_list_theme) as file_list_theme:
+    with open(edition.path_imoc+filename_list_theme) as file_list_theme:
         csv_reader = csv.DictReader(file_list_theme, delimiter=';')
         dict_theme = {}
         for line in csv_reader:
@@ -482,7 +604,7 @@ def distrib_theme(filename_list_theme):
     return OrderedDict(sorted(dict_theme.items(), key=lambda t: t[0]))
 
 
-def write_recueil_resume(filename_choix_theme):
+def write_recueil_resume(edition, filename_choix_theme):
     """
     Fonction permettant d'écrire le recueil des résumés avec l'inclusion des
     différents abstract.inc.tex. Un dictionnaire est récupéré en sortie qui
@@ -490,6 +612,8 @@ def write_recueil_resume(filename_choix_theme):
 
     Parameters
     ----------
+    edition : Edition
+        Édition du congrès (répertoires).
     filename_choix_theme : String
         Nom du fichier d'entrée au format CSV il doît se présenter ainsi :
 
@@ -513,12 +637,13 @@ def write_recueil_resume(filename_choix_theme):
 
     """
 
-    D = distrib_theme(filename_choix_theme)
+    D = distrib_theme(edition, filename_choix_theme)
     theme_number = 0
-    copyfile(Path_EXTEX+"Recueil_Resume/Recueil_Resume_start.tex",
-             Path_EXTEX+"Recueil_Resume/Recueil_Resume.tex")
+    path_recueil = edition.path_extex+"Recueil_Resume/"
+    copyfile(path_recueil+"Recueil_Resume_start.tex",
+             path_recueil+"Recueil_Resume.tex")
     Recueil_Resume = open(
-        Path_EXTEX+"Recueil_Resume/Recueil_Resume.tex", "a+", encoding='utf-8')
+        path_recueil+"Recueil_Resume.tex", "a+", encoding='utf-8')
     write_warning(Recueil_Resume)
     for di in D:
         theme_number += 1
@@ -528,7 +653,7 @@ def write_recueil_resume(filename_choix_theme):
             '\input{abstract.'+str(theme_number)+'.inc.tex}\n')
         Recueil_Resume.write('\cleardoublepage\n')
         Recueil_Resume.write('\n')
-        with open(Path_EXTEX+'Recueil_Resume/abstract.'+str(theme_number)+'.inc.tex', 'w', encoding='utf-8') as file_abs_by_theme:
+        with open(path_recueil+'abstract.'+str(theme_number)+'.inc.tex', 'w', encoding='utf-8') as file_abs_by_theme:
             file_abs_by_theme.write("%%%%%%%%%%%%%%%%%%%%%%%%%%\n")
             file_abs_by_theme.write(
                 "% Theme numéro "+str(theme_number)+" : "+di+"\n")
@@ -551,20 +676,86 @@ def write_recueil_resume(filename_choix_theme):
     return D
 
 
-def tag_doi(num_id, DictPaper, overwrite=True):
+def clone_file(filename_in, filename_out):
+    """
+    Copie d'un fichier par le noyau (copy_file_range), sans passer par
+    Python, qui partage les blocs sur les systèmes de fichiers qui le
+    permettent (btrfs, XFS)
+    """
+    with open(filename_in, 'rb') as file_in, \
+            open(filename_out, 'wb') as file_out:
+        try:
+            size = os.fstat(file_in.fileno()).st_size
+            while size > 0:
+                nb = os.copy_file_range(file_in.fileno(), file_out.fileno(),
+                                        size)
+                if nb == 0:
+                    break
+                size -= nb
+        except (AttributeError, OSError):
+            file_in.seek(0)
+            file_out.seek(0)
+            file_out.truncate()
+            copyfileobj(file_in, file_out)
+
+
+def same_prefix(filename, filename_doi, chunk=1 << 20):
+    """
+    Vrai si filename_doi commence exactement par le contenu de filename
+    (PDF tagué par une mise à jour incrémentale d'un PDF source inchangé)
+    """
+    size = os.path.getsize(filename)
+    if os.path.getsize(filename_doi) < size:
+        return False
+    with open(filename, 'rb') as file_in, open(filename_doi, 'rb') as file_doi:
+        while size > 0:
+            nb = min(chunk, size)
+            if file_in.read(nb) != file_doi.read(nb):
+                return False
+            size -= nb
+    return True
+
+
+def doi_stamped(filename, filename_doi, doi):
+    """
+    Vrai si filename_doi est filename tagué avec ce DOI (le lien est sur la
+    première page et le PDF source n'a pas changé depuis)
+    """
+    if not os.path.isfile(filename_doi) or \
+            not same_prefix(filename, filename_doi):
+        return False
+    doc = fitz.open(filename_doi)
+    found = doc.page_count > 0 and \
+        len(doc[0].search_for("https://doi.org/"+doi.zfill(3))) > 0
+    doc.close()
+    return found
+
+
+def tag_doi(edition, num_id, doi, overwrite=True, manifest=None,
+            incremental=True):
     """
     Fonction permettant de modifier les PDF (ou pas) afin d'y insérer le
     n° DOI et le lien. On renvoie un booléen pour savoir si il y a un DOI
 
     Parameters
     ----------
+    edition : Edition
+        Édition du congrès (répertoire des PDF).
     num_id : Int
         Entier qui correspond au numéro de soumission.
-    DictPaper : Dict
-        Dictionnaire qui contient l'abstract.
+    doi : String
+        DOI du papier, None si le papier n'en a pas.
     overwrite : Bool, optional
         Booleen qui permet de contrôler si on tague les PDF ou pas.
         The default is True.
+    manifest : Manifest, optional
+        Manifeste de construction, le PDF n'est tagué à nouveau que si le PDF
+        source ou le DOI ont changé. The default is None.
+    incremental : Bool, optional
+        Si vrai le PDF source est copié tel quel et le DOI est ajouté par une
+        mise à jour incrémentale à la fin du fichier (quelques ko) au lieu de
+        réécrire tout le PDF. Rien n'est fait si le PDF tagué contient déjà
+        ce DOI. The default is True.
 
     Returns
     -------
@@ -572,64 +763,213 @@ def tag_doi(num_id, DictPaper, overwrite=True):
         On renvoie vrai si il y a un DOI.
 
     """
-    if 'DOI' not in DictPaper.keys():
+    if doi is None:
         return False  # Pas de DOI en général c'est un WIP
-    filename = Path_IMOC+"PDF_articles/"+str(num_id)+".pdf"
-    filename_doi = Path_IMOC+"PDF_articles/"+str(num_id)+"_doi.pdf"
+    filename = edition.path_pdf+str(num_id)+".pdf"
+    filename_doi = edition.path_pdf+str(num_id)+"_doi.pdf"
     if os.path.isfile(filename_doi) and not(overwrite):
         return True  # DOI déjà fait
     if os.path.isfile(filename):
-        doc = fitz.open(filename)
+        if manifest is not None:
+            key = manifest.digest(doi, manifest.file(filename))
+            if manifest.uptodate('tag_doi', filename_doi, key):
+                return True
+        if incremental and doi_stamped(filename, filename_doi, doi):
+            return True
+        if incremental:
+            clone_file(filename, filename_doi)
+            doc = fitz.open(filename_doi)
+            # un PDF réparé à l'ouverture ne peut pas être complété
+            incremental = doc.can_save_incrementally()
+            if not incremental:
+                doc.close()
+                doc = fitz.open(filename)
+        else:
+            doc = fitz.open(filename)
         page = doc[0]
-        page.clean_contents()
+        if not incremental:
+            page.clean_contents()
         text_position = fitz.Point(85, page.rect.height - 30)
-        rc = page.insert_text(text_position,
-                              "https://doi.org/"+DictPaper['DOI'].zfill(3),
-                              fontname="helv",
-                              fontsize=11,
-                              rotate=0,
-                              color=(0, 0, 0))
-        doc.save(filename_doi)
+        page.insert_text(text_position,
+                         "https://doi.org/"+doi.zfill(3),
+                         fontname="helv",
+                         fontsize=11,
+                         rotate=0,
+                         color=(0, 0, 0))
+        if incremental:
+            doc.save(filename_doi, incremental=True,
+                     encryption=fitz.PDF_ENCRYPT_KEEP)
+        else:
+            doc.save(filename_doi)
+        doc.close()
+        if manifest is not None:
+            manifest.update('tag_doi', filename_doi, key)
         return True
     else:
         return False
 
 
-def write_recueil_actes(Dtheme):
+def tag_doi_all(edition, Dtheme, Ddoi, nb_workers=None, manifest=None,
+                pdf_index=None):
+    """
+    Fonction permettant de taguer en parallèle les PDF de tous les papiers
+    avec leur DOI à l'aide d'un pool de processus. Cette étape doit être
+    lancée avant write_recueil_actes.
+
+    Parameters
+    ----------
+    edition : Edition
+        Édition du congrès (répertoire des PDF).
+    Dtheme : Dict
+        Dictionnaire avec les thèmes en clés et les n° papiers en valeurs.
+    Ddoi : Dict
+        Dictionnaire {num_id : DOI ou None} de toutes les soumissions.
+    nb_workers : Int, optional
+        Nombre de processus. The default is None (nombre de coeurs).
+    manifest : Manifest, optional
+        Manifeste de construction, seuls les PDF dont la source ou le DOI
+        ont changé sont tagués. The default is None.
+    pdf_index : PdfIndex, optional
+        Index des PDF des articles qui fournit l'existence et l'empreinte
+        des PDF sources. The default is None.
+
+    Returns
+    -------
+    doi_ok : Dict
+        Dictionnaire {num_id : booléen} vrai si le papier a un PDF avec DOI.
+
+    """
+    doi_ok = {}
+    keys = {}
+    for theme in Dtheme:
+        for num_id in Dtheme[theme]:
+            doi = Ddoi[num_id]
+            filename = edition.path_pdf+str(num_id)+".pdf"
+            filename_doi = edition.path_pdf+str(num_id)+"_doi.pdf"
+            if pdf_index is not None:
+                has_pdf = pdf_index.has_pdf(num_id)
+            else:
+                has_pdf = os.path.isfile(filename)
+            if doi is None or not has_pdf:
+                doi_ok[num_id] = False
+                continue
+            if manifest is not None:
+                if pdf_index is not None:
+                    sha256 = pdf_index.sha256(num_id)
+                else:
+                    sha256 = manifest.file(filename)
+                key = manifest.digest(doi, sha256)
+                if manifest.uptodate('tag_doi', filename_doi, key):
+                    doi_ok[num_id] = True
+                    continue
+                keys[num_id] = key
+            doi_ok[num_id] = None
+
+    errors = {}
+    with ProcessPoolExecutor(max_workers=nb_workers) as executor:
+        jobs = {executor.submit(timed, tag_doi, edition, num_id, Ddoi[num_id],
+                                True):
+                num_id for num_id in doi_ok if doi_ok[num_id] is None}
+        for job in as_completed(jobs):
+            num_id = jobs[job]
+            try:
+                doi_ok[num_id] = tracer.collect(job.result(), 'tag_doi',
+                                                num_id=num_id)
+            except Exception as err:
+                doi_ok[num_id] = False
+                errors[num_id] = repr(err)
+            if doi_ok[num_id] and manifest is not None:
+                manifest.update('tag_doi', edition.path_pdf +
+                                str(num_id)+"_doi.pdf", keys[num_id])
+
+    for num_id in sorted(errors):
+        print("ERREUR DOI papier", num_id, ":", errors[num_id])
+    print(len(jobs)-len(errors), "/", len(jobs), "PDF tagués avec le DOI")
+    return doi_ok
+
+
+def register_doi(registry, doi_ok, pdf_index):
+    """
+    Fonction permettant d'enregistrer les PDF tagués avec leur DOI dans le
+    registre (à appeler après pdf_index.refresh)
+
+    Parameters
+    ----------
+    registry : Registry
+        Registre des soumissions.
+    doi_ok : Dict
+        Dictionnaire {num_id : booléen} renvoyé par tag_doi_all.
+    pdf_index : PdfIndex
+        Index des PDF qui fournit l'empreinte des PDF tagués.
+
+    Returns
+    -------
+    None.
+
+    """
+    for num_id in doi_ok:
+        if doi_ok[num_id]:
+            registry.set_artifact(num_id, 'doi_pdf', pdf_index.path_pdf +
+                                  str(num_id)+'_doi.pdf',
+                                  pdf_index.sha256(num_id, doi=True))
+        else:
+            registry.remove_artifact(num_id, 'doi_pdf')
+    registry.commit()
+
+
+def write_recueil_actes(edition, Dtheme, doi_ok, manifest=None,
+                        pdf_index=None):
     """
     Fonction permettant d'écrire le recueil des actes (i.e. actes.tex) avec l'inclusion des
     différents papers.inc.tex.
 
     Parameters
     ----------
+    edition : Edition
+        Édition du congrès (répertoires).
     Dtheme : Dict
         Dictionnaire avec les thèmes en clés et les n° papiers en valeurs
         ainsi on peut avoir :
 
         >>> Dtheme['Milieux poreux']
         [36, 50, 92, 93, 177]
+    doi_ok : Dict
+        Dictionnaire {num_id : booléen} renvoyé par tag_doi_all.
+    manifest : Manifest, optional
+        Manifeste de construction, les fichiers Actes/p*.tex ne sont
+        régénérés que si leurs entrées ont changé. The default is None.
+    pdf_index : PdfIndex, optional
+        Index des PDF des articles, la coupure en deux tomes se fait alors
+        sur le nombre de pages et non sur le nombre de papiers.
+        The default is None.
     """
 
-    copyfile(Path_EXTEX+"Recueil_Actes/actes_start.tex",
-             Path_EXTEX+"Recueil_Actes/actes.tex")
+    path_recueil = edition.path_extex+"Recueil_Actes/"
+    # chemin des PDF pour \includepdf, relatif au répertoire de compilation
+    path_pdf = os.path.relpath(edition.path_pdf, path_recueil)
+    copyfile(path_recueil+"actes_start.tex", path_recueil+"actes.tex")
     file_recueil_acte = open(
-        Path_EXTEX+"Recueil_Actes/actes.tex", "a+", encoding='utf-8')
-    # nb_paper = len(List_files_abs_tex)
-    nb_paper = len(os.listdir(Path_IMOC+"PDF_articles/"))//2
-    count_paper = 0
+        path_recueil+"actes.tex", "a+", encoding='utf-8')
+    if pdf_index is not None:
+        weight = pdf_index.pages
+    else:
+        weight = lambda num_id: 1
+    nb_pages = sum(weight(num_id) for num_id in doi_ok if doi_ok[num_id])
+    count_pages = 0
     pass_tome = True
     for num_theme, theme in enumerate(Dtheme):
         file_recueil_acte.write("\n\chapter{"+theme+"}\n")
         file_recueil_acte.write("\minitoc \n")
         file_recueil_acte.write(
             "\\input{paper."+str(num_theme+1)+".inc.tex} \n")
-        if count_paper > nb_paper//2 and pass_tome:
+        if count_pages > nb_pages//2 and pass_tome:
             file_recueil_acte.writelines(["\n%%%%%%% T2 %%%%% \n", "\cleardoublepage \n",
                                           "\phantomsection \n",
                                           "\\addcontentsline{toc}{part}{Tome 2} \n\n"])
             pass_tome = False
+            pages_tome1 = count_pages
 
-        file_theme = open(Path_EXTEX+"Recueil_Actes/paper." +
+        file_theme = open(path_recueil+"paper." +
                           str(num_theme+1)+".inc.tex", "w", encoding='utf-8')
         file_theme.write("%%%%%%%%%%%%%%%%%%%%%%%%%%\n")
         file_theme.write("% Theme numéro "+str(num_theme+1) +
@@ -637,11 +977,18 @@ def write_recueil_actes(Dtheme):
         file_theme.write("%%%%%%%%%%%%%%%%%%%%%%%%%%\n")
 
         for num_id in Dtheme[theme]:
-            if tag_doi(num_id, D_abs[num_id], overwrite=True):
-                count_paper = count_paper + 1
+            if doi_ok[num_id]:
+                count_pages = count_pages + weight(num_id)
                 file_theme.write("\\input{../Actes/p"+str(num_id)+".tex}\n")
-                filein = open(Path_EXTEX+"Abstracts/p" +
-                              str(num_id)+".tex", "r", encoding='utf-8')
+                filename_abs = edition.path_abs+"p"+str(num_id)+".tex"
+                filename_actes = edition.path_extex+"Actes/p"+str(num_id) + \
+                    ".tex"
+                if manifest is not None:
+                    key = manifest.digest(manifest.file(filename_abs),
+                                          path_pdf)
+                    if manifest.uptodate('Actes', filename_actes, key):
+                        continue
+                filein = open(filename_abs, "r", encoding='utf-8')
                 linesin = filein.readlines()
                 filein.close()
                 linesin[8] = "\\cleardoublepage\n"
@@ -649,98 +996,138 @@ def write_recueil_actes(Dtheme):
                 linesin = linesin[:index]+linesin[index+1:index+3]
                 linesin.append("\\label{ref:"+str(num_id)+"}\n")
                 linesin.append("\\includepdf[pages=-,pagecommand={\\thispagestyle{fancyplain}},width=1.05\paperwidth]{" +
-                               "../."+Path_IMOC+"PDF_articles/"+str(num_id)+"_doi.pdf}\n")
-                fileout = open(Path_EXTEX+"Actes/p"+str(num_id) +
-                               ".tex", "w", encoding='utf-8')
+                               path_pdf+"/"+str(num_id)+"_doi.pdf}\n")
+                fileout = open(filename_actes, "w", encoding='utf-8')
                 fileout.writelines(linesin)
                 fileout.close()
+                if manifest is not None:
+                    manifest.update('Actes', filename_actes, key)
 
         file_theme.close()
 
     file_recueil_acte.writelines(open(
-        Path_EXTEX+"Recueil_Actes/actes_end.tex", "r", encoding='utf-8').readlines())
+        path_recueil+"actes_end.tex", "r", encoding='utf-8').readlines())
     file_recueil_acte.close()
+    if pdf_index is not None and not pass_tome:
+        print("Estimation : Tome 1 =", pages_tome1, "pages, Tome 2 =",
+              nb_pages-pages_tome1, "pages (hors pages de garde)")
 
 
-def write_index_html(Dtheme, Dall, base_url):
+def toc_entry(title, authors, url):
     """
-    Fonction permettant de générer le fichier de la table des matières en
-    markdown 'Table_of_contents.md'
+    Fonction permettant d'écrire l'entrée markdown d'un papier dans la table
+    des matières : titre avec le lien vers la page HTML puis les auteurs
 
     Parameters
     ----------
-    Dtheme : Dict
-        Dictionnaire avec les thèmes en clés et les n° papiers en valeurs
-        ainsi on peut avoir :
+    title : Str
+        Titre du papier.
+    authors : List
+        Liste des auteurs [nom, prénom, ...].
+    url : Str
+        URL de la page HTML du papier sur le site de la SFT.
 
-        >>> Dtheme['Milieux poreux']
-        [36, 50, 92, 93, 177]
+    Returns
+    -------
+    String
+        Entrée markdown.
+
+    """
+    return "["+title+"]("+url+")<br>" + \
+        ', '.join(list(map(lambda x: x[1]+" "+x[0], authors))) + \
+        '\n\n'
 
-    Dall : Dict
-        Dictionnaire de tous les abstracts avec les id en clé
-        ainsi on a :
 
-        >>> D_abs[1]
-        {'SUBMISSION ID': '1',
-         'SUBMISSION DATE': '2020-11-16',
-         'LAST UPDATED': '2021-03-26',
-         ...
-         'CHAIR NOTES': 'Résumé bien structuré. Merci de corriger les coupures de mots.',
-         'DOI': '10.25855/SFT2021-001'}
+def write_index_html(edition, registry, author_index=None):
+    """
+    Fonction permettant de générer le fichier de la table des matières en
+    markdown 'Table_of_contents.md' à partir du registre
 
-    base_url : Str
-        Chaîne de caractères avec l'URL sur le site de la SFT.
+    Parameters
+    ----------
+    edition : Edition
+        Édition du congrès (répertoire Export_HTML).
+    registry : Registry
+        Registre des soumissions avec leur thème (voir Registry.set_themes)
+        et leur URL.
+    author_index : AuthorIndex, optional
+        Index des auteurs, les noms sont écrits avec leur écriture
+        canonique. The default is None.
 
     Returns
     -------
-    None.
+    Bool
+        Vrai si pandoc a généré 'Table_of_contents.html'.
 
     """
-    fileheader = open(Path_HTML+"Table_of_contents_start.md",
+    fileheader = open(edition.path_export_html+"Table_of_contents_start.md",
                       "r", encoding='utf-8')
     header = ''.join(fileheader.readlines())
     fileheader.close()
-    with open(Path_HTML+"Table_of_contents.md", "w", encoding='utf-8') as index_md:
+    with open(edition.path_export_html+"Table_of_contents.md", "w",
+              encoding='utf-8') as index_md:
         index_md.write(header)
-        for theme in Dtheme:
-            index_md.write("### "+theme+'\n\n')
-            for num_id in Dtheme[theme]:
-                index_md.write("["+Dall[num_id]['TITRE']+"]")
-                index_md.write("("+base_url+"p"+str(num_id)+".html)<br>")
-                auteurs = extract_authors(Dall[num_id])
-                index_md.write(
-                    ', '.join(list(map(lambda x: x[1]+" "+x[0], auteurs))))
-                index_md.write('\n')
-                index_md.write('\n')
-    current_path = os.getcwd()
-    os.chdir(Path_HTML)
-    # print(title)
-    Mesg = '/usr/bin/pandoc --quiet -s -t html5 -c markdown-pandoc.css' +\
-        ' --metadata charset="utf-8" Table_of_contents.md ' +\
-        ' -o Table_of_contents.html'
+        current_theme = None
+        for theme, num_id, title, authors, url in registry.toc():
+            if theme != current_theme:
+                index_md.write("### "+theme+'\n\n')
+                current_theme = theme
+            if author_index is not None:
+                authors = author_index.creators(num_id) or authors
+            index_md.write(toc_entry(title, authors, url))
+    cmd = ['/usr/bin/pandoc', '--quiet', '-s', '-t', 'html5', '-c',
+           'markdown-pandoc.css', '--metadata', 'charset=utf-8',
+           'Table_of_contents.md', '-o', 'Table_of_contents.html']
     print("\n"+20*"="+"\n")
-    print("""
-          Pour générer l'index HTML des articles il faut taper les commandes
-          suivantes
-          """)
-    print(Mesg)
-    os.system(Mesg)
-    os.chdir(current_path)
+    print(' '.join(cmd))
+    # cwd plutôt que os.chdir : la fonction peut tourner dans un thread
+    job = run_command(cmd, edition.path_export_html, TIMEOUT_PANDOC)
+    if not job.ok:
+        print("ERREUR pandoc :", job.log().strip())
+    return job.ok
 
 
 if __name__ == "__main__":
-    Path_EXF = './Export_Files/'
-    Path_EXTEX = './Export_Tex/'
-    Path_IMOC = './Imports_OpenConf/'
-    Path_HTML = './Export_HTML/'
+    # édition décrite par ./edition.json (congrès 2021 par défaut)
+    edition = Edition.load('./')
+    # profile = True : profil cProfile du processus principal
+    profile = False
+    profiler = Profiler('./make_recueils.prof', profile)
+    profiler.start()
+    manifest = Manifest('./build_manifest.json')
+    nb_workers = os.cpu_count()
+    pdf_index = PdfIndex(edition.path_pdf, './pdf_index.json')
+    with tracer.span('pdf_index'):
+        pdf_index.refresh(nb_workers)
+    # préambule commun (config.tex) précompilé une fois pour tous les recueils
+    latex_format = LatexFormat(edition.path_extex)
+    # registre des soumissions, DOI, URL et fichiers produits (lu par make_XML)
+    registry = Registry('./registry.sqlite', edition.base_url)
 # %% Tableau reviewers
 
-    tableau_reviewer("Tableau_Reviewer.csv", 3)
+    with tracer.span('tableau_reviewer'):
+        tableau_reviewer(edition, "Tableau_Reviewer.csv", 3)
 
 # %% Traitement Abstract
-    filename_export_OpenConf = 'openconf-SFT2021-submissions-all'+'.csv'
-    List_files_abs_tex, D_abs = All_Abstracts(
-        filename_export_OpenConf, overwrite=False)
+    # streaming = True pour les exports de plusieurs dizaines de milliers de
+    # soumissions : les soumissions ne sont conservées que dans le registre
+    streaming = False
+    # index des auteurs construit une seule fois et utilisé par toutes les
+    # sorties (\index, table des matières, liste des auteurs)
+    author_index = AuthorIndex()
+    # correspondances relues des affiliations et des auteurs (dedup.py)
+    canonical = CanonicalMap.load(edition.path_imoc+'canonical_map.csv')
+    with tracer.span('Abstracts'):
+        if streaming:
+            stream_abstracts(edition, registry,
+                             overwrite=False, manifest=manifest,
+                             pdf_index=pdf_index, author_index=author_index,
+                             canonical=canonical)
+        else:
+            List_files_abs_tex, D_abs = All_Abstracts(
+                edition, overwrite=False, manifest=manifest,
+                pdf_index=pdf_index, registry=registry,
+                author_index=author_index, canonical=canonical)
 
 # %% Initialisation des themes et des Biot-Fourier
 
@@ -748,30 +1135,73 @@ if __name__ == "__main__":
 
 # %% Création du recueil des résumés
 
-    Dtheme = write_recueil_resume('choix_theme.csv')
-
-    print("""
-          Pour générer le recueil des résumés il faut vérifier
-          tous les abstracts et ensuite lancer les commandes
-
-          cd """+Path_EXTEX+"Recueil_Resume"+"""
-          latexmk -CA
-          latexmk -CF --silent -pdf -jobname=Resumes_SFT2021 Recueil_Resume.tex
-          """)
+    with tracer.span('write_recueil_resume'):
+        Dtheme = write_recueil_resume(edition, 'choix_theme.csv')
+    registry.set_themes(Dtheme)
+    registry.commit()
+
+    # fragments = True : chaque abstract est compilé séparément (en parallèle
+    # et seulement s'il a changé) puis le recueil est assemblé directement
+    fragments = False
+    if fragments:
+        with tracer.span('RecueilResume'):
+            RecueilResume(edition.path_extex, Dtheme, nb_workers, manifest,
+                          latex_format, author_index).build(
+                              edition.jobname('Resumes'))
+    else:
+        fmt = latex_format.get(edition.path_extex +
+                               "Recueil_Resume/Recueil_Resume.tex")
+        print("""
+              Pour générer le recueil des résumés il faut vérifier
+              tous les abstracts et ensuite lancer les commandes
+
+              cd """+edition.path_extex+"Recueil_Resume"+"""
+              latexmk -CA
+              latexmk -CF --silent -pdf """ +
+              LatexFormat.latexmk_option(fmt) + "-jobname=" +
+              edition.jobname('Resumes') + """ Recueil_Resume.tex
+              """)
 
 # %% Création de l'index HTML des articles
-    base_URL = "https://www.sft.asso.fr/DOIeditions/CFT2021/Abstracts/"
-    write_index_html(Dtheme, D_abs, base_URL)
-
+    with tracer.span('write_index_html'):
+        write_index_html(edition, registry, author_index)
+    # site statique : pages par thème et par auteur, index de recherche
+    with tracer.span('write_site'):
+        write_site(edition, registry, author_index)
 
 # %% Création des actes*
     print("\n"+20*"="+"\n")
-    write_recueil_actes(Dtheme)
-    print("""
-          Pour générer le recueil des actes il faut vérifier
-          lancer les commandes
-
-          cd """+Path_EXTEX+"Recueil_Actes"+"""
-          latexmk -CA
-          latexmk -CF --silent -jobname=Actes_SFT2021 -pdf actes.tex
-          """)
+    with tracer.span('tag_doi_all'):
+        doi_ok = tag_doi_all(edition, Dtheme, registry.dois(), nb_workers,
+                             manifest, pdf_index)
+        pdf_index.refresh(nb_workers)
+    register_doi(registry, doi_ok, pdf_index)
+    with tracer.span('write_recueil_actes'):
+        write_recueil_actes(edition, Dtheme, doi_ok, manifest, pdf_index)
+
+    # assemblage = True : les pages de garde sont compilées seules et les PDF
+    # des articles sont insérés directement (sans \includepdf)
+    assemblage = False
+    if assemblage:
+        with tracer.span('RecueilActes'):
+            RecueilActes(edition.path_extex, edition.path_pdf, Dtheme, doi_ok,
+                         nb_workers, manifest, latex_format, author_index,
+                         pdf_index).build(edition.jobname('Actes'))
+    registry.close()
+    manifest.save()
+    manifest.summary()
+    tracer.export_chrome('./trace_make_recueils.json')
+    tracer.summary()
+    profiler.stop()
+    if not assemblage:
+        fmt = latex_format.get(edition.path_extex+"Recueil_Actes/actes.tex")
+        print("""
+              Pour générer le recueil des actes il faut vérifier
+              lancer les commandes
+
+              cd """+edition.path_extex+"Recueil_Actes"+"""
+              latexmk -CA
+              latexmk -CF --silent -pdf """ +
+              LatexFormat.latexmk_option(fmt) + "-jobname=" +
+              edition.jobname('Actes') + """ actes.tex
+              """)
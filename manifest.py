@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:02:51 2026
+
+@author: phil
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+
+def hash_file(filename):
+    """
+    Fonction permettant de calculer l'empreinte SHA-256 d'un fichier
+
+    Parameters
+    ----------
+    filename : String
+        Nom du fichier.
+
+    Returns
+    -------
+    String
+        Empreinte hexadécimale, chaîne vide si le fichier n'existe pas.
+
+    """
+    if not os.path.isfile(filename):
+        return ''
+    h = hashlib.sha256()
+    with open(filename, 'rb') as file_in:
+        for block in iter(lambda: file_in.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class Manifest:
+    """
+    Manifeste de construction : pour chaque fichier généré on garde
+    l'empreinte de ses entrées (ligne CSV, PDF source, gabarits...). Une étape
+    n'est relancée que si cette empreinte a changé ou si le fichier généré
+    a disparu.
+
+    Example
+    -------
+    >>> manifest = Manifest('./build_manifest.json')
+    >>> key = manifest.digest(row, manifest.file('config_html.tex'))
+    >>> if not manifest.uptodate('textohtml', 'p1.html', key):
+            ...
+            manifest.update('textohtml', 'p1.html', key)
+    >>> manifest.save()
+    >>> manifest.summary()
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.targets = {}
+        if os.path.isfile(filename):
+            with open(filename, 'r', encoding='utf-8') as file_manifest:
+                self.targets = json.load(file_manifest)
+        self.files = {}
+        self.stages = OrderedDict()
+
+    def file(self, filename):
+        """
+        Empreinte d'un fichier d'entrée, calculée une seule fois par run
+        """
+        if filename not in self.files:
+            self.files[filename] = hash_file(filename)
+        return self.files[filename]
+
+    def forget(self, filenames=None):
+        """
+        Oublie les empreintes des fichiers d'entrée modifiés (toutes si
+        filenames vaut None) et les compteurs, avant un nouveau passage dans
+        le même processus (build.py --watch)
+        """
+        self.stages = OrderedDict()
+        if filenames is None:
+            self.files = {}
+            return
+        filenames = {os.path.realpath(f) for f in filenames}
+        for filename in list(self.files):
+            if os.path.realpath(filename) in filenames:
+                del self.files[filename]
+
+    def digest(self, *items):
+        """
+        Empreinte de plusieurs entrées (chaînes, dictionnaires, listes)
+        """
+        h = hashlib.sha256()
+        for item in items:
+            if not isinstance(item, str):
+                item = json.dumps(item, sort_keys=True, ensure_ascii=False)
+            h.update(item.encode('utf-8'))
+            h.update(b'\0')
+        return h.hexdigest()
+
+    def _count(self, stage, status):
+        counts = self.stages.setdefault(stage, {'rebuilt': 0, 'skipped': 0})
+        counts[status] += 1
+
+    def uptodate(self, stage, target, key):
+        """
+        Renvoie vrai si target existe et a été construit avec la même
+        empreinte d'entrées. Le fichier est alors compté comme ignoré.
+        """
+        if self.targets.get(target) == key and os.path.isfile(target):
+            self._count(stage, 'skipped')
+            return True
+        return False
+
+    def update(self, stage, target, key):
+        """
+        Enregistre l'empreinte des entrées d'un fichier qui vient d'être
+        reconstruit
+        """
+        self.targets[target] = key
+        self._count(stage, 'rebuilt')
+
+    def save(self):
+        with open(self.filename, 'w', encoding='utf-8') as file_manifest:
+            json.dump(self.targets, file_manifest, indent=1, sort_keys=True)
+
+    def summary(self):
+        print("\n"+20*"="+"\n")
+        print("Résumé de la construction")
+        for stage, counts in self.stages.items():
+            print("  {:<20s} {:5d} reconstruits {:5d} inchangés".format(
+                stage, counts['rebuilt'], counts['skipped']))
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 12:05:33 2026
+
+@author: phil
+"""
+import re
+import unicodedata
+
+
+def clean_string(ch, accents=True, spaces=True):
+    """
+    Fonction permettant de nettoyer une chaîne de caractères avec l'option
+    de supprimer les blancs et/ou les espaces
+
+    Parameters
+    ----------
+    ch : String
+        chaine de caractères d'entrée
+    accents : Boolean, optional
+        Si vrai alors on supprime les accents. The default is True.
+    spaces : Boolean, optional
+        Si vrai alors on supprime les espaces. The default is True.
+
+    Returns
+    -------
+    ch : String
+        Chaîne de carctères en sortie.
+
+    """
+    if accents:
+        ch = unicodedata.normalize('NFKD', ch)
+    if spaces:
+        ch = ch.replace(' ', '')
+    return ch.encode('ASCII', 'ignore').decode("utf-8")
+
+
+def unique(L):
+    """
+    Fonction permettant de ne retenir que les éléments uniques d'une liste
+    en conservant l'ordre d'apparition
+
+    Parameters
+    ----------
+    L : List
+        liste d'entrée
+    Returns
+    -------
+    list : List
+        Liste de sortie
+
+    """
+    return list(dict.fromkeys(L))
+
+
+class Author:
+    """
+    Auteur d'une soumission : nom, prénom, affiliation et numéro de
+    l'affiliation dans la liste des affiliations du papier (à partir de 1)
+    """
+    __slots__ = ('name', 'surname', 'affiliation', 'aff_num')
+
+    def __init__(self, name, surname, affiliation, aff_num=0):
+        self.name = name
+        self.surname = surname
+        self.affiliation = affiliation
+        self.aff_num = aff_num
+
+    def __repr__(self):
+        return 'Author({!r}, {!r}, {!r}, {})'.format(
+            self.name, self.surname, self.affiliation, self.aff_num)
+
+
+class Submission:
+    """
+    Soumission OpenConf une fois nettoyée. Seuls les champs utilisés pour
+    les recueils, le HTML et les DOI sont conservés.
+    """
+    __slots__ = ('num_id', 'title', 'abstract', 'keywords', 'contact_name',
+                 'contact_email', 'authors', 'affiliations', 'doi')
+
+    def __init__(self, num_id, title, abstract, keywords, contact_name,
+                 contact_email, authors, affiliations, doi=None):
+        self.num_id = num_id
+        self.title = title
+        self.abstract = abstract
+        self.keywords = keywords
+        self.contact_name = contact_name
+        self.contact_email = contact_email
+        self.authors = authors
+        self.affiliations = affiliations
+        self.doi = doi
+
+    def __repr__(self):
+        return 'Submission({}, {!r})'.format(self.num_id, self.title)
+
+    def as_dict(self):
+        """
+        Renvoie la soumission sous forme de dictionnaire (pour les
+        empreintes et les exports)
+        """
+        d = {k: getattr(self, k) for k in self.__slots__}
+        d['authors'] = [[a.name, a.surname, a.affiliation, a.aff_num]
+                        for a in self.authors]
+        return d
+
+
+class ColumnSchema:
+    """
+    Schéma des colonnes d'un export OpenConf. L'entête du CSV est analysé une
+    seule fois pour trouver les colonnes de chaque auteur, ensuite chaque
+    ligne est convertie en Submission sans parcourir toutes ses clés.
+
+    Example
+    -------
+    >>> csv_reader = csv.DictReader(file_export_OpenConf)
+    >>> schema = ColumnSchema(csv_reader.fieldnames)
+    >>> sub = schema.submission(clean_dict(row))
+
+    Si canonical (dedup.CanonicalMap) est donné, les affiliations et les
+    noms des auteurs sont remplacés par leur forme canonique relue.
+    """
+    re_author = re.compile(r'AUTHOR (\d+) (NOM|PRÉNOM|AFFILIATION)$')
+
+    def __init__(self, fieldnames, canonical=None):
+        self.canonical = canonical
+        cols = {}
+        for field in fieldnames:
+            field = field.strip()
+            match = self.re_author.match(field)
+            if match:
+                cols.setdefault(int(match.group(1)), {})[match.group(2)] = \
+                    field
+        # [(colonne NOM, colonne PRÉNOM, colonne AFFILIATION), ...]
+        self.authors = [(cols[i]['NOM'], cols[i]['PRÉNOM'],
+                         cols[i]['AFFILIATION'])
+                        for i in sorted(cols)
+                        if len(cols[i]) == 3]
+
+    def submission(self, d):
+        """
+        Fonction permettant de convertir une ligne nettoyée par clean_dict en
+        Submission
+
+        Parameters
+        ----------
+        d : Dict
+            Dictionnaire correspondant à un seul article.
+
+        Returns
+        -------
+        Submission
+
+        """
+        authors = []
+        for col_name, col_surname, col_aff in self.authors:
+            if col_name in d and col_surname in d:
+                authors.append(Author(d[col_name].title().strip(),
+                                      d[col_surname].title().strip(),
+                                      d.get(col_aff, '')))
+        contact_name = d.get('CONTACT AUTHOR NOM', '').title().strip()
+        contact_aff = d.get('CONTACT AUTHOR AFFILIATION')
+        if self.canonical is not None:
+            for a in authors:
+                name, surname = self.canonical.author(a.name, a.surname)
+                if a.name == contact_name:
+                    contact_name = name
+                a.name, a.surname = name, surname
+                a.affiliation = self.canonical.affiliation(a.affiliation)
+            if contact_aff is not None:
+                contact_aff = self.canonical.affiliation(contact_aff)
+
+        # L'affiliation de l'auteur contact est placée en premier, les
+        # affiliations vides ne sont pas numérotées
+        List_aff = [a.affiliation for a in authors if a.affiliation]
+        if contact_aff in List_aff:
+            List_aff.insert(0, contact_aff)
+        List_aff = unique(List_aff)
+        aff_num = {aff: i for i, aff in enumerate(List_aff, start=1)}
+        for a in authors:
+            a.aff_num = aff_num.get(a.affiliation, 0)
+
+        return Submission(int(d['SUBMISSION ID']), d['TITRE'],
+                          d.get('RÉSUMÉ', ''), d.get('MOTS CLÉS', ''),
+                          contact_name,
+                          d.get('CONTACT AUTHOR EMAIL', ''),
+                          authors, List_aff, d.get('DOI'))
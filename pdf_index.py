@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:20:07 2026
+
+@author: phil
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import fitz
+
+from manifest import hash_file
+
+
+def pdf_info(filename):
+    """
+    Fonction permettant de lire les métadonnées d'un PDF
+
+    Parameters
+    ----------
+    filename : String
+        Nom du fichier PDF.
+
+    Returns
+    -------
+    info : Dict
+        Dictionnaire {'size', 'mtime', 'pages', 'sha256'}.
+
+    """
+    stat = os.stat(filename)
+    doc = fitz.open(filename)
+    pages = doc.page_count
+    doc.close()
+    return {'size': stat.st_size, 'mtime': stat.st_mtime, 'pages': pages,
+            'sha256': hash_file(filename)}
+
+
+class PdfIndex:
+    """
+    Index persistant des PDF des articles (nombre de pages, taille, date de
+    modification et empreinte). Seuls les fichiers dont la taille ou la date
+    de modification ont changé sont relus lors d'un refresh.
+
+    Example
+    -------
+    >>> pdf_index = PdfIndex('./Imports_OpenConf/PDF_articles/',
+                             './pdf_index.json')
+    >>> pdf_index.refresh()
+    >>> pdf_index.has_doi(1), pdf_index.pages(1)
+    (True, 12)
+
+    shared est un dictionnaire {chemin réel : métadonnées} commun à
+    plusieurs index (voir edition.Caches) : un PDF déjà lu pour une autre
+    édition (réédition qui reprend les mêmes fichiers) n'est pas relu.
+
+    Un PDF illisible (fichier corrompu) est gardé dans l'index avec l'erreur
+    (voir errors) : il compte comme absent et n'est relu que s'il change.
+    """
+
+    def __init__(self, path_pdf, filename_index, shared=None):
+        self.path_pdf = path_pdf
+        self.filename_index = filename_index
+        self.shared = shared
+        self.files = {}
+        if os.path.isfile(filename_index):
+            with open(filename_index, 'r', encoding='utf-8') as file_index:
+                self.files = json.load(file_index)
+
+    def refresh(self, nb_workers=None):
+        """
+        Met à jour l'index en parallèle pour les fichiers nouveaux ou
+        modifiés, supprime les fichiers disparus et sauvegarde l'index.
+        Renvoie la liste des fichiers relus.
+        """
+        files = {}
+        List_todo = []
+        for entry in os.scandir(self.path_pdf):
+            if not entry.name.endswith('.pdf'):
+                continue
+            stat = entry.stat()
+            info = self.files.get(entry.name)
+            if info is None and self.shared is not None:
+                info = self.shared.get(os.path.realpath(entry.path))
+            if info is not None and info['size'] == stat.st_size and \
+                    info['mtime'] == stat.st_mtime:
+                files[entry.name] = info
+            else:
+                List_todo.append(entry.name)
+
+        errors = {}
+        if List_todo:
+            with ProcessPoolExecutor(max_workers=nb_workers) as executor:
+                jobs = {executor.submit(pdf_info, self.path_pdf+name): name
+                        for name in List_todo}
+                for job in as_completed(jobs):
+                    name = jobs[job]
+                    try:
+                        files[name] = job.result()
+                    except Exception as err:
+                        filename = self.path_pdf+name
+                        if not os.path.isfile(filename):
+                            continue
+                        stat = os.stat(filename)
+                        files[name] = {'size': stat.st_size,
+                                       'mtime': stat.st_mtime, 'pages': 0,
+                                       'sha256': hash_file(filename),
+                                       'error': repr(err)}
+                        errors[name] = repr(err)
+        for name in sorted(errors):
+            print("ERREUR PDF illisible", name, ":", errors[name])
+        if self.shared is not None:
+            for name, info in files.items():
+                self.shared[os.path.realpath(self.path_pdf+name)] = info
+
+        self.files = files
+        self.save()
+        return List_todo
+
+    def save(self):
+        with open(self.filename_index, 'w', encoding='utf-8') as file_index:
+            json.dump(self.files, file_index, indent=1, sort_keys=True)
+
+    def get(self, num_id, doi=False):
+        """
+        Métadonnées du PDF d'une soumission (ou de sa version avec DOI),
+        None si le fichier n'existe pas
+        """
+        info = self.files.get(str(num_id)+('_doi' if doi else '')+'.pdf')
+        if info is None or 'error' in info:
+            return None
+        return info
+
+    def errors(self):
+        """
+        Dictionnaire {fichier : erreur} des PDF illisibles
+        """
+        return {name: info['error']
+                for name, info in sorted(self.files.items())
+                if 'error' in info}
+
+    def has_pdf(self, num_id):
+        return self.get(num_id) is not None
+
+    def has_doi(self, num_id):
+        return self.get(num_id, doi=True) is not None
+
+    def pages(self, num_id, doi=False):
+        info = self.get(num_id, doi)
+        return 0 if info is None else info['pages']
+
+    def sha256(self, num_id, doi=False):
+        info = self.get(num_id, doi)
+        return '' if info is None else info['sha256']
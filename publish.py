@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:21:37 2026
+
+@author: phil
+
+Préparation de la mise en ligne du site (Export_HTML) dans Export_Publish :
+- les feuilles de style et les scripts sont renommés avec l'empreinte de
+  leur contenu (markdown-pandoc.0123456789.css) et les pages HTML
+  réécrites en conséquence : ils peuvent être mis en cache sans limite de
+  durée par les navigateurs ;
+- chaque fichier texte est accompagné de sa version compressée .gz (et .br
+  si le module brotli est installé), servie directement par le serveur ;
+- upload_manifest.json décrit tous les fichiers (empreinte, taille, type,
+  Cache-Control, compressions) et upload_changes.json la liste des
+  fichiers à envoyer et à supprimer depuis la dernière mise en ligne
+  (published.json, voir mark_published).
+
+    python publish.py               # prépare Export_Publish
+    python publish.py --published   # après l'envoi des fichiers
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from shutil import copyfile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# fichiers du site mis en ligne, les sources markdown restent locales
+EXTENSIONS = ('.html', '.css', '.js', '.json', '.png', '.jpg', '.svg')
+# fichiers renommés avec l'empreinte de leur contenu
+ASSETS = ('.css', '.js')
+# fichiers compressés (texte)
+COMPRESSED = ('.html', '.css', '.js', '.json', '.svg')
+# en dessous, la compression ne fait rien gagner
+MIN_SIZE = 256
+
+CACHE_ASSET = 'public, max-age=31536000, immutable'
+CACHE_PAGE = 'public, max-age=300, must-revalidate'
+
+re_ref = re.compile(r'((?:href|src)=")([^"#?:]+)(")')
+
+
+def fingerprint(relpath, data):
+    """
+    Nom d'un fichier avec l'empreinte de son contenu avant l'extension
+    """
+    root, ext = os.path.splitext(relpath)
+    return root+'.'+hashlib.sha256(data).hexdigest()[:10]+ext
+
+
+def rewrite(relpath, text, renamed):
+    """
+    Remplace dans une page HTML les références (href, src relatifs) aux
+    fichiers renommés par leur nom avec empreinte
+    """
+    dirname = os.path.dirname(relpath)
+
+    def replace(m):
+        target = os.path.normpath(os.path.join(dirname, m.group(2)))
+        target = target.replace(os.sep, '/')
+        if target not in renamed:
+            return m.group(0)
+        return m.group(1)+os.path.relpath(renamed[target], dirname or '.') + \
+            m.group(3)
+    return re_ref.sub(replace, text)
+
+
+def compress(filename):
+    """
+    Écrit les versions compressées d'un fichier (déterministes : un fichier
+    inchangé donne les mêmes .gz et .br) et renvoie la liste des
+    compressions écrites
+    """
+    with open(filename, 'rb') as file_in:
+        data = file_in.read()
+    encodings = []
+    for encoding, ext, func in (
+            ('gzip', '.gz', lambda data: gzip.compress(data, 9, mtime=0)),
+            ('br', '.br', None if brotli is None else
+             lambda data: brotli.compress(data, quality=11))):
+        if func is None:
+            continue
+        packed = func(data)
+        if len(packed) < len(data):
+            with open(filename+ext, 'wb') as file_out:
+                file_out.write(packed)
+            encodings.append(encoding)
+        elif os.path.isfile(filename+ext):
+            os.remove(filename+ext)
+    return encodings
+
+
+def sidecars(relpath, entry):
+    return [relpath+{'gzip': '.gz', 'br': '.br'}[encoding]
+            for encoding in entry['encodings']]
+
+
+def load_json(filename):
+    if not os.path.isfile(filename):
+        return {}
+    with open(filename, 'r', encoding='utf-8') as file_json:
+        return json.load(file_json)
+
+
+def write_json(filename, data):
+    with open(filename, 'w', encoding='utf-8') as file_json:
+        json.dump(data, file_json, ensure_ascii=False, indent=1,
+                  sort_keys=True)
+
+
+def publish(edition, nb_workers=None):
+    """
+    Fonction permettant de préparer les fichiers du site à mettre en ligne
+    dans Export_Publish : empreinte des feuilles de style et des scripts,
+    versions compressées et manifeste de mise en ligne. Seuls les fichiers
+    dont le contenu a changé sont réécrits et recompressés.
+
+    Parameters
+    ----------
+    edition : Edition
+        Édition du congrès (répertoires Export_HTML et Export_Publish).
+    nb_workers : Int, optional
+        Nombre de processus de compression. The default is None.
+
+    Returns
+    -------
+    changes : Dict
+        {'upload': [fichiers à envoyer], 'delete': [fichiers à supprimer]}
+        depuis la dernière mise en ligne.
+
+    """
+    path_in = edition.path_export_html
+    path_out = edition.path_publish
+    filename_manifest = path_out+'upload_manifest.json'
+    previous = load_json(filename_manifest)
+
+    List_src = []
+    for dirpath, dirnames, filenames in os.walk(path_in):
+        for filename in filenames:
+            if filename.endswith(EXTENSIONS):
+                List_src.append(os.path.relpath(
+                    os.path.join(dirpath, filename),
+                    path_in).replace(os.sep, '/'))
+    List_src.sort()
+
+    # feuilles de style et scripts renommés, puis pages réécrites
+    outputs = {}
+    renamed = {}
+    for relpath in List_src:
+        if relpath.endswith(ASSETS):
+            with open(path_in+relpath, 'rb') as file_in:
+                data = file_in.read()
+            renamed[relpath] = fingerprint(relpath, data)
+            outputs[renamed[relpath]] = (data, CACHE_ASSET)
+    for relpath in List_src:
+        if relpath in renamed:
+            continue
+        with open(path_in+relpath, 'rb') as file_in:
+            data = file_in.read()
+        if relpath.endswith('.html'):
+            data = rewrite(relpath, data.decode('utf-8'),
+                           renamed).encode('utf-8')
+        outputs[relpath] = (data, CACHE_PAGE)
+
+    files = {}
+    List_todo = []
+    for relpath, (data, cache) in outputs.items():
+        entry = {'sha256': hashlib.sha256(data).hexdigest(),
+                 'size': len(data),
+                 'content_type': mimetypes.guess_type(relpath)[0] or
+                 'application/octet-stream',
+                 'cache_control': cache, 'encodings': []}
+        files[relpath] = entry
+        old = previous.get(relpath)
+        if old is not None and old['sha256'] == entry['sha256'] and \
+                all(os.path.isfile(path_out+filename) for filename in
+                    [relpath]+sidecars(relpath, old)):
+            entry['encodings'] = old['encodings']
+            continue
+        os.makedirs(os.path.dirname(path_out+relpath), exist_ok=True)
+        with open(path_out+relpath, 'wb') as file_out:
+            file_out.write(data)
+        if relpath.endswith(COMPRESSED) and len(data) >= MIN_SIZE:
+            List_todo.append(relpath)
+
+    with ProcessPoolExecutor(max_workers=nb_workers) as executor:
+        for relpath, encodings in zip(List_todo, executor.map(
+                compress, [path_out+relpath for relpath in List_todo],
+                chunksize=16)):
+            files[relpath]['encodings'] = encodings
+
+    # fichiers des passages précédents qui ne sont plus produits
+    keep = {filename for relpath, entry in files.items()
+            for filename in [relpath]+sidecars(relpath, entry)}
+    keep |= {'upload_manifest.json', 'upload_changes.json', 'published.json'}
+    nb_removed = 0
+    for dirpath, dirnames, filenames in os.walk(path_out):
+        for filename in filenames:
+            relpath = os.path.relpath(os.path.join(dirpath, filename),
+                                      path_out).replace(os.sep, '/')
+            if relpath not in keep:
+                os.remove(path_out+relpath)
+                nb_removed += 1
+    write_json(filename_manifest, files)
+
+    # différences avec la dernière mise en ligne
+    published = load_json(path_out+'published.json')
+    upload = []
+    for relpath, entry in sorted(files.items()):
+        old = published.get(relpath)
+        if old is None or old['sha256'] != entry['sha256'] or \
+                old['encodings'] != entry['encodings']:
+            upload += [relpath]+sidecars(relpath, entry)
+    delete = sorted(filename for relpath, entry in published.items()
+                    for filename in [relpath]+sidecars(relpath, entry)
+                    if filename not in keep)
+    changes = {'upload': upload, 'delete': delete}
+    write_json(path_out+'upload_changes.json', changes)
+    print(len(files), "fichiers,", len(List_todo), "compressés,",
+          nb_removed, "supprimés" +
+          ("" if brotli is not None else " (brotli non installé : gzip)"))
+    print(len(upload), "fichiers à envoyer,", len(delete),
+          "à supprimer depuis la dernière mise en ligne")
+    return changes
+
+
+def mark_published(edition):
+    """
+    Fonction à appeler une fois les fichiers de upload_changes.json envoyés :
+    le manifeste courant devient la référence de la prochaine mise en ligne
+    """
+    path_out = edition.path_publish
+    copyfile(path_out+'upload_manifest.json', path_out+'published.json')
+    write_json(path_out+'upload_changes.json', {'upload': [], 'delete': []})
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from edition import Edition
+
+    parser = argparse.ArgumentParser(
+        description="Préparation de la mise en ligne du site HTML")
+    parser.add_argument('--root', default='./',
+                        help="répertoire de l'édition du congrès")
+    parser.add_argument('--published', action='store_true',
+                        help="les fichiers de upload_changes.json ont été "
+                        "envoyés")
+    args = parser.parse_args()
+    edition = Edition.load(args.root)
+    if args.published:
+        mark_published(edition)
+    else:
+        publish(edition, os.cpu_count())
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:58:36 2026
+
+@author: phil
+
+Construction du recueil des actes par assemblage direct avec fitz, sans
+\\includepdf : seules les pages de garde (début, partie, thèmes, liste des
+auteurs) sont compilées, les PDF des articles avec DOI sont insérés tels
+quels. Les numéros de page et l'entête sont ajoutés aux articles en
+parallèle (avec un cache), les cibles ref:{id} (table des matières,
+\\pageref du début du recueil) et les signets sont générés à partir de
+Dtheme.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import fitz
+
+from recueil_resume import RecueilResume, page_count, plain, stamp_page
+from tracing import timed, tracer
+
+A4 = fitz.paper_rect('a4')
+
+
+def running_header(filename_config):
+    """
+    Texte de l'entête des pages (\\fancyhead[C] de config.tex)
+    """
+    with open(filename_config, 'r', encoding='utf-8') as file_config:
+        match = re.search(r'^\\fancyhead\[C\]\{(.*)\}\s*$', file_config.read(),
+                          re.M)
+    if match is None:
+        return ''
+    return plain(match.group(1).replace('\\ier{}', 'er').replace('--', '-'))
+
+
+def stamp_header(page, header):
+    """
+    Ajoute l'entête centré et les filets de l'entête et du pied de page
+    """
+    width = fitz.get_text_length(header, fontname="helv", fontsize=9)
+    page.insert_text(fitz.Point((page.rect.width-width)/2, 32), header,
+                     fontname="helv", fontsize=9, color=(0, 0, 0))
+    for y in (38, page.rect.height-45):
+        page.draw_line(fitz.Point(56, y), fitz.Point(page.rect.width-56, y),
+                       width=0.5)
+
+
+def stamp_paper(filename_in, filename_out, first_page, header, scale=1.05):
+    """
+    Fonction permettant de mettre en page un article pour les actes : chaque
+    page est centrée sur une page A4 avec une largeur de scale fois la
+    largeur de la page (comme \\includepdf[width=1.05\\paperwidth]), avec
+    l'entête et le numéro de page
+
+    Parameters
+    ----------
+    filename_in : String
+        PDF de l'article avec DOI.
+    filename_out : String
+        PDF mis en page.
+    first_page : Int
+        Numéro de la première page de l'article dans le recueil.
+    header : String
+        Texte de l'entête.
+    scale : Float, optional
+        Largeur relative de l'article. The default is 1.05.
+
+    Returns
+    -------
+    nb_pages : Int
+        Nombre de pages de l'article.
+
+    """
+    src = fitz.open(filename_in)
+    doc = fitz.open()
+    for pno in range(src.page_count):
+        rect = src[pno].rect
+        page = doc.new_page(width=A4.width, height=A4.height)
+        width = A4.width*scale
+        height = width*rect.height/rect.width
+        page.show_pdf_page(fitz.Rect((A4.width-width)/2, (A4.height-height)/2,
+                                     (A4.width+width)/2, (A4.height+height)/2),
+                           src, pno)
+        stamp_header(page, header)
+        stamp_page(page, first_page+pno)
+    nb_pages = src.page_count
+    doc.save(filename_out, garbage=3, deflate=True)
+    doc.close()
+    src.close()
+    return nb_pages
+
+
+class RecueilActes(RecueilResume):
+    """
+    Recueil des actes assemblé directement (voir RecueilResume pour les
+    paramètres communs).
+
+    Parameters
+    ----------
+    path_extex : String
+        Répertoire Export_Tex.
+    path_pdf : String
+        Répertoire des PDF des articles (n°_doi.pdf).
+    Dtheme : Dict
+        Dictionnaire avec les thèmes en clés et les n° papiers en valeurs.
+    doi_ok : Dict
+        Dictionnaire {num_id : booléen} renvoyé par tag_doi_all, seuls les
+        papiers avec un PDF tagué sont insérés.
+    pdf_index : PdfIndex, optional
+        Index des PDF (nombre de pages et empreinte sans rouvrir les
+        fichiers). The default is None.
+
+    Example
+    -------
+    >>> recueil = RecueilActes('./Export_Tex/',
+                               './Imports_OpenConf/PDF_articles/', Dtheme,
+                               doi_ok, nb_workers=8, pdf_index=pdf_index)
+    >>> recueil.build('Actes_SFT2021')
+    """
+    subdir = 'Recueil_Actes/'
+    start = 'actes_start.tex'
+    part = 'Textes complets'
+
+    def __init__(self, path_extex, path_pdf, Dtheme, doi_ok, nb_workers=None,
+                 manifest=None, latex_format=None, author_index=None,
+                 pdf_index=None):
+        Dtheme = {theme: [num_id for num_id in Dtheme[theme]
+                          if doi_ok.get(num_id)] for theme in Dtheme}
+        super().__init__(path_extex, Dtheme, nb_workers, manifest,
+                         latex_format, author_index)
+        self.path_frag = self.path+'Assemblage/'
+        self.path_pdf = path_pdf
+        self.pdf_index = pdf_index
+        self.header = running_header(path_extex+'config.tex')
+
+    def filename_doi(self, num_id):
+        return self.path_pdf+str(num_id)+'_doi.pdf'
+
+    def nb_pages(self, num_id):
+        if self.pdf_index is not None:
+            return self.pdf_index.pages(num_id, doi=True)
+        return page_count(self.filename_doi(num_id))
+
+    # -- Documents générés --------------------------------------------------
+    def anchor(self, name):
+        return name
+
+    def toc(self, pages, theme_pages, annexes_page, tome2=None):
+        text = "\\chapter*{\\contentsname}\n"
+        text += "\\contentsline{part}{"+self.part+"}{1}{}\n"
+        text += "\\contentsline{part}{Tome 1}{1}{}\n"
+        for k, theme in enumerate(self.Dtheme, start=1):
+            if theme == tome2:
+                text += "\\contentsline{part}{Tome 2}{" + \
+                    str(theme_pages[theme])+"}{theme."+str(k)+"}\n"
+            text += "\\contentsline{chapter}{\\numberline{"+str(k)+"}" + \
+                theme+"}{"+str(theme_pages[theme])+"}{theme."+str(k)+"}\n"
+            for num_id in self.Dtheme[theme]:
+                text += "\\contentsline{section}{" + \
+                    self.meta[num_id]['title']+"}{"+str(pages[num_id]) + \
+                    "}{ref:"+str(num_id)+"}\n"
+        text += "\\contentsline{part}{Annexes}{"+str(annexes_page)+"}{}\n"
+        text += "\\contentsline{chapter}{Liste des auteurs}{" + \
+            str(annexes_page+2)+"}{}\n"
+        return text
+
+    def labels(self, pages):
+        """
+        \\newlabel des articles pour les \\pageref{ref:id} du début du
+        recueil (prix Biot-Fourier...)
+        """
+        return ''.join("\\newlabel{ref:"+str(num_id)+"}{{}{" +
+                       str(pages[num_id])+"}{}{ref:"+str(num_id)+"}{}}\n"
+                       for num_id in sorted(pages))
+
+    # -- Mise en page -------------------------------------------------------
+    def layout(self):
+        """
+        Plan du recueil à partir du \\mainmatter : liste de (type, référence,
+        première page) avec les types 'part', 'theme', 'paper' et 'blank'
+        (page blanche pour \\cleardoublepage), puis le thème qui commence le
+        tome 2 (coupure à la moitié des pages des articles) et la page des
+        annexes.
+        """
+        page = 1
+        plan = [('part', None, page)]
+        page += page_count(self.path_frag+'part.pdf')
+        nb_total = sum(self.nb_pages(num_id) for theme in self.Dtheme
+                       for num_id in self.Dtheme[theme])
+        count = 0
+        tome2 = None
+        for k, theme in enumerate(self.Dtheme, start=1):
+            if tome2 is None and count > nb_total//2:
+                tome2 = theme
+            plan.append(('theme', k, page))
+            page += page_count(self.path_frag+'theme.'+str(k)+'.pdf')
+            for num_id in self.Dtheme[theme]:
+                # chaque article commence sur une page impaire
+                if page % 2 == 0:
+                    plan.append(('blank', None, page))
+                    page += 1
+                plan.append(('paper', num_id, page))
+                nb = self.nb_pages(num_id)
+                page += nb
+                count += nb
+            if page % 2 == 0:
+                plan.append(('blank', None, page))
+                page += 1
+        return plan, tome2, page
+
+    def stamp_all(self, plan):
+        """
+        Met en page en parallèle les articles du plan (stamp_paper), seuls
+        ceux dont le PDF, la première page ou l'entête ont changé sont
+        refaits
+        """
+        List_todo = []
+        keys = {}
+        for kind, num_id, page in plan:
+            if kind != 'paper':
+                continue
+            filename_out = self.path_frag+'p'+str(num_id)+'.pdf'
+            if self.manifest is not None:
+                if self.pdf_index is not None:
+                    sha256 = self.pdf_index.sha256(num_id, doi=True)
+                else:
+                    sha256 = self.manifest.file(self.filename_doi(num_id))
+                keys[num_id] = self.manifest.digest(sha256, page, self.header)
+                if self.manifest.uptodate('actes_pages', filename_out,
+                                          keys[num_id]):
+                    continue
+            List_todo.append((num_id, page))
+
+        with ProcessPoolExecutor(max_workers=self.nb_workers) as executor:
+            jobs = {executor.submit(timed, stamp_paper,
+                                    self.filename_doi(num_id),
+                                    self.path_frag+'p'+str(num_id)+'.pdf',
+                                    page, self.header): num_id
+                    for num_id, page in List_todo}
+            for job in as_completed(jobs):
+                num_id = jobs[job]
+                try:
+                    tracer.collect(job.result(), 'stamp_paper', num_id=num_id)
+                except Exception as err:
+                    self.errors['p'+str(num_id)+'.pdf'] = repr(err)
+                    continue
+                if self.manifest is not None:
+                    self.manifest.update('actes_pages', self.path_frag+'p' +
+                                         str(num_id)+'.pdf', keys[num_id])
+        print(len(List_todo), "articles mis en page")
+
+    # -- Assemblage ---------------------------------------------------------
+    def build(self, jobname):
+        """
+        Fonction permettant de construire le recueil des actes complet
+
+        Parameters
+        ----------
+        jobname : String
+            Nom du PDF final (sans extension), stocké dans Recueil_Actes.
+
+        Returns
+        -------
+        errors : Dict
+            Fichiers en échec avec la fin de leur log.
+
+        """
+        os.makedirs(self.path_frag, exist_ok=True)
+        themes = list(self.Dtheme)
+        # 1re passe sans numéros pour connaître la taille des pages de garde,
+        # inutile si elles ont déjà été compilées
+        first_pass = not all(os.path.isfile(self.path_frag+filename_pdf)
+                             for filename_pdf in ['part.pdf'] +
+                             ['theme.'+str(k)+'.pdf'
+                              for k in range(1, len(themes)+1)])
+        if first_pass:
+            List_separators = self.separator_docs({})
+        if self.latex_format is not None:
+            self.fmt = self.latex_format.get(self.path_frag+'part.tex')
+        if first_pass:
+            self.compile_all(List_separators)
+        if self.errors:
+            return self.report()
+        plan, tome2, annexes_page = self.layout()
+        pages = {ref: page for kind, ref, page in plan if kind == 'paper'}
+        theme_pages = {themes[k-1]: page for kind, k, page in plan
+                       if kind == 'theme'}
+        self.compile_all(self.separator_docs(pages))
+        self.compile_all([self.annexes_doc(pages),
+                          self.front_doc(self.toc(pages, theme_pages,
+                                                  annexes_page, tome2),
+                                         self.labels(pages))])
+        self.stamp_all(plan)
+        if self.errors:
+            return self.report()
+
+        book = fitz.open()
+        outline = []
+        dests = {}
+        links = []
+
+        def append(filename_pdf, number=None):
+            doc = fitz.open(self.path_frag+filename_pdf)
+            start = len(book)
+            # liens vers les cibles ref:{id} et theme.{k}, perdus par
+            # insert_pdf car elles n'existent pas dans le document seul
+            for pno in range(doc.page_count):
+                for link in doc[pno].get_links():
+                    name = link.get('nameddest') or link.get('name')
+                    if link['kind'] == fitz.LINK_NAMED and name:
+                        links.append((start+pno, link['from'], name))
+            book.insert_pdf(doc)
+            doc.close()
+            if number is not None:
+                for i in range(start, len(book)):
+                    stamp_page(book[i], number+i-start)
+            return start
+
+        front = fitz.open(self.path_frag+'front.pdf')
+        outline.extend(front.get_toc())
+        front.close()
+        append('front.pdf')
+        level = 1
+        for kind, ref, page in plan:
+            if kind == 'part':
+                outline.append([1, self.part, append('part.pdf', page)+1])
+                outline.append([2, 'Tome 1', len(book)+1])
+            elif kind == 'theme':
+                theme = themes[ref-1]
+                if theme == tome2:
+                    outline.append([2, 'Tome 2', len(book)+1])
+                start = append('theme.'+str(ref)+'.pdf', page)
+                dests['theme.'+str(ref)] = start
+                outline.append([3, str(ref)+' '+plain(theme), start+1])
+                level = 4
+            elif kind == 'paper':
+                start = append('p'+str(ref)+'.pdf')
+                dests['ref:'+str(ref)] = start
+                outline.append([level, plain(self.meta[ref]['title']),
+                                start+1])
+            else:
+                book.new_page(-1, width=A4.width, height=A4.height)
+        outline.append([1, 'Annexes', append('annexes.pdf', annexes_page)+1])
+        book.set_toc(outline)
+        for pno, rect, name in links:
+            if name in dests:
+                book[pno].insert_link({'kind': fitz.LINK_GOTO, 'from': rect,
+                                       'page': dests[name],
+                                       'to': fitz.Point(0, 0)})
+        set_named_dests(book, dests)
+        book.save(self.path+jobname+'.pdf', garbage=3, deflate=True)
+        book.close()
+        print("Recueil des actes :", self.path+jobname+'.pdf')
+        return self.errors
+
+    def report(self):
+        for filename in sorted(self.errors):
+            print("ERREUR", filename)
+            print(self.errors[filename])
+        return self.errors
+
+
+def set_named_dests(doc, dests):
+    """
+    Déclare les destinations nommées {nom : n° de page} dans le catalogue du
+    PDF (liens externes Actes_SFT2021.pdf#ref:12)
+    """
+    if not dests:
+        return
+    xref = doc.get_new_xref()
+    doc.update_object(xref, "<<" + ''.join(
+        "/"+name+" ["+str(doc.page_xref(pno))+" 0 R /XYZ 0 " +
+        str(doc[pno].rect.height)+" 0]"
+        for name, pno in sorted(dests.items())) + ">>")
+    doc.xref_set_key(doc.pdf_catalog(), "Dests", str(xref)+" 0 R")
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:52:26 2026
+
+@author: phil
+
+Construction du recueil des résumés par fragments : chaque abstract est
+compilé seul (en parallèle et avec un cache), les pages de garde des thèmes,
+la table des matières et la liste des auteurs sont générées à partir des
+fichiers JSON des abstracts, puis le livre est assemblé avec fitz.
+"""
+import json
+import os
+import re
+
+import fitz
+
+from author_index import sort_key
+from latex_format import LatexFormat
+from manifest import hash_file
+from runner import TIMEOUT_PDFLATEX, Job, run_jobs
+
+PREAMBLE = r"""\documentclass[12pt,a4paper,openright]{book}
+\input{../../config.tex}
+\providecommand{\endofdump}{}\endofdump
+%% les numéros de page sont ajoutés à l'assemblage
+\fancyfoot[C]{}
+\makeatletter
+\renewcommand{\@chapapp}{Thème}
+\makeatother
+\begin{document}
+\pagestyle{fancyplain}
+\SetBgContents{}
+"""
+
+FRAGMENT = PREAMBLE + r"""\input{../../Abstracts/p%s.tex}
+\end{document}
+"""
+
+# ligne du titre dans un abstract (voir make_recueils.Abstract)
+TOC_LINE = "\\addcontentsline{toc}{section}{"
+
+
+def pdflatex(filename_tex, cwd, fmt=None):
+    """
+    Fonction permettant de préparer la compilation d'un fichier TeX (une
+    seule passe)
+
+    Parameters
+    ----------
+    filename_tex : String
+        Nom du fichier TeX.
+    cwd : String
+        Répertoire de compilation.
+    fmt : String, optional
+        Format précompilé du préambule (voir latex_format).
+        The default is None.
+
+    Returns
+    -------
+    Job
+        Commande à lancer avec runner.run_jobs.
+
+    """
+    return Job(filename_tex, LatexFormat.command(filename_tex, fmt), cwd,
+               TIMEOUT_PDFLATEX)
+
+
+def write_if_changed(filename, text):
+    """
+    Écrit text dans filename seulement si le contenu est différent, pour ne
+    pas invalider les fichiers compilés
+    """
+    if os.path.isfile(filename):
+        with open(filename, 'r', encoding='utf-8') as file_in:
+            if file_in.read() == text:
+                return
+    with open(filename, 'w', encoding='utf-8') as file_out:
+        file_out.write(text)
+
+
+def plain(tex):
+    """
+    Version texte brut d'un titre LaTeX (pour les signets du PDF)
+    """
+    tex = re.sub(r'\\[a-zA-Z]+\s*', '', tex)
+    return re.sub(r'[{}$\\]', '', tex).strip()
+
+
+def abstract_meta(path_extex, num_id):
+    """
+    Titre et auteurs d'un abstract : fichier JSON écrit par
+    make_recueils.Abstract s'il correspond au TeX, sinon relus dans le TeX
+    (pas de fichier JSON ou TeX corrigé à la main depuis)
+    """
+    filename_tex = path_extex+'Abstracts/p'+str(num_id)+'.tex'
+    filename_json = path_extex+'Abstracts_JSON/p'+str(num_id)+'.json'
+    if not os.path.isfile(filename_tex):
+        raise RuntimeError("abstract absent : "+filename_tex+" (étape "
+                           "abstracts, make_recueils.All_Abstracts)")
+    if os.path.isfile(filename_json):
+        with open(filename_json, 'r', encoding='utf-8') as file_json:
+            meta = json.load(file_json)
+        if meta.get('tex_sha256') == hash_file(filename_tex):
+            return meta
+    with open(filename_tex, 'r', encoding='utf-8') as file_tex:
+        L_text = file_tex.readlines()
+    title = ''
+    authors = []
+    for line in L_text:
+        if line.startswith(TOC_LINE):
+            title = line[len(TOC_LINE):].rstrip()[:-1]
+        elif line.startswith('\\index{'):
+            name, sep, surname = line.split('@', 1)[-1].rstrip()[:-1] \
+                .partition(', ')
+            authors.append([name, surname])
+    return {'title': title, 'authors': authors}
+
+
+def page_count(filename_pdf):
+    doc = fitz.open(filename_pdf)
+    nb_pages = doc.page_count
+    doc.close()
+    return nb_pages
+
+
+class RecueilResume:
+    """
+    Recueil des résumés construit par fragments.
+
+    Parameters
+    ----------
+    path_extex : String
+        Répertoire Export_Tex.
+    Dtheme : Dict
+        Dictionnaire avec les thèmes en clés et les n° papiers en valeurs.
+    nb_workers : Int, optional
+        Nombre de compilations LaTeX simultanées. The default is None.
+    manifest : Manifest, optional
+        Manifeste de construction, seuls les fragments dont l'abstract ou la
+        configuration ont changé sont recompilés. The default is None.
+    latex_format : LatexFormat, optional
+        Formats précompilés, les fragments sont compilés avec le format du
+        préambule commun. The default is None.
+    author_index : AuthorIndex, optional
+        Index des auteurs pour la liste des auteurs (écritures canoniques).
+        The default is None.
+
+    Example
+    -------
+    >>> recueil = RecueilResume('./Export_Tex/', Dtheme, nb_workers=8,
+                             latex_format=LatexFormat('./Export_Tex/'))
+    >>> recueil.build('Resumes_SFT2021')
+    """
+    subdir = 'Recueil_Resume/'
+    start = 'Recueil_Resume_start.tex'
+    part = 'Résumé des communications'
+
+    def __init__(self, path_extex, Dtheme, nb_workers=None, manifest=None,
+                 latex_format=None, author_index=None):
+        self.path_extex = path_extex
+        self.path = path_extex+self.subdir
+        self.path_frag = self.path+'Fragments/'
+        self.Dtheme = Dtheme
+        self.nb_workers = nb_workers
+        self.manifest = manifest
+        self.latex_format = latex_format
+        self.author_index = author_index
+        self.fmt = None
+        self.errors = {}
+        self.meta = {num_id: abstract_meta(path_extex, num_id)
+                     for theme in Dtheme for num_id in Dtheme[theme]}
+
+    # -- Compilation --------------------------------------------------------
+    def compile_all(self, List_docs):
+        """
+        Compile en parallèle une liste de (nom du fichier TeX, empreinte des
+        entrées). Les PDF à jour dans le manifeste ne sont pas recompilés.
+        """
+        List_todo = []
+        for filename_tex, key in List_docs:
+            filename_pdf = self.path_frag+filename_tex[:-4]+'.pdf'
+            if self.manifest is None or not self.manifest.uptodate(
+                    'fragments', filename_pdf, key):
+                List_todo.append((filename_tex, key))
+
+        keys = dict(List_todo)
+        jobs = [pdflatex(filename_tex, self.path_frag, self.fmt)
+                for filename_tex in keys]
+        run_jobs(jobs, self.nb_workers, report=False)
+        for job in jobs:
+            if not job.ok:
+                self.errors[job.name] = job.log()
+            elif self.manifest is not None:
+                self.manifest.update('fragments', self.path_frag +
+                                     job.name[:-4]+'.pdf', keys[job.name])
+
+    def key(self, *items):
+        if self.manifest is None:
+            return None
+        return self.manifest.digest(
+            self.manifest.file(self.path_extex+'config.tex'), *items)
+
+    def write_doc(self, filename_tex, text, *inputs):
+        """
+        Écrit un document généré et renvoie (filename_tex, empreinte)
+        """
+        write_if_changed(self.path_frag+filename_tex, text)
+        if self.manifest is None:
+            return filename_tex, None
+        return filename_tex, self.key(text, *[self.manifest.file(f)
+                                              for f in inputs])
+
+    # -- Documents générés --------------------------------------------------
+    def anchor(self, name):
+        """
+        Cible des liens des tables des matières générées (aucune dans le
+        recueil des résumés)
+        """
+        return ''
+
+    def fragment_docs(self):
+        docs = []
+        for theme in self.Dtheme:
+            for num_id in self.Dtheme[theme]:
+                docs.append(self.write_doc(
+                    'p'+str(num_id)+'.tex', FRAGMENT % num_id,
+                    self.path_extex+'Abstracts/p'+str(num_id)+'.tex'))
+        return docs
+
+    def separator_docs(self, pages):
+        """
+        Page de la partie puis une page de garde par thème avec sa mini table
+        des matières. pages donne le numéro de page de chaque papier.
+        """
+        docs = [self.write_doc('part.tex', PREAMBLE +
+                               "\\setcounter{part}{1}\n"
+                               "\\part{"+self.part+"}\n"
+                               "\\end{document}\n")]
+        for k, theme in enumerate(self.Dtheme, start=1):
+            text = PREAMBLE + "\\setcounter{chapter}{"+str(k-1)+"}\n" + \
+                "\\chapter{"+theme+"}\n{\\small\n"
+            for num_id in self.Dtheme[theme]:
+                text += "\\contentsline{section}{"+self.meta[num_id]['title'] \
+                    + "}{"+str(pages.get(num_id, ''))+"}{" + \
+                    self.anchor('ref:'+str(num_id))+"}\n"
+            text += "}\n\\cleardoublepage\n\\end{document}\n"
+            docs.append(self.write_doc('theme.'+str(k)+'.tex', text))
+        return docs
+
+    def annexes_doc(self, pages):
+        """
+        Partie Annexes avec la liste des auteurs générée à partir des
+        métadonnées (à la place de makeindex)
+        """
+        index = {}
+        for num_id, page in pages.items():
+            for author in self.meta[num_id]['authors']:
+                name, surname = author[0], author[1]
+                if self.author_index is not None:
+                    name, surname = self.author_index.canonical(name, surname)
+                entry = index.setdefault(sort_key(name, surname),
+                                         [name, surname, []])
+                entry[2].append(page)
+
+        text = PREAMBLE + "\\backmatter\n\\part{Annexes}\n" + \
+            "\\renewcommand{\\indexname}{Liste des auteurs}\n" + \
+            "\\begin{theindex}\n"
+        letter = ''
+        for key in sorted(index):
+            name, surname, List_pages = index[key]
+            if key[:1].upper() != letter:
+                if letter:
+                    text += "\\indexspace\n"
+                letter = key[:1].upper()
+            text += "\\item "+name+", "+surname+", " + \
+                ', '.join(map(str, sorted(set(List_pages))))+"\n"
+        text += "\\end{theindex}\n\\end{document}\n"
+        return self.write_doc('annexes.tex', text)
+
+    def front_doc(self, toc, labels=''):
+        """
+        Début du recueil (page de garde, prolégomènes) repris du fichier
+        start jusqu'au \\mainmatter, avec la table des matières générée à la
+        place de \\tableofcontents et les \\newlabel labels dans le préambule
+        """
+        with open(self.path+self.start, 'r', encoding='utf-8') as file_start:
+            start = file_start.read()
+        start = start[:start.index('\\mainmatter')]
+        start = start.replace('\\dominitoc', '')
+        start = start.replace('\\tableofcontents', toc)
+        start = start.replace('{../', '{../../').replace('{./', '{../')
+        start = start.replace('\\begin{document}',
+                              labels+'\\begin{document}', 1)
+        inputs = [self.path+self.start,
+                  self.path+'page-garde.tex'] + \
+            [self.path_extex+f for f in os.listdir(self.path_extex)
+             if f.endswith('.tex')]
+        return self.write_doc('front.tex', start+"\n\\end{document}\n",
+                              *inputs)
+
+    def toc(self, pages, theme_pages, annexes_page):
+        text = "\\chapter*{\\contentsname}\n"
+        text += "\\contentsline{part}{"+self.part+"}{1}{}\n"
+        for k, theme in enumerate(self.Dtheme, start=1):
+            text += "\\contentsline{chapter}{\\numberline{"+str(k)+"}" + \
+                theme+"}{"+str(theme_pages[theme])+"}{}\n"
+            for num_id in self.Dtheme[theme]:
+                if num_id in pages:
+                    text += "\\contentsline{section}{" + \
+                        self.meta[num_id]['title']+"}{" + \
+                        str(pages[num_id])+"}{}\n"
+        text += "\\contentsline{part}{Annexes}{"+str(annexes_page)+"}{}\n"
+        # la page de partie est suivie d'une page blanche (openright)
+        text += "\\contentsline{chapter}{Liste des auteurs}{" + \
+            str(annexes_page+2)+"}{}\n"
+        return text
+
+    # -- Mise en page -------------------------------------------------------
+    def layout(self):
+        """
+        Numéros de page (à partir de 1 au \\mainmatter) de chaque thème et de
+        chaque papier, à partir du nombre de pages des PDF compilés.
+        Renvoie (pages, theme_pages, blank_after, annexes_page).
+        """
+        page = 1 + page_count(self.path_frag+'part.pdf')
+        pages = {}
+        theme_pages = {}
+        blank_after = set()
+        for k, theme in enumerate(self.Dtheme, start=1):
+            theme_pages[theme] = page
+            page += page_count(self.path_frag+'theme.'+str(k)+'.pdf')
+            for num_id in self.Dtheme[theme]:
+                filename_pdf = self.path_frag+'p'+str(num_id)+'.pdf'
+                if os.path.isfile(filename_pdf):
+                    pages[num_id] = page
+                    page += page_count(filename_pdf)
+            # \cleardoublepage : un thème commence sur une page impaire
+            if page % 2 == 0:
+                blank_after.add(theme)
+                page += 1
+        return pages, theme_pages, blank_after, page
+
+    def report(self):
+        for filename_tex in sorted(self.errors):
+            print("ERREUR LaTeX", filename_tex)
+            print(self.errors[filename_tex])
+        return self.errors
+
+    # -- Assemblage ---------------------------------------------------------
+    def build(self, jobname):
+        """
+        Fonction permettant de construire le recueil des résumés complet
+
+        Parameters
+        ----------
+        jobname : String
+            Nom du PDF final (sans extension), stocké dans Recueil_Resume.
+
+        Returns
+        -------
+        errors : Dict
+            Fichiers TeX en échec avec la fin de leur log.
+
+        """
+        os.makedirs(self.path_frag, exist_ok=True)
+        List_fragments = self.fragment_docs()
+        if self.latex_format is not None and List_fragments:
+            self.fmt = self.latex_format.get(self.path_frag +
+                                             List_fragments[0][0])
+        self.compile_all(List_fragments)
+        # 1re passe sans numéros pour connaître la taille des pages de garde,
+        # inutile si elles ont déjà été compilées
+        if not all(os.path.isfile(self.path_frag+filename_pdf)
+                   for filename_pdf in ['part.pdf'] +
+                   ['theme.'+str(k)+'.pdf'
+                    for k in range(1, len(self.Dtheme)+1)]):
+            self.compile_all(self.separator_docs({}))
+        # layout lit le nombre de pages des PDF compilés
+        if self.errors:
+            return self.report()
+        pages, theme_pages, blank_after, annexes_page = self.layout()
+        self.compile_all(self.separator_docs(pages))
+        self.compile_all([self.annexes_doc(pages),
+                          self.front_doc(self.toc(pages, theme_pages,
+                                                  annexes_page))])
+        if self.errors:
+            return self.report()
+
+        book = fitz.open()
+        outline = []
+
+        def append(filename_pdf, number=None, level=None, title=None):
+            doc = fitz.open(self.path_frag+filename_pdf)
+            if title is not None:
+                outline.append([level, title, len(book)+1])
+            start = len(book)
+            book.insert_pdf(doc)
+            doc.close()
+            if number is not None:
+                for i in range(start, len(book)):
+                    stamp_page(book[i], number+i-start)
+
+        append('front.pdf')
+        append('part.pdf', level=1, title=self.part)
+        for k, theme in enumerate(self.Dtheme, start=1):
+            append('theme.'+str(k)+'.pdf', theme_pages[theme], 2,
+                   str(k)+' '+plain(theme))
+            for num_id in self.Dtheme[theme]:
+                if num_id in pages:
+                    append('p'+str(num_id)+'.pdf', pages[num_id], 3,
+                           plain(self.meta[num_id]['title']))
+            if theme in blank_after:
+                rect = book[-1].rect
+                book.new_page(-1, width=rect.width, height=rect.height)
+        append('annexes.pdf', annexes_page, 1, 'Annexes')
+        book.set_toc(outline)
+        book.save(self.path+jobname+'.pdf', garbage=3, deflate=True)
+        book.close()
+        print("Recueil des résumés :", self.path+jobname+'.pdf')
+        return self.errors
+
+
+def stamp_page(page, number):
+    """
+    Ajoute le numéro de page centré en pied de page
+    """
+    text = str(number)
+    width = fitz.get_text_length(text, fontname="helv", fontsize=11)
+    page.insert_text(fitz.Point((page.rect.width-width)/2,
+                                page.rect.height-30),
+                     text, fontname="helv", fontsize=11, color=(0, 0, 0))
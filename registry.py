@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:31:48 2026
+
+@author: phil
+"""
+import json
+import sqlite3
+from collections import OrderedDict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submission (
+    num_id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    authors TEXT NOT NULL,
+    keywords TEXT,
+    doi TEXT,
+    url TEXT,
+    theme TEXT,
+    theme_rank INTEGER,
+    position INTEGER
+);
+CREATE INDEX IF NOT EXISTS submission_theme
+    ON submission (theme_rank, position);
+CREATE TABLE IF NOT EXISTS artifact (
+    num_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha256 TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (num_id, kind)
+);
+CREATE INDEX IF NOT EXISTS artifact_kind ON artifact (kind, num_id);
+"""
+
+
+class Registry:
+    """
+    Registre SQLite des soumissions : titre, auteurs, thème, DOI, URL et
+    fichiers produits (kind = 'doi_pdf', 'html', 'xml') avec leur
+    empreinte. Les étapes interrogent le registre au lieu de tester
+    l'existence des fichiers ou de lister les répertoires.
+
+    Example
+    -------
+    >>> registry = Registry('./registry.sqlite', base_url)
+    >>> registry.add_submission(sub)
+    >>> registry.set_themes(Dtheme)
+    >>> registry.set_artifact(1, 'doi_pdf', './.../1_doi.pdf', sha256)
+    >>> registry.commit()
+    >>> registry.has_doi(1)
+    True
+    """
+
+    def __init__(self, filename, base_url=None):
+        self.filename = filename
+        self.base_url = base_url
+        # plusieurs étapes peuvent écrire en même temps (build.py)
+        self.db = sqlite3.connect(filename, timeout=60)
+        self.db.executescript(SCHEMA)
+        # registres créés avant l'ajout des mots clés
+        columns = {row[1] for row in
+                   self.db.execute("PRAGMA table_info(submission)")}
+        if 'keywords' not in columns:
+            try:
+                self.db.execute("ALTER TABLE submission "
+                                "ADD COLUMN keywords TEXT")
+            except sqlite3.OperationalError:
+                # colonne ajoutée en même temps par une autre connexion
+                pass
+
+    def commit(self):
+        self.db.commit()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    # -- Écriture -----------------------------------------------------------
+    def add_submission(self, sub):
+        """
+        Ajoute ou met à jour une soumission (Submission), le thème déjà
+        enregistré est conservé
+        """
+        url = None
+        if self.base_url is not None:
+            url = self.base_url+"p"+str(sub.num_id)+".html"
+        authors = json.dumps([[a.name, a.surname, a.affiliation]
+                              for a in sub.authors], ensure_ascii=False)
+        self.db.execute(
+            "INSERT INTO submission (num_id, title, authors, keywords, doi, "
+            "url) VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (num_id) DO UPDATE "
+            "SET title = excluded.title, authors = excluded.authors, "
+            "keywords = excluded.keywords, doi = excluded.doi, "
+            "url = excluded.url",
+            (sub.num_id, sub.title, authors, sub.keywords, sub.doi, url))
+
+    def set_themes(self, Dtheme):
+        """
+        Enregistre le thème et la position de chaque papier dans son thème
+        """
+        self.db.execute("UPDATE submission SET theme = NULL, "
+                        "theme_rank = NULL, position = NULL")
+        self.db.executemany(
+            "UPDATE submission SET theme = ?, theme_rank = ?, position = ? "
+            "WHERE num_id = ?",
+            ((theme, rank, position, num_id)
+             for rank, theme in enumerate(Dtheme, start=1)
+             for position, num_id in enumerate(Dtheme[theme])))
+
+    def set_artifact(self, num_id, kind, path, sha256=''):
+        self.db.execute("INSERT OR REPLACE INTO artifact VALUES (?, ?, ?, ?)",
+                        (num_id, kind, path, sha256))
+
+    def remove_artifact(self, num_id, kind):
+        self.db.execute("DELETE FROM artifact WHERE num_id = ? AND kind = ?",
+                        (num_id, kind))
+
+    def prune(self, num_ids):
+        """
+        Supprime les soumissions qui ne sont plus dans l'export OpenConf
+        (num_ids : numéros lus) et leurs fichiers produits, renvoie le nombre
+        de soumissions supprimées
+        """
+        self.db.execute("CREATE TEMP TABLE IF NOT EXISTS seen "
+                        "(num_id INTEGER PRIMARY KEY)")
+        self.db.execute("DELETE FROM seen")
+        self.db.executemany("INSERT OR IGNORE INTO seen VALUES (?)",
+                            ((num_id,) for num_id in num_ids))
+        self.db.execute("DELETE FROM artifact WHERE num_id NOT IN "
+                        "(SELECT num_id FROM seen)")
+        return self.db.execute("DELETE FROM submission WHERE num_id NOT IN "
+                               "(SELECT num_id FROM seen)").rowcount
+
+    # -- Lecture ------------------------------------------------------------
+    def dois(self):
+        """
+        Dictionnaire {num_id : DOI ou None} de toutes les soumissions
+        """
+        return dict(self.db.execute("SELECT num_id, doi FROM submission"))
+
+    def themes(self):
+        """
+        Dictionnaire ordonné {thème : [num_id, ...]}
+        """
+        Dtheme = OrderedDict()
+        for theme, num_id in self.db.execute(
+                "SELECT theme, num_id FROM submission WHERE theme IS NOT NULL "
+                "ORDER BY theme_rank, position"):
+            Dtheme.setdefault(theme, []).append(num_id)
+        return Dtheme
+
+    def toc(self):
+        """
+        Générateur des papiers classés par thème :
+        (thème, num_id, titre, auteurs, url)
+        """
+        for theme, num_id, title, authors, url in self.db.execute(
+                "SELECT theme, num_id, title, authors, url FROM submission "
+                "WHERE theme IS NOT NULL ORDER BY theme_rank, position"):
+            yield theme, num_id, title, json.loads(authors), url
+
+    def papers(self):
+        """
+        Générateur des papiers classés par thème avec leurs mots clés :
+        (rang du thème, thème, num_id, titre, auteurs, mots clés, url)
+        """
+        for row in self.db.execute(
+                "SELECT theme_rank, theme, num_id, title, authors, keywords, "
+                "url FROM submission WHERE theme IS NOT NULL "
+                "ORDER BY theme_rank, position"):
+            rank, theme, num_id, title, authors, keywords, url = row
+            yield (rank, theme, num_id, title, json.loads(authors),
+                   keywords or '', url)
+
+    def authors(self):
+        """
+        Générateur des (num_id, [[nom, prénom, affiliation], ...]) de toutes
+        les soumissions
+        """
+        for num_id, authors in self.db.execute(
+                "SELECT num_id, authors FROM submission ORDER BY num_id"):
+            yield num_id, json.loads(authors)
+
+    def artifact(self, num_id, kind):
+        """
+        (chemin, empreinte) d'un fichier produit, None s'il n'existe pas
+        """
+        return self.db.execute(
+            "SELECT path, sha256 FROM artifact WHERE num_id = ? AND kind = ?",
+            (int(num_id), kind)).fetchone()
+
+    def artifacts(self, kind):
+        """
+        Liste des (num_id, chemin) des fichiers kind classés par num_id
+        """
+        return self.db.execute(
+            "SELECT num_id, path FROM artifact WHERE kind = ? "
+            "ORDER BY num_id", (kind,)).fetchall()
+
+    def has_doi(self, num_id):
+        """
+        Vrai si le papier a un DOI et un PDF tagué avec ce DOI
+        """
+        return self.artifact(num_id, 'doi_pdf') is not None
+
+    def doi_ids(self):
+        """
+        Ensemble des num_id qui ont un PDF tagué avec leur DOI
+        """
+        return {num_id for num_id, in self.db.execute(
+            "SELECT num_id FROM artifact WHERE kind = 'doi_pdf'")}
+
+    def listing(self, kind='xml'):
+        """
+        Liste des [DOI, URL] des papiers qui ont un fichier kind
+        """
+        return [list(row) for row in self.db.execute(
+            "SELECT s.doi, s.url FROM submission s JOIN artifact a "
+            "ON a.num_id = s.num_id AND a.kind = ? ORDER BY s.num_id",
+            (kind,))]
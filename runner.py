@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:52:17 2026
+
+@author: phil
+
+Lancement des commandes externes (pandoc, pdflatex, latexmk) avec asyncio :
+au plus nb_parallel processus en même temps, un délai maximal par commande
+(la commande et ses processus fils sont tués au-delà), sorties capturées,
+nouvelles tentatives en cas de dépassement du délai et rapport des échecs
+en fin de lot.
+WorkerBudget limite le nombre total de processus de travail des étapes
+lancées en même temps.
+"""
+import asyncio
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+TIMEOUT_PANDOC = 120
+TIMEOUT_PDFLATEX = 600
+TIMEOUT_LATEXMK = 3600
+
+
+class Job:
+    """
+    Commande externe à lancer.
+
+    Une commande qui se termine avec un code non nul n'est pas relancée
+    (pandoc ou LaTeX échoueront de la même façon), seuls les dépassements
+    de délai et les échecs de lancement le sont, retries fois au plus.
+
+    Example
+    -------
+    >>> job = Job('p1.tex', ['pandoc', ...], cwd=path, timeout=120)
+    >>> failed = run_jobs([job], nb_parallel=8)
+    >>> job.ok, job.returncode, job.stderr
+    """
+
+    def __init__(self, name, cmd, cwd=None, timeout=None, retries=1):
+        self.name = name
+        self.cmd = cmd
+        self.cwd = cwd
+        self.timeout = timeout
+        self.retries = retries
+        self.returncode = None
+        self.stdout = ''
+        self.stderr = ''
+        self.timed_out = False
+        self.attempts = 0
+        self.start = None
+        self.duration = 0.
+
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+    def log(self, nb=2000):
+        """
+        Fin des sorties de la commande (stdout puis stderr)
+        """
+        return (self.stdout+self.stderr)[-nb:]
+
+    async def attempt(self):
+        try:
+            # groupe de processus propre à la commande : latexmk lance
+            # pdflatex, tous sont tués en cas de dépassement du délai
+            proc = await asyncio.create_subprocess_exec(
+                *self.cmd, cwd=self.cwd, stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE, start_new_session=True)
+        except OSError as err:
+            self.returncode, self.stderr = -1, str(err)
+            return False
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(),
+                                                    self.timeout)
+        except asyncio.TimeoutError:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            await proc.wait()
+            self.timed_out = True
+            self.returncode = -1
+            self.stderr = "délai de "+str(self.timeout)+" s dépassé"
+            return False
+        self.timed_out = False
+        self.returncode = proc.returncode
+        self.stdout = stdout.decode('utf-8', errors='replace')
+        self.stderr = stderr.decode('utf-8', errors='replace')
+        return True
+
+    async def run(self, semaphore):
+        async with semaphore:
+            self.start = time.time()
+            while self.attempts <= self.retries:
+                self.attempts += 1
+                if await self.attempt():
+                    break
+            self.duration = time.time()-self.start
+        return self
+
+
+async def run_all(jobs, nb_parallel=None):
+    semaphore = asyncio.Semaphore(nb_parallel or os.cpu_count() or 1)
+    return await asyncio.gather(*(job.run(semaphore) for job in jobs))
+
+
+def run_jobs(jobs, nb_parallel=None, report=True):
+    """
+    Fonction permettant de lancer un lot de commandes externes
+
+    Parameters
+    ----------
+    jobs : List
+        Liste de Job.
+    nb_parallel : Int, optional
+        Nombre maximal de processus en même temps.
+        The default is None (nombre de coeurs).
+    report : Bool, optional
+        Affiche le rapport des échecs. The default is True.
+
+    Returns
+    -------
+    failed : List
+        Liste des Job en échec.
+
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    # une boucle par appel : run_jobs peut être appelé depuis un thread
+    asyncio.run(run_all(jobs, nb_parallel))
+    failed = [job for job in jobs if not job.ok]
+    if report:
+        failure_report(failed, len(jobs))
+    return failed
+
+
+def run_command(cmd, cwd=None, timeout=None, retries=1):
+    """
+    Fonction permettant de lancer une seule commande externe, renvoie le Job
+    exécuté
+    """
+    job = Job(os.path.basename(cmd[0]), cmd, cwd, timeout, retries)
+    run_jobs([job], 1, report=False)
+    return job
+
+
+class WorkerBudget:
+    """
+    Nombre total de processus de travail partagé par les étapes lancées en
+    même temps (build.py) : chaque pool prend au plus ce qui reste du
+    budget, attend qu'au moins un processus soit libre, et le rend à la fin.
+
+    Example
+    -------
+    >>> budget = WorkerBudget(8)
+    >>> with budget.take() as nb_workers:
+    ...     all_textohtml(edition, List_filetex, nb_workers)
+    """
+
+    def __init__(self, total=None):
+        self.total = total or os.cpu_count() or 1
+        self.free = self.total
+        self.condition = threading.Condition()
+
+    @contextmanager
+    def take(self, wanted=None):
+        with self.condition:
+            while self.free == 0:
+                self.condition.wait()
+            nb = min(wanted or self.total, self.free)
+            self.free -= nb
+        try:
+            yield nb
+        finally:
+            with self.condition:
+                self.free += nb
+                self.condition.notify_all()
+
+
+def failure_report(failed, nb_jobs):
+    """
+    Affiche le rapport des commandes en échec d'un lot
+    """
+    if not failed:
+        return
+    print("\n"+20*"="+"\n")
+    print(len(failed), "/", nb_jobs, "commandes en échec")
+    for job in failed:
+        print("ÉCHEC", job.name, "code", job.returncode,
+              "({} essai{}{})".format(job.attempts,
+                                       's' if job.attempts > 1 else '',
+                                       ', délai dépassé' if job.timed_out
+                                       else ''))
+        print("  "+' '.join(job.cmd))
+        for line in job.log(600).strip().splitlines()[-8:]:
+            print("  | "+line)
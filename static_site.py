@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:48:05 2026
+
+@author: phil
+
+Site statique des actes dans Export_HTML/Site : une page d'accueil avec la
+liste des thèmes, une page par thème, une page par auteur (et une liste
+des auteurs par initiale) et un index inversé précalculé pour la recherche
+dans le navigateur (search.js), sans composant côté serveur. L'index porte
+sur les titres, les mots clés, les auteurs et les affiliations. Il est
+découpé en fragments selon les deux premières lettres des mots : le
+navigateur ne télécharge que les fragments des mots saisis, jamais la
+liste complète des papiers.
+
+    Site/index.html, theme-1.html, auteur-baucourphilippe.html,
+    auteurs-b.html, index/meta.json, index/ba.json, docs/0.json
+"""
+import html
+import json
+import os
+import re
+
+from author_index import sort_key
+from latex_html import render_text
+from openconf import clean_string
+
+re_word = re.compile(r'[a-z0-9]+')
+
+# lettres que NFKD ne décompose pas et qui seraient supprimées avec les
+# accents (même table dans search.js)
+LIGATURES = str.maketrans({'œ': 'oe', 'Œ': 'OE', 'æ': 'ae', 'Æ': 'AE',
+                           'ß': 'ss', 'ẞ': 'SS'})
+
+# mots vides exclus de l'index (aussi ignorés par search.js)
+STOPWORDS = {'au', 'aux', 'avec', 'ce', 'ces', 'dans', 'de', 'des', 'du',
+             'en', 'et', 'la', 'le', 'les', 'leur', 'leurs', 'par', 'pour',
+             'sa', 'se', 'ses', 'son', 'sous', 'sur', 'un', 'une', 'an',
+             'and', 'as', 'at', 'by', 'for', 'from', 'in', 'into', 'is',
+             'of', 'on', 'or', 'the', 'to', 'with'}
+
+# masque des champs d'un mot dans un papier
+FIELDS = {'title': 1, 'keywords': 2, 'authors': 4, 'affiliations': 8}
+
+# nombre de papiers par fragment docs/n.json
+DOCS_PER_SHARD = 100
+
+
+def words(text):
+    """
+    Mots normalisés d'un texte (sans accents ni majuscules) hors mots vides
+    et nombres seuls (codes postaux des affiliations)
+    """
+    text = clean_string(text.translate(LIGATURES), spaces=False)
+    return [word for word in re_word.findall(text.lower())
+            if len(word) >= 2 and not word.isdigit() and
+            word not in STOPWORDS]
+
+
+class SearchIndex:
+    """
+    Index inversé {mot : {num_id : champs}} découpé en fragments par les
+    deux premières lettres des mots.
+
+    Example
+    -------
+    >>> search_index = SearchIndex()
+    >>> search_index.add(12, 'title', "Conductivité thermique")
+    >>> search_index.shards()['co']
+    {'conductivite': [12, 1]}
+    """
+
+    def __init__(self):
+        self.postings = {}
+
+    def add(self, num_id, field, text):
+        bit = FIELDS[field]
+        for word in words(text):
+            entry = self.postings.setdefault(word, {})
+            entry[num_id] = entry.get(num_id, 0) | bit
+
+    def shards(self):
+        """
+        Dictionnaire {fragment : {mot : [num_id, champs, ...]}}, les listes
+        sont aplaties pour des fichiers plus compacts
+        """
+        shards = {}
+        for word in sorted(self.postings):
+            entry = self.postings[word]
+            shards.setdefault(word[:2], {})[word] = \
+                [value for num_id in sorted(entry)
+                 for value in (num_id, entry[num_id])]
+        return shards
+
+
+class Site:
+    """
+    Écriture des fichiers du site : un fichier n'est réécrit que si son
+    contenu change (les fichiers inchangés ne sont pas republiés) et les
+    fichiers qui ne sont plus produits sont supprimés.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files = set()
+        self.nb_written = 0
+
+    def write(self, filename, text):
+        self.files.add(filename)
+        filename = self.path+filename
+        if os.path.isfile(filename):
+            with open(filename, 'r', encoding='utf-8') as file_old:
+                if file_old.read() == text:
+                    return
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'w', encoding='utf-8') as file_site:
+            file_site.write(text)
+        self.nb_written += 1
+
+    def write_json(self, filename, data):
+        self.write(filename, json.dumps(data, ensure_ascii=False,
+                                        separators=(',', ':')))
+
+    def clean(self):
+        """
+        Supprime les fichiers des passages précédents qui ne sont plus
+        produits, renvoie leur nombre
+        """
+        nb_removed = 0
+        for dirpath, dirnames, filenames in os.walk(self.path):
+            for filename in filenames:
+                relpath = os.path.relpath(os.path.join(dirpath, filename),
+                                          self.path).replace(os.sep, '/')
+                if relpath not in self.files:
+                    os.remove(os.path.join(dirpath, filename))
+                    nb_removed += 1
+        return nb_removed
+
+
+def page(title, body, edition):
+    """
+    Page HTML du site avec le formulaire de recherche
+    """
+    return """<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<link rel="stylesheet" href="../markdown-pandoc.css">
+</head>
+<body>
+<p><a href="index.html">{name}</a></p>
+<form role="search" onsubmit="return false">
+<input id="search" type="search" size="60" autocomplete="off"
+ placeholder="Rechercher : titre, mots clés, auteur, affiliation">
+</form>
+<div id="results"></div>
+<h1>{title}</h1>
+{body}
+<script src="../search.js"></script>
+</body>
+</html>
+""".format(title=html.escape(title), name=html.escape(edition.name),
+           body=body)
+
+
+def author_page(key):
+    return 'auteur-'+key+'.html'
+
+
+def paper_entry(title, creators, keywords, url, author_index=None):
+    """
+    Entrée HTML d'un papier : titre avec le lien vers sa page, auteurs avec
+    un lien vers leur page et mots clés
+    """
+    authors = []
+    for name, surname, affiliation in creators:
+        text = html.escape(surname+" "+name)
+        if author_index is not None:
+            text = '<a href="'+author_page(sort_key(name, surname))+'">' + \
+                text+'</a>'
+        authors.append(text)
+    entry = '<p><a href="'+html.escape(url or '')+'">'+html.escape(title) + \
+        '</a><br>\n'+', '.join(authors)
+    if keywords:
+        entry += '<br>\n<em>'+html.escape(keywords)+'</em>'
+    return entry+'</p>\n'
+
+
+def write_site(edition, registry, author_index=None):
+    """
+    Fonction permettant de générer le site statique des actes et son index
+    de recherche dans Export_HTML/Site à partir du registre
+
+    Parameters
+    ----------
+    edition : Edition
+        Édition du congrès (répertoire Export_HTML, adresses).
+    registry : Registry
+        Registre des soumissions avec leur thème (voir Registry.set_themes),
+        leurs mots clés et leur URL.
+    author_index : AuthorIndex, optional
+        Index des auteurs : pages par auteur avec les écritures canoniques.
+        The default is None (pas de pages par auteur).
+
+    Returns
+    -------
+    nb_written : Int
+        Nombre de fichiers écrits (les fichiers inchangés ne comptent pas).
+
+    """
+    site = Site(edition.path_export_html+'Site/')
+    search_index = SearchIndex()
+    docs = {}
+    papers = {}
+    themes = []
+    for rank, theme, num_id, title, creators, keywords, url in \
+            registry.papers():
+        # titres et mots clés du registre en LaTeX (\chemform, $_2$...)
+        title, keywords = render_text(title), render_text(keywords or '')
+        if author_index is not None:
+            creators = author_index.creators(num_id) or creators
+        if not themes or themes[-1][0] != rank:
+            themes.append((rank, theme, []))
+        papers[num_id] = (title, creators, keywords, url)
+        themes[-1][2].append(paper_entry(title, creators, keywords, url,
+                                         author_index))
+        search_index.add(num_id, 'title', title)
+        search_index.add(num_id, 'keywords', keywords)
+        for name, surname, affiliation in creators:
+            search_index.add(num_id, 'authors', name+" "+surname)
+            search_index.add(num_id, 'affiliations', affiliation)
+        docs.setdefault(num_id // DOCS_PER_SHARD, {})[num_id] = \
+            [title, ', '.join(surname+" "+name
+                              for name, surname, affiliation in creators),
+             url]
+
+    # pages des thèmes
+    for rank, theme, entries in themes:
+        site.write('theme-'+str(rank)+'.html',
+                   page(theme, ''.join(entries), edition))
+
+    # pages des auteurs et listes par initiale
+    letters = {}
+    if author_index is not None:
+        for key, name, surname, List_num_id, List_aff in \
+                author_index.sorted_authors():
+            # auteurs des seuls papiers retenus dans un thème
+            List_num_id = [num_id for num_id in sorted(List_num_id)
+                           if num_id in papers]
+            if not key or not List_num_id:
+                continue
+            body = '<p>'+'<br>\n'.join(html.escape(aff) for aff in List_aff
+                                       if aff)+'</p>\n'
+            body += ''.join(paper_entry(*papers[num_id], author_index)
+                            for num_id in List_num_id)
+            site.write(author_page(key),
+                       page(name+", "+surname, body, edition))
+            letters.setdefault(key[0], []).append(
+                '<a href="'+author_page(key)+'">' +
+                html.escape(name+", "+surname)+'</a>')
+        for letter, List_link in letters.items():
+            site.write('auteurs-'+letter+'.html',
+                       page("Auteurs : "+letter.upper(),
+                            '<p>'+'<br>\n'.join(List_link)+'</p>\n',
+                            edition))
+
+    # page d'accueil
+    url_pdf = edition.pdf_url+edition.jobname('Actes')+'.pdf'
+    body = '<p><a href="'+html.escape(url_pdf)+'">Actes en PDF</a> - ' + \
+        '<a href="../Table_of_contents.html">Table des matières complète' + \
+        '</a></p>\n<h2>Thèmes</h2>\n<ul>\n'
+    body += ''.join('<li><a href="theme-'+str(rank)+'.html">' +
+                    html.escape(theme)+'</a> ('+str(len(entries))+')</li>\n'
+                    for rank, theme, entries in themes)
+    body += '</ul>\n'
+    if letters:
+        body += '<h2>Auteurs</h2>\n<p>'+' '.join(
+            '<a href="auteurs-'+letter+'.html">'+letter.upper()+'</a>'
+            for letter in sorted(letters))+'</p>\n'
+    site.write('index.html', page("Actes "+edition.name, body, edition))
+
+    # index de recherche
+    shards = search_index.shards()
+    for name, shard in shards.items():
+        site.write_json('index/'+name+'.json', shard)
+    for n, shard in docs.items():
+        site.write_json('docs/'+str(n)+'.json', shard)
+    site.write_json('index/meta.json', {'shards': sorted(shards),
+                                        'docs': DOCS_PER_SHARD,
+                                        'stopwords': sorted(STOPWORDS)})
+    nb_removed = site.clean()
+    print(len(themes), "thèmes,", sum(map(len, letters.values())),
+          "auteurs,", len(shards), "fragments d'index :", site.nb_written,
+          "fichiers écrits,", nb_removed, "supprimés")
+    return site.nb_written
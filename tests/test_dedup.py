@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:47:20 2026
+
+@author: phil
+
+Dédoublonnage des affiliations et des auteurs : note, blocage, groupes et
+fichier des correspondances.
+"""
+from collections import Counter
+
+import pytest
+
+from dedup import CanonicalMap, Deduplicator, Entry, acronyms, score, tokens
+
+FEMTO = 'Institut FEMTO-ST - Univ. Bourgogne Franche-Comté'
+
+
+def test_tokens():
+    assert tokens(FEMTO) == ['institut', 'femto', 'st', 'universite',
+                             'bourgogne', 'franche', 'comte']
+    assert {'ubfc', 'fs'} <= acronyms(tokens(FEMTO))
+
+
+def test_score():
+    femto = Entry(FEMTO, 3)
+    # sigle UBFC et mots communs
+    assert score(femto, Entry('FEMTO-ST, UBFC', 1)) >= 0.8
+    assert score(femto, Entry(FEMTO.upper(), 1)) == 1.
+    # un seul mot commun ne suffit pas
+    assert score(Entry('Université de Lorraine', 1),
+                 Entry('Université de Nantes', 1)) < 0.8
+    assert score(femto, Entry('', 1)) == 0.
+
+
+def test_candidates():
+    entries = [Entry(text, 1) for text in
+               [FEMTO, 'FEMTO-ST, UBFC', 'LEMTA, Université de Lorraine',
+                'LEMTA - Univ. Lorraine, CNRS', 'Laboratoire Thermique']]
+    pairs = set(Deduplicator().candidates(entries))
+    assert {(0, 1), (2, 3)} <= pairs
+    # blocage : pas de paire sans clé rare partagée
+    assert not {(0, 2), (0, 3), (1, 2), (1, 3)} & pairs
+    assert all(i < j for i, j in pairs)
+
+
+def test_clusters():
+    counts = Counter({FEMTO: 5, 'FEMTO-ST, UBFC': 2,
+                      'Université de Lorraine': 4, 'Université de Nantes': 1,
+                      'Universite de Lorraine': 1})
+    assert Deduplicator(threshold=0.8).clusters(counts) == [
+        (FEMTO, [('FEMTO-ST, UBFC', pytest.approx(0.9, abs=0.1))]),
+        ('Université de Lorraine', [('Universite de Lorraine', 1.0)])]
+
+
+def write_map(tmp_path, lines):
+    filename = str(tmp_path / 'canonical_map.csv')
+    with open(filename, 'w', encoding='utf-8') as file_map:
+        file_map.write('kind;variant;canonical;score;status\n' +
+                       '\n'.join(lines)+'\n')
+    return filename
+
+
+def test_canonical_map(tmp_path):
+    canonical = CanonicalMap.load(write_map(tmp_path, [
+        'affiliation;FEMTO-ST, UBFC;'+FEMTO+';0.9;ok',
+        'author;Dupond, J.-Luc;Dupond, Jean-Luc;0.9;ok',
+        'author;Durand, M.;Durand, Marc;0.8;rejet']))
+    assert len(canonical) == 2
+    assert canonical.affiliation('FEMTO-ST, UBFC') == FEMTO
+    assert canonical.author('Dupond', 'J.-Luc') == ('Dupond', 'Jean-Luc')
+    assert canonical.author('Durand', 'M.') == ('Durand', 'M.')
+    assert len(CanonicalMap.load(str(tmp_path / 'absent.csv'))) == 0
+
+
+@pytest.mark.parametrize('line, message', [
+    ('affiliations;LEMTA;LEMTA, CNRS;0.9;ok', "ligne 3 : type 'affiliations'"),
+    ('author;Dupond, J.;Jean-Luc Dupond;0.9;ok', "ligne 3 : auteur")])
+def test_canonical_map_errors(tmp_path, line, message):
+    filename = write_map(tmp_path, ['author;A, B;A, Bob;0.9;ok', line])
+    with pytest.raises(ValueError, match=message) as err:
+        CanonicalMap.load(filename)
+    assert filename in str(err.value)
+
+
+def test_propose():
+    canonical = CanonicalMap([
+        {'kind': 'affiliation', 'variant': 'FEMTO-ST, UBFC',
+         'canonical': FEMTO, 'score': '0.9', 'status': 'rejet'},
+        {'kind': 'affiliation', 'variant': 'LEMTA', 'canonical': 'LEMTA, CNRS',
+         'score': '0.8', 'status': 'à relire'}])
+    nb = canonical.propose('affiliation', [
+        (FEMTO, [('FEMTO-ST, UBFC', 0.9), ('FEMTO ST', 0.85)])])
+    # la décision prise est conservée, la proposition périmée disparaît
+    assert nb == 1
+    assert [(row['variant'], row['status']) for row in canonical.rows] == \
+        [('FEMTO ST', 'à relire'), ('FEMTO-ST, UBFC', 'rejet')]
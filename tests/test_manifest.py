@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:38:46 2026
+
+@author: phil
+
+Manifeste de construction : empreintes des entrées et fichiers à jour.
+"""
+from manifest import Manifest, hash_file
+
+
+def test_digest(tmp_path):
+    manifest = Manifest(str(tmp_path / 'manifest.json'))
+    key = manifest.digest({'a': 1, 'b': [2, 3]}, 'x')
+    # ordre des clés sans effet, ordre et découpage des entrées significatifs
+    assert manifest.digest({'b': [2, 3], 'a': 1}, 'x') == key
+    assert manifest.digest('x', {'a': 1, 'b': [2, 3]}) != key
+    assert manifest.digest('ab', 'c') != manifest.digest('a', 'bc')
+
+
+def test_uptodate(tmp_path):
+    filename = str(tmp_path / 'manifest.json')
+    target = str(tmp_path / 'p1.html')
+    manifest = Manifest(filename)
+    assert not manifest.uptodate('textohtml', target, 'k1')
+    manifest.update('textohtml', target, 'k1')
+    # cible absente
+    assert not manifest.uptodate('textohtml', target, 'k1')
+    with open(target, 'w') as file_target:
+        file_target.write('<p>1</p>')
+    assert manifest.uptodate('textohtml', target, 'k1')
+    assert not manifest.uptodate('textohtml', target, 'k2')
+    assert manifest.stages['textohtml'] == {'rebuilt': 1, 'skipped': 1}
+
+    manifest.save()
+    assert Manifest(filename).uptodate('textohtml', target, 'k1')
+
+
+def test_file(tmp_path):
+    filename = str(tmp_path / 'config.tex')
+    manifest = Manifest(str(tmp_path / 'manifest.json'))
+    assert manifest.file(filename) == hash_file(filename) == ''
+    with open(filename, 'w') as file_config:
+        file_config.write('\\documentclass{article}')
+    # empreinte calculée une seule fois par passage
+    assert manifest.file(filename) == ''
+    manifest.forget([filename])
+    assert manifest.file(filename) == hash_file(filename) != ''
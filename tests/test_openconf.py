@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:31:09 2026
+
+@author: phil
+
+Conversion d'une ligne de l'export OpenConf en Submission
+(openconf.ColumnSchema) : colonnes des auteurs, numéros d'affiliation et
+formes canoniques.
+"""
+from dedup import CanonicalMap
+from openconf import ColumnSchema
+
+FIELDNAMES = ['SUBMISSION ID', 'TITRE', 'RÉSUMÉ', 'MOTS CLÉS',
+              'CONTACT AUTHOR NOM', 'CONTACT AUTHOR AFFILIATION',
+              'CONTACT AUTHOR EMAIL',
+              'AUTHOR 1 NOM', 'AUTHOR 1 PRÉNOM', 'AUTHOR 1 AFFILIATION',
+              'AUTHOR 2 NOM', 'AUTHOR 2 PRÉNOM', 'AUTHOR 2 AFFILIATION',
+              'AUTHOR 3 NOM', 'AUTHOR 3 PRÉNOM', 'AUTHOR 3 AFFILIATION ',
+              'AUTHOR 4 NOM']
+
+
+def row(**fields):
+    d = {'SUBMISSION ID': '12', 'TITRE': "Titre", 'MOTS CLÉS': "a, b",
+         'CONTACT AUTHOR NOM': 'DUPOND',
+         'CONTACT AUTHOR AFFILIATION': 'FEMTO-ST, UBFC',
+         'AUTHOR 1 NOM': 'MARTIN', 'AUTHOR 1 PRÉNOM': 'paul ',
+         'AUTHOR 1 AFFILIATION': 'LEMTA',
+         'AUTHOR 2 NOM': 'dupond', 'AUTHOR 2 PRÉNOM': 'J.-Luc',
+         'AUTHOR 2 AFFILIATION': 'FEMTO-ST, UBFC',
+         'AUTHOR 3 NOM': 'Durand', 'AUTHOR 3 PRÉNOM': 'Marie',
+         'AUTHOR 3 AFFILIATION': ''}
+    d.update(fields)
+    return d
+
+
+def test_columns():
+    # l'auteur 4 sans prénom ni affiliation n'est pas une colonne d'auteur
+    assert ColumnSchema(FIELDNAMES).authors == [
+        ('AUTHOR 1 NOM', 'AUTHOR 1 PRÉNOM', 'AUTHOR 1 AFFILIATION'),
+        ('AUTHOR 2 NOM', 'AUTHOR 2 PRÉNOM', 'AUTHOR 2 AFFILIATION'),
+        ('AUTHOR 3 NOM', 'AUTHOR 3 PRÉNOM', 'AUTHOR 3 AFFILIATION')]
+
+
+def test_submission():
+    sub = ColumnSchema(FIELDNAMES).submission(row())
+    assert sub.num_id == 12 and sub.doi is None
+    assert sub.contact_name == 'Dupond'
+    # affiliation du contact en premier, affiliation vide non numérotée
+    assert sub.affiliations == ['FEMTO-ST, UBFC', 'LEMTA']
+    assert [(a.name, a.surname, a.aff_num) for a in sub.authors] == [
+        ('Martin', 'Paul', 2), ('Dupond', 'J.-Luc', 1),
+        ('Durand', 'Marie', 0)]
+
+
+def test_submission_canonical():
+    canonical = CanonicalMap([
+        {'kind': 'author', 'variant': 'Dupond, J.-Luc',
+         'canonical': 'Dupond, Jean-Luc', 'score': '0.9', 'status': 'ok'},
+        {'kind': 'affiliation', 'variant': 'FEMTO-ST, UBFC',
+         'canonical': 'Institut FEMTO-ST', 'score': '0.9', 'status': 'ok'},
+        {'kind': 'affiliation', 'variant': 'LEMTA',
+         'canonical': 'LEMTA, CNRS', 'score': '0.8', 'status': 'rejet'}])
+    sub = ColumnSchema(FIELDNAMES, canonical).submission(row())
+    assert sub.affiliations == ['Institut FEMTO-ST', 'LEMTA']
+    assert (sub.authors[1].surname, sub.authors[1].aff_num) == \
+        ('Jean-Luc', 1)
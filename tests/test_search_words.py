@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:12:44 2026
+
+@author: phil
+
+Les mots de l'index de recherche (static_site.words) et ceux de la
+recherche dans le navigateur (words de search.js) doivent être découpés de
+la même façon : sinon un mot saisi ne retrouve pas le mot indexé.
+"""
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from static_site import STOPWORDS, words
+
+SEARCH_JS = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'Export_HTML', 'search.js')
+
+STRINGS = ["Conductivité thermique des matériaux",
+           "Cœur du réacteur et nœuds de la structure",
+           "ŒUVRE, ex æquo, ÆRODYNAMIQUE",
+           "Straße, GROẞ",
+           "Université de Lorraine, CNRS, LEMTA, F-54000 Nancy",
+           "Échangeur à ailettes – régime laminaire (Re < 2300)",
+           "Efﬁcacité énergétique, CO₂ et m²",
+           "Noël, Hervé ; Müller, Jürgen ; Çelik, Ödön",
+           ""]
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="node absent")
+def test_words_python_js():
+    script = ("var search = require(process.argv[1]);"
+              "var strings = JSON.parse(process.argv[2]);"
+              "var stopwords = JSON.parse(process.argv[3]);"
+              "console.log(JSON.stringify(strings.map(function (text) {"
+              "  return search.words(text, stopwords); })));")
+    output = subprocess.run(['node', '-e', script, SEARCH_JS,
+                             json.dumps(STRINGS),
+                             json.dumps(sorted(STOPWORDS))],
+                            capture_output=True, text=True, check=True)
+    assert json.loads(output.stdout) == [words(text) for text in STRINGS]
+
+
+def test_words_ligatures():
+    assert words("Cœur, ŒUVRE, æquo, Straße") == ['coeur', 'oeuvre', 'aequo',
+                                                   'strasse']
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:05:31 2026
+
+@author: phil
+
+Les titres et mots clés du registre sont en LaTeX : le site et l'index de
+recherche doivent porter le texte (NH3, CO2) et non les commandes.
+"""
+import json
+from types import SimpleNamespace
+
+from latex_html import render_text
+from static_site import words, write_site
+
+
+class Registry:
+
+    def papers(self):
+        yield (1, "Thème", 12,
+               r"Absorption de \chemform{NH_3} et de CO$_2$ à 20 $^{\circ}$C",
+               [("Baucour", "Philippe", "FEMTO-ST")],
+               r"ammoniac, \chemform{CO_2}", "https://doi.org/p12")
+
+
+def test_render_text():
+    assert render_text(r"\chemform{NH_3} et CO$_2$") == "NH3 et CO2"
+    assert render_text(r"Échange \& transfert \inconnue{x}") == \
+        "Échange & transfert x"
+
+
+def test_site_latex(tmp_path):
+    edition = SimpleNamespace(path_export_html=str(tmp_path)+'/',
+                              name="SFT 2021", pdf_url="https://sft/",
+                              jobname=lambda name: name)
+    write_site(edition, Registry())
+    site = tmp_path / 'Site'
+    assert 'nh3' in json.loads((site / 'index' / 'nh.json').read_text())
+    assert json.loads((site / 'index' / 'co.json').read_text())['co2'] == \
+        [12, 1 | 2]
+    page = (site / 'theme-1.html').read_text()
+    assert 'NH3' in page and '\\chemform' not in page
+    assert words(render_text(r"$^{\circ}$C")) == []
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:24:05 2026
+
+@author: phil
+
+Mesure des temps d'exécution : une span par étape et par opération sur un
+papier (Abstract, tag_doi, textohtml, writexml). Les spans sont exportées au
+format Chrome trace (chrome://tracing ou https://ui.perfetto.dev) et un
+tableau des papiers les plus lents est affiché en fin de construction.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+
+def timed(func, *args, **kwargs):
+    """
+    Fonction permettant d'exécuter func dans un processus de travail en
+    mesurant son temps d'exécution
+
+    Parameters
+    ----------
+    func : Function
+        Fonction à exécuter (définie au niveau d'un module pour le pool).
+    *args, **kwargs :
+        Arguments de func.
+
+    Returns
+    -------
+    Tuple
+        (résultat de func, (début, fin, pid, tid)) avec les temps en
+        secondes depuis l'epoch.
+
+    """
+    start = time.time()
+    result = func(*args, **kwargs)
+    return result, (start, time.time(), os.getpid(), threading.get_ident())
+
+
+class Tracer:
+    """
+    Enregistreur des spans d'une construction.
+
+    Example
+    -------
+    >>> with tracer.span('All_Abstracts'):
+            ...
+            with tracer.span('Abstract', num_id=1):
+                ...
+    >>> job = executor.submit(timed, tag_doi, 1, doi)
+    >>> ok = tracer.collect(job.result(), 'tag_doi', num_id=1)
+    >>> tracer.export_chrome('./trace_make_recueils.json')
+    >>> tracer.summary()
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    def add(self, name, start, end, pid=None, tid=None, cat='paper',
+            **args):
+        self.spans.append({'name': name, 'cat': cat, 'start': start,
+                           'end': end,
+                           'pid': os.getpid() if pid is None else pid,
+                           'tid': threading.get_ident() if tid is None
+                           else tid,
+                           'args': args})
+
+    @contextmanager
+    def span(self, name, cat=None, **args):
+        """
+        Span autour d'un bloc : une étape si aucun num_id n'est donné, une
+        opération sur un papier sinon
+        """
+        if cat is None:
+            cat = 'paper' if 'num_id' in args else 'stage'
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.time(), cat=cat, **args)
+
+    def collect(self, timed_result, name, **args):
+        """
+        Enregistre la span renvoyée par timed et renvoie le résultat de la
+        fonction
+        """
+        result, (start, end, pid, tid) = timed_result
+        self.add(name, start, end, pid, tid, **args)
+        return result
+
+    def export_chrome(self, filename):
+        """
+        Fonction permettant d'exporter les spans au format Chrome trace
+
+        Parameters
+        ----------
+        filename : String
+            Nom du fichier JSON.
+
+        Returns
+        -------
+        None.
+
+        """
+        t0 = min((s['start'] for s in self.spans), default=0)
+        events = [{'name': s['name'] + (' p'+str(s['args']['num_id'])
+                                        if 'num_id' in s['args'] else ''),
+                   'cat': s['cat'], 'ph': 'X',
+                   'ts': round((s['start']-t0)*1e6),
+                   'dur': round((s['end']-s['start'])*1e6),
+                   'pid': s['pid'], 'tid': s['tid'], 'args': s['args']}
+                  for s in self.spans]
+        with open(filename, 'w', encoding='utf-8') as file_trace:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'},
+                      file_trace)
+
+    def summary(self, nb=10):
+        """
+        Affiche la durée de chaque étape puis les nb papiers les plus lents
+        avec le détail par opération
+        """
+        print("\n"+20*"="+"\n")
+        print("Durée des étapes")
+        for s in self.spans:
+            if s['cat'] == 'stage':
+                print("  {:28s} {:9.3f} s".format(s['name'],
+                                                   s['end']-s['start']))
+        papers = {}
+        for s in self.spans:
+            if s['cat'] == 'paper':
+                ops = papers.setdefault(s['args']['num_id'], {})
+                ops[s['name']] = ops.get(s['name'], 0)+s['end']-s['start']
+        if not papers:
+            return
+        print("Papiers les plus lents")
+        for num_id in sorted(papers, key=lambda n: -sum(papers[n].values())
+                             )[:nb]:
+            ops = papers[num_id]
+            print("  p{:<6} {:9.3f} s   ".format(num_id, sum(ops.values())) +
+                  ', '.join('{} {:.3f} s'.format(name, ops[name])
+                            for name in sorted(ops, key=ops.get,
+                                               reverse=True)))
+
+
+class Profiler:
+    """
+    Mode cProfile optionnel : entre start et stop le processus principal est
+    profilé (pas les processus de travail des pools), les statistiques sont
+    sauvegardées dans filename_prof (pour pstats ou snakeviz) et les nb
+    fonctions les plus coûteuses sont affichées.
+
+    Example
+    -------
+    >>> profiler = Profiler('./make_recueils.prof', enabled=True)
+    >>> profiler.start()
+    >>> ...
+    >>> profiler.stop()
+    """
+
+    def __init__(self, filename_prof, enabled=False, nb=25):
+        self.filename_prof = filename_prof
+        self.nb = nb
+        self.profile = cProfile.Profile() if enabled else None
+
+    def start(self):
+        if self.profile is not None:
+            self.profile.enable()
+
+    def stop(self):
+        if self.profile is None:
+            return
+        self.profile.disable()
+        self.profile.dump_stats(self.filename_prof)
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats(
+            'cumulative').print_stats(self.nb)
+        print(stream.getvalue())
+
+
+tracer = Tracer()
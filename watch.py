@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:41:17 2026
+
+@author: phil
+
+Mode watch de build.py : après une première construction complète, les
+fichiers d'entrée (export OpenConf, choix_theme.csv, abstracts corrigés,
+PDF des articles, gabarits LaTeX) sont surveillés par inotify, ou par
+scrutation si inotify n'est pas disponible. Chaque modification est
+associée aux étapes qu'elle concerne (RULES) et, pour un abstract ou un
+PDF, au seul papier modifié : seules ces étapes sont relancées, sur ce
+papier, l'état des étapes précédentes (Dtheme, doi_ok, index des auteurs,
+empreintes du manifeste) est gardé en mémoire.
+
+    python build.py html xml --watch
+"""
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import struct
+import time
+
+from dedup import CanonicalMap
+from manifest import hash_file
+
+# (motif du chemin relatif au congrès, étapes à relancer, par papier)
+# la première règle qui correspond s'applique, les fichiers générés par la
+# construction (Tableau_Reviewer.tex, abstract.k.inc.tex...) ne sont pas
+# surveillés
+RULES = [
+    (r'Imports_OpenConf/openconf-[^/]*\.csv',
+     ['abstracts', 'themes', 'toc', 'site', 'tag_doi', 'actes_tex',
+      'resumes', 'actes', 'html', 'xml'], False),
+    (r'Imports_OpenConf/canonical_map\.csv',
+     ['abstracts', 'toc', 'site', 'resumes', 'actes', 'xml'], False),
+    (r'Imports_OpenConf/choix_theme\.csv',
+     ['themes', 'toc', 'site', 'actes_tex', 'resumes', 'actes'], False),
+    (r'Imports_OpenConf/Tableau_Reviewer\.csv',
+     ['reviewers', 'resumes', 'actes'], False),
+    (r'Imports_OpenConf/PDF_articles/(\d+)\.pdf',
+     ['pdf_index', 'tag_doi', 'actes_tex', 'actes', 'html', 'xml'], True),
+    (r'Export_Tex/Abstracts/p(\d+)\.tex', ['html', 'xml', 'resumes'], True),
+    (r'Export_Tex/config_html\.tex', ['html'], False),
+    (r'Export_Tex/Tableau_Reviewer_start\.tex',
+     ['reviewers', 'resumes', 'actes'], False),
+    (r'Export_Tex/(?!Tableau_Reviewer\.tex)[^/]*\.tex', ['resumes', 'actes'],
+     False),
+    (r'Export_Tex/Recueil_Resume/(Recueil_Resume_start|page-garde)\.tex',
+     ['resumes'], False),
+    (r'Export_Tex/Recueil_Actes/(actes_start|actes_end|page-garde)\.tex',
+     ['actes'], False),
+    (r'Export_HTML/Table_of_contents_start\.md', ['toc'], False),
+]
+RULES = [(re.compile(pattern+'$'), stages, per_paper)
+         for pattern, stages, per_paper in RULES]
+DIRS = ['Imports_OpenConf', 'Imports_OpenConf/PDF_articles', 'Export_Tex',
+        'Export_Tex/Abstracts', 'Export_Tex/Recueil_Resume',
+        'Export_Tex/Recueil_Actes', 'Export_HTML']
+
+
+def match(relpath):
+    """
+    Étapes et n° du papier (ou None) concernés par un fichier, None si le
+    fichier n'est pas surveillé
+    """
+    for pattern, stages, per_paper in RULES:
+        m = pattern.match(relpath)
+        if m is not None:
+            return stages, int(m.group(1)) if per_paper else None
+    return None
+
+
+class Inotify:
+    """
+    Surveillance des répertoires par inotify (Linux), appelé directement dans
+    la libc. Lève OSError si inotify n'est pas disponible.
+    """
+    # IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE (les éditeurs enregistrent
+    # souvent par renommage d'un fichier temporaire)
+    MASK = 0x00000008 | 0x00000080 | 0x00000200
+    HEADER = struct.Struct('iIII')
+
+    def __init__(self, dirs):
+        name = ctypes.util.find_library('c')
+        libc = ctypes.CDLL(name, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("inotify non disponible")
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self.dirs = {}
+        for dirname in dirs:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(dirname),
+                                        self.MASK)
+            if wd >= 0:
+                self.dirs[wd] = dirname
+
+    def wait(self, timeout=None):
+        """
+        Attend des événements (au plus timeout secondes) et renvoie
+        l'ensemble des fichiers concernés
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        data = os.read(self.fd, 1 << 16)
+        paths = set()
+        pos = 0
+        while pos < len(data):
+            wd, mask, cookie, size = self.HEADER.unpack_from(data, pos)
+            pos += self.HEADER.size
+            name = data[pos:pos+size].rstrip(b'\0')
+            pos += size
+            if name and wd in self.dirs:
+                paths.add(os.path.join(self.dirs[wd], os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Polling:
+    """
+    Surveillance des répertoires par comparaison des dates de modification
+    et des tailles toutes les interval secondes
+    """
+
+    def __init__(self, dirs, interval=1.0):
+        self.dirs = dirs
+        self.interval = interval
+        self.stats = self.scan()
+
+    def scan(self):
+        stats = {}
+        for dirname in self.dirs:
+            if not os.path.isdir(dirname):
+                continue
+            for entry in os.scandir(dirname):
+                if entry.is_file():
+                    stat = entry.stat()
+                    stats[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic()+timeout
+        while True:
+            stats = self.scan()
+            paths = {path for path in stats.keys() | self.stats.keys()
+                     if stats.get(path) != self.stats.get(path)}
+            self.stats = stats
+            if paths:
+                return paths
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval if deadline is None else
+                       max(0, min(self.interval, deadline-time.monotonic())))
+
+    def close(self):
+        pass
+
+
+class Watch:
+    """
+    Reconstructions successives d'un congrès (Build) à chaque modification
+    de ses fichiers d'entrée.
+
+    Parameters
+    ----------
+    build : Build
+        Construction du congrès (gardée en mémoire entre deux passages).
+    targets : List
+        Cibles parmi TARGETS (build.py).
+    source : Inotify ou Polling
+        Surveillance des répertoires DIRS du congrès.
+    delay : Float, optional
+        Les modifications rapprochées de moins de delay secondes sont
+        regroupées dans un même passage. The default is 0.5.
+    """
+
+    def __init__(self, build, targets, source, delay=0.5):
+        self.build = build
+        self.targets = targets
+        self.source = source
+        self.delay = delay
+        # empreinte du contenu des fichiers surveillés : un enregistrement
+        # sans modification ne relance rien
+        self.hashes = {}
+        for dirname in DIRS:
+            path = build.root+dirname
+            if os.path.isdir(path):
+                for filename in os.listdir(path):
+                    self.changed(os.path.join(path, filename))
+        self.pending = set()
+
+    def changed(self, path):
+        """
+        Renvoie (étapes, n° papier) si le contenu d'un fichier surveillé a
+        changé depuis le dernier passage, None sinon
+        """
+        relpath = os.path.relpath(path, self.build.root).replace(os.sep, '/')
+        affected = match(relpath)
+        if affected is None:
+            return None
+        sha256 = hash_file(path)
+        if self.hashes.get(path) == sha256:
+            return None
+        self.hashes[path] = sha256
+        return affected
+
+    def collect(self):
+        """
+        Attend les modifications et renvoie les fichiers modifiés, les
+        étapes et les papiers à reconstruire (None : tous)
+        """
+        while True:
+            paths = self.source.wait()
+            while True:
+                more = self.source.wait(self.delay)
+                if not more:
+                    break
+                paths |= more
+            files, stages, only = [], set(), set()
+            for path in sorted(paths):
+                affected = self.changed(path)
+                if affected is None:
+                    continue
+                files.append(path)
+                stages.update(affected[0])
+                if only is not None:
+                    only = None if affected[1] is None else \
+                        only | {affected[1]}
+            if files:
+                return files, stages, only
+
+    def step(self, files, stages, only):
+        """
+        Relance les étapes concernées (et celles en échec au passage
+        précédent) pour les papiers modifiés
+        """
+        start = time.monotonic()
+        build = self.build
+        print("\n"+20*"="+"\n")
+        for path in files:
+            print("modifié :", os.path.relpath(path, build.root))
+        build.manifest.forget(files)
+        if any(path.endswith('canonical_map.csv') for path in files):
+            build.canonical = CanonicalMap.load(
+                build.root+'Imports_OpenConf/canonical_map.csv')
+        build.only = None if self.pending else only
+        failed = build.run(self.targets, stages | self.pending)
+        build.only = None
+        self.pending = set(failed)
+        print("Passage terminé en {:.1f} s".format(time.monotonic()-start))
+        return failed
+
+    def run(self):
+        failed = self.build.run(self.targets)
+        self.pending = set(failed)
+        print("\nSurveillance des modifications (Ctrl-C pour arrêter)")
+        try:
+            while True:
+                failed = self.step(*self.collect())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.source.close()
+        return failed
+
+
+def watch(build, targets, interval=None, delay=0.5):
+    """
+    Fonction permettant de reconstruire les cibles à chaque modification des
+    fichiers d'entrée, jusqu'à Ctrl-C
+
+    Parameters
+    ----------
+    build : Build
+        Construction du congrès.
+    targets : List
+        Cibles parmi TARGETS (build.py).
+    interval : Float, optional
+        Période de scrutation en secondes, inotify est utilisé s'il est
+        disponible quand interval vaut None. The default is None.
+    delay : Float, optional
+        Délai de regroupement des modifications. The default is 0.5.
+
+    Returns
+    -------
+    failed : Dict
+        Étapes en échec au dernier passage.
+
+    """
+    dirs = [build.root+dirname for dirname in DIRS]
+    source = None
+    if interval is None:
+        try:
+            source = Inotify(dirs)
+        except (OSError, AttributeError) as err:
+            print("inotify non disponible, scrutation toutes les secondes :",
+                  err)
+            interval = 1.0
+    if source is None:
+        source = Polling(dirs, interval)
+    return Watch(build, targets, source, delay).run()